@@ -0,0 +1,80 @@
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from Foothold_city.Resources.const import excel_all_sheets, session_memmap
+
+
+class FileLoadSignals(QObject):
+    """Сигналы фоновой загрузки (доставляются в поток интерфейса)."""
+    progress = pyqtSignal(str)  # Название текущего этапа
+    finished = pyqtSignal(object)  # Загруженный и нормализованный FileManager
+    failed = pyqtSignal(str)  # Сообщение об ошибке
+
+
+class FileLoadWorker(QRunnable):
+    """
+    Загрузка и нормализация файлов в пуле потоков (QThreadPool), чтобы окно не замирало.
+    Несколько книг и их листы загружаются в одну модель (FileManager.load_excel_files).
+    Этапы: чтение, распределение по сферам, упорядочивание столбцов, нормализация.
+    Отмена проверяется на каждом сообщении о ходе загрузки.
+    Файл сохраненного сеанса (SessionStore.EXTENSION) восстанавливается без чтения Excel,
+    выбранные города и результат сортировки передаются через атрибут session.
+    """
+
+    def __init__(self, file_paths):
+        """:param file_paths: Путь к файлу или список путей (файл сеанса открывается только один)."""
+        super().__init__()
+        self.file_paths = [file_paths] if isinstance(file_paths, str) else list(file_paths)
+        self.signals = FileLoadSignals()
+        self._cancelled = False
+        self.session = None  # Данные сеанса (при открытии файла сеанса)
+
+    def cancel(self):
+        """Отменяет загрузку: результат не будет передан, чтение прервется на ближайшем этапе."""
+        self._cancelled = True
+
+    def _report(self, stage):
+        from Foothold_city.Utils.file_manager import LoadCancelled
+        if self._cancelled:
+            raise LoadCancelled()
+        self.signals.progress.emit(stage)
+
+    def run(self):
+        # pandas загружается в потоке загрузки, а не при запуске программы
+        from Foothold_city.Utils.file_manager import FileManager, LoadCancelled
+        if self.file_paths[0].lower().endswith(".fcsession"):  # SessionStore.EXTENSION
+            self._run_session(self.file_paths[0])
+            return
+
+        file_manager = FileManager()
+        sheet_name = None if excel_all_sheets else 0
+        try:
+            if file_manager.load_excel_files(self.file_paths, sheet_name, progress=self._report) is None:
+                self.signals.failed.emit(file_manager.load_error or
+                                         f"Не удалось загрузить файл: {', '.join(self.file_paths)}")
+                return
+            file_manager.normalize_data(progress=self._report)
+        except LoadCancelled:
+            return
+        except Exception as e:
+            # Любая ошибка передается в интерфейс: индикатор загрузки снимается, кнопка сортировки включается
+            self.signals.failed.emit(f"Ошибка при загрузке файла: {e}")
+            return
+
+        if not self._cancelled:
+            self.signals.finished.emit(file_manager)
+
+    def _run_session(self, file_path):
+        from Foothold_city.Utils.session_store import SessionStore
+        self.signals.progress.emit("Восстановление сеанса")
+        # По умолчанию массивы читаются в память: файл автосохранения перезаписывается при закрытии программы
+        try:
+            restored = SessionStore.load(file_path, mmap=session_memmap)
+        except Exception as e:
+            self.signals.failed.emit(f"Не удалось восстановить сеанс: {file_path} ({e})")
+            return
+        if restored is None:
+            self.signals.failed.emit(f"Не удалось восстановить сеанс: {file_path}")
+            return
+        file_manager, self.session = restored
+        if not self._cancelled:
+            self.signals.finished.emit(file_manager)
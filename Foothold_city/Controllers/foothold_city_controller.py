@@ -1,14 +1,17 @@
-import numpy as np
-import pandas as pd
-from PyQt6.QtWidgets import QFileDialog, QGraphicsScene, QSizePolicy, QWidget, QVBoxLayout, QPushButton, QMessageBox
-from PyQt6.QtCore import Qt
-import matplotlib.pyplot as plt
-from PyQt6.uic.properties import QtWidgets
-
-from Foothold_city.Utils.data_analysis import DataAnalysis
-from Foothold_city.Utils.file_manager import FileManager
+import os
+
+from PyQt6.QtWidgets import QFileDialog, QGraphicsScene, QSizePolicy, QWidget, QVBoxLayout, QPushButton, QMessageBox, \
+    QApplication
+from PyQt6.QtCore import Qt, QThreadPool, QTimer
+from PyQt6.QtGui import QKeySequence, QShortcut
+
+from Foothold_city.Resources import const
+
+from Foothold_city.Controllers.file_load_worker import FileLoadWorker
 from Foothold_city.Views.foothold_city_view import FootholdCityView
-from Foothold_city.Views.visualization import VisualizationWidget
+
+# numpy/pandas (FileManager, DataAnalysis) и matplotlib (VisualizationWidget) импортируются
+# при первом открытии файла или построении графика, чтобы главное окно появлялось сразу
 
 
 class FootholdCityController:
@@ -20,7 +23,7 @@ class FootholdCityController:
         :param view: Экземпляр класса представления (View).
         """
         self.view = view  # Сохраняем ссылку на представление
-        self.file_manager = FileManager()
+        self.file_manager = None  # FileManager загруженного файла
 
         # Подключение сигналов кнопок к соответствующим обработчикам событий
         self.view.ui.pushButton_open.clicked.connect(self.pushButton_open_clicked)
@@ -32,6 +35,15 @@ class FootholdCityController:
         self.view.ui.listWidget.setSelectionMode(self.view.ui.listWidget.SelectionMode.MultiSelection)
         self.view.ui.listWidget.itemClicked.connect(self.listWidget_itemClicked)
 
+        # Масштаб просмотра графика влияет на разрешение его растеризации
+        self.view.ui.graphicsView.zoom_changed.connect(self.graphicsView_zoom_changed)
+
+        # Сохранение сеанса: Ctrl+S - в выбранный файл, при закрытии программы - автоматически
+        self.save_session_shortcut = QShortcut(QKeySequence.StandardKey.Save, self.view)
+        self.save_session_shortcut.activated.connect(self.save_session_as)
+        if const.session_autosave and QApplication.instance() is not None:
+            QApplication.instance().aboutToQuit.connect(self.autosave_session)
+
         # Начальные настройки для QComboBox
         self.comboBox_setting()
 
@@ -40,9 +52,8 @@ class FootholdCityController:
 
         # Переменные
         self.visualization = None
-        self.normalized_data = None
-        self.data = None
         self.popup_window = None  # Добавляем переменную для хранения ссылки на окно
+        self.popup_visualization = None  # График всплывающего окна
         self.example_data = {
             "Политическая": [("Население", 8), ("Избирательная кампания", 3)],
             "Экономическая": [("Связи с городами", 4), ("Предприятия", 6)],
@@ -52,53 +63,133 @@ class FootholdCityController:
         self.output_text = None
 
         self.city_spheres_data_normalaized = None
+        self.file_load_worker = None  # Текущая фоновая загрузка файла
+        self.source_path = None  # Открытые файлы Excel или сеанса
+        self.last_sort = None  # Результат последней сортировки (для сохранения сеанса)
+
+        # Восстановление последнего сеанса после появления окна
+        if const.session_restore_on_start and os.path.exists(const.session_autosave_path):
+            QTimer.singleShot(0, lambda: self.start_file_loading(const.session_autosave_path))
 
     def pushButton_open_clicked(self):
         """Обработчик нажатия кнопки 'Open'."""
 
-        # Открываем диалог выбора файла
-        file_path, _ = QFileDialog.getOpenFileName(
+        # Открываем диалог выбора файлов: несколько книг загружаются в одну модель
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self.view,  # Родительский виджет
-            "Выберите файл",  # Заголовок диалогового окна
+            "Выберите файлы",  # Заголовок диалогового окна
             "",  # Начальный каталог
-            "Excel Files (*.xlsx *.xls)"  # Фильтр типов файлов
+            "Excel Files (*.xlsx *.xls);;Сеанс (*.fcsession)"  # Фильтр типов файлов
         )
 
-        if file_path:  # Если файл выбран
+        if file_paths:  # Если файлы выбраны
             self.all_close()
-            self.data = self.file_manager.load_excel(file_path)  # Загружаем данные в модель
-            cities = self.file_manager.get_city_names()  # Получаем список городов
-            # Нормализуем данные
-            self.normalized_data = self.file_manager.normalize_data()
-
+            self.start_file_loading(file_paths)
 
-            if cities:
-                self.view.ui.listWidget.clear()  # Очищаем список городов
-                # Удаляем последний элемент из списка cities
-                cities.pop()  # Удаляет последний элемент
-                self.view.ui.listWidget.addItems(cities)  # Добавляем города в список
+    def start_file_loading(self, file_paths):
+        """
+        Запускает загрузку и нормализацию файлов в фоновом потоке.
+        Незавершенная загрузка предыдущих файлов отменяется.
+        :param file_paths: Путь к файлу или список путей.
+        """
+        if self.file_load_worker is not None:
+            self.file_load_worker.cancel()
+
+        self.source_path = file_paths
+        worker = FileLoadWorker(file_paths)
+        worker.signals.progress.connect(self.file_load_progress)
+        worker.signals.finished.connect(lambda file_manager: self.file_load_finished(worker, file_manager))
+        worker.signals.failed.connect(lambda message: self.file_load_failed(worker, message))
+        self.file_load_worker = worker
+
+        self.view.ui.pushButton_start_sort.setEnabled(False)
+        QThreadPool.globalInstance().start(worker)
+
+    def file_load_progress(self, stage):
+        """Показывает текущий этап загрузки в строке состояния."""
+        if self.file_load_worker is not None:
+            self.view.statusBar().showMessage(f"{stage}...")
+
+    def file_load_finished(self, worker, file_manager):
+        """Получение результата фоновой загрузки: заполняем список городов."""
+        if worker is not self.file_load_worker:
+            return  # Результат отмененной загрузки
+        self.file_load_worker = None
+        self.view.ui.pushButton_start_sort.setEnabled(True)
+        self.view.statusBar().clearMessage()
+        if file_manager.load_warnings:
+            self.view.statusBar().showMessage(" ".join(file_manager.load_warnings), 10000)
+
+        self.file_manager = file_manager  # Загруженные и нормализованные данные (file_manager.model)
+        self.fill_sort_methods()
+        cities = file_manager.get_city_names()  # Получаем список городов
+
+        if cities:
+            self.view.ui.listWidget.clear()  # Очищаем список городов
+            self.view.ui.listWidget.addItems(cities)  # Добавляем города в список
+
+        if worker.session is not None:
+            self.apply_session(worker.session)
+
+    def apply_session(self, session):
+        """
+        Восстанавливает выбранные города и результат сортировки сохраненного сеанса.
+        :param session: Словарь сеанса, возвращаемый SessionStore.load.
+        """
+        if session["source"]:
+            self.source_path = session["source"]
+        selected_cities = [city for city in session["selected_cities"] if self.file_manager.get_city_position(city) is not None]
+        if selected_cities:
+            selected = set(selected_cities)
+            for row in range(self.view.ui.listWidget.count()):
+                item = self.view.ui.listWidget.item(row)
+                item.setSelected(item.text() in selected)
+
+            # Все города добавляются на график с одной отрисовкой
+            if self.visualization is None:
+                self.visualization = self.new_visualization_widget()
+                self.show_visualization_in_view()
+            self.visualization.add_cities({
+                city: (self.get_city_normalaized_spheres_data(city), self.get_city_spheres_data(city))
+                for city in selected_cities
+            })
+
+        sort = session["sort"]
+        if sort is not None:
+            index = self.view.ui.comboBox_sort.findText(sort["method"])
+            if index >= 0:
+                self.view.ui.comboBox_sort.setCurrentIndex(index)
+            self.last_sort = sort
+            self.show_results(sort["results"], sort["filled_criteria"])
+
+    def file_load_failed(self, worker, message):
+        """Ошибка фоновой загрузки."""
+        if worker is not self.file_load_worker:
+            return
+        self.file_load_worker = None
+        self.view.ui.pushButton_start_sort.setEnabled(True)
+        self.view.statusBar().clearMessage()
+        QMessageBox.warning(self.view, "Ошибка", message)
 
     def pushButton_open_plot_clicked(self):
         if self.visualization is not None:
-            # создаём новый виджет для всплывающего окна
-            popup_visualization = VisualizationWidget()
-            
-            # копируем данные городов в новый виджет
-            for city_name in self.visualization.cities_data:
-                normalized_data = self.visualization.cities_data[city_name]
-                original_data = self.visualization.cities_data_not_normalized.get(city_name, normalized_data)
-                popup_visualization.add_city_data(city_name, normalized_data, original_data)
-
-            # создайм новое окно
-            self.popup_window = QWidget()  # Сохраняем ссылку на окно
-            self.popup_window.setWindowTitle("График городов")
-            popup_visualization.setSizePolicy(
-                QSizePolicy.Policy.Expanding,
-                QSizePolicy.Policy.Expanding
-            )
-            layout = QVBoxLayout(self.popup_window)
-            layout.addWidget(popup_visualization)
-            layout.setContentsMargins(0, 0, 0, 0)
+            # Всплывающее окно рисует общую модель графика главного окна: геометрия не пересчитывается,
+            # а ранее открытое окно переиспользуется и дорисовывает только изменения
+            if self.popup_window is None or self.popup_visualization.model is not self.visualization.model:
+                self.popup_visualization = self.new_visualization_widget(model=self.visualization.model)
+
+                # создайм новое окно
+                self.popup_window = QWidget()  # Сохраняем ссылку на окно
+                self.popup_window.setWindowTitle("График городов")
+                self.popup_visualization.setSizePolicy(
+                    QSizePolicy.Policy.Expanding,
+                    QSizePolicy.Policy.Expanding
+                )
+                layout = QVBoxLayout(self.popup_window)
+                layout.addWidget(self.popup_visualization)
+                layout.setContentsMargins(0, 0, 0, 0)
+            else:
+                self.popup_visualization.sync()
 
             self.popup_window.showMaximized()
             self.popup_window.show()
@@ -110,10 +201,8 @@ class FootholdCityController:
         if self.visualization is not None:
             self.visualization.clear_cities()
             # Пересоздаем виджет визуализации
-            self.visualization = VisualizationWidget()
-            self.view.ui.graphicsView.setScene(QGraphicsScene(self.view))
-            self.view.ui.graphicsView.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-            self.view.ui.graphicsView.scene().addWidget(self.visualization)
+            self.visualization = self.new_visualization_widget()
+            self.show_visualization_in_view()
 
             # Снимаем выделение со всех городов в списке
             self.view.ui.listWidget.clearSelection()
@@ -124,30 +213,18 @@ class FootholdCityController:
 
         # Создаем визуализацию, если она еще не создана
         if self.visualization is None:
-            self.visualization = VisualizationWidget()
-            self.view.ui.graphicsView.setScene(QGraphicsScene(self.view))
-            self.view.ui.graphicsView.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-            self.view.ui.graphicsView.scene().addWidget(self.visualization)
-
-        # Получаем данные для выбранного города
-        self.city_spheres_data_normalaized = self.get_city_normalaized_spheres_data(city_name)
-        city_spheres_data = self.get_city_spheres_data(city_name)
+            self.visualization = self.new_visualization_widget()
+            self.show_visualization_in_view()
 
         # Если элемент выбран, добавляем город, если нет - удаляем
         if item.isSelected():
+            # Получаем данные для выбранного города (срезы заранее собранных массивов)
+            self.city_spheres_data_normalaized = self.get_city_normalaized_spheres_data(city_name)
+            city_spheres_data = self.get_city_spheres_data(city_name)
             self.visualization.add_city_data(city_name, self.city_spheres_data_normalaized, city_spheres_data)
         else:
-            # Удаляем чекбокс города
-            self.visualization.remove_city_checkbox(city_name)
-            # Обновляем визуализацию без этого города
-            self.visualization.cities_data.pop(city_name, None)
-            if self.visualization.cities_data:
-                # Если есть другие города, обновляем с последним добавленным
-                last_city = next(reversed(self.visualization.cities_data))
-                self.visualization.spheres = self.visualization.cities_data[last_city]
-            else:
-                # Если городов не осталось, очищаем график
-                self.visualization.clear_cities()
+            # Удаляем город и его чекбокс, остальные города не перерисовываются
+            self.visualization.remove_city(city_name)
 
     def get_city_normalaized_spheres_data(self, city_name):
         """
@@ -156,31 +233,11 @@ class FootholdCityController:
         :param city_name: Название города.
         :return: Словарь сфер с данными для города.
         """
-        if self.normalized_data is None:
+        if self.file_manager is None:
             print("Нормализованные данные не загружены.")
             return {}
 
-        # Определение сфер и критериев
-        spheres_mapping = self.file_manager.spheres_mapping
-
-        # Фильтруем данные для указанного города
-        city_data = self.normalized_data[self.normalized_data['Город'] == city_name]
-        if city_data.empty:
-            print(f"Город '{city_name}' не найден в данных.")
-            return {}
-
-        # Формируем словарь сфер
-        city_spheres_data = {}
-        for sphere, criteria in spheres_mapping.items():
-            sphere_data = []
-            for criterion in criteria:
-                norm_column = f"{criterion}_норм"
-                if norm_column in city_data.columns:
-                    value = city_data[norm_column].values[0]  # Берем значение для города
-                    sphere_data.append((criterion, value))
-            city_spheres_data[sphere] = sphere_data
-
-        return city_spheres_data
+        return self.file_manager.get_city_spheres_data(city_name, normalized=True)
 
     def get_city_spheres_data(self, city_name):
         """
@@ -189,52 +246,66 @@ class FootholdCityController:
         :param city_name: Название города.
         :return: Словарь сфер с данными для города.
         """
-        if self.data is None:
+        if self.file_manager is None:
             print("Нормализованные данные не загружены.")
             return {}
 
-        # Определение сфер и критериев
-        spheres_mapping = self.file_manager.spheres_mapping
+        return self.file_manager.get_city_spheres_data(city_name, normalized=False)
 
-        # Фильтруем данные для указанного города
-        city_data = self.data[self.data['Город'] == city_name]
-        if city_data.empty:
-            print(f"Город '{city_name}' не найден в данных.")
-            return {}
+    @staticmethod
+    def new_visualization_widget(**kwargs):
+        """Создает виджет графика (matplotlib загружается при первом вызове)."""
+        from Foothold_city.Views.visualization import VisualizationWidget
+        return VisualizationWidget(**kwargs)
+
+    def show_visualization_in_view(self):
+        """
+        Помещает виджет визуализации на новую сцену QGraphicsView.
+        В режиме подстройки разрешения область графика вписывается в окно просмотра,
+        а разрешение растеризации соответствует текущему масштабу просмотра.
+        """
+        graphics_view = self.view.ui.graphicsView
+        graphics_view.setScene(QGraphicsScene(self.view))  # Create a new QGraphicsScene
+        graphics_view.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+        viewport = graphics_view.viewport().size()
+        # Квадратная область графика; справа остается место для списка чекбоксов
+        side = max(min(viewport.width() - 220, viewport.height() - 40), 300)
+        self.visualization.set_plot_size(side, side)
+        self.visualization.set_render_scale(graphics_view.zoom())
 
-        # Формируем словарь сфер
-        city_spheres_data = {}
-        for sphere, criteria in spheres_mapping.items():
-            sphere_data = []
-            for criterion in criteria:
-                norm_column = f"{criterion}"
-                if norm_column in city_data.columns:
-                    value = city_data[norm_column].values[0]  # Берем значение для города
-                    sphere_data.append((criterion, np.float64(value)))
-            city_spheres_data[sphere] = sphere_data
+        graphics_view.scene().addWidget(self.visualization)  # Add the VisualizationWidget to the scene
 
-        return city_spheres_data
+    def graphicsView_zoom_changed(self, zoom):
+        """Изменение масштаба просмотра графика: при необходимости график перерисовывается с большим разрешением"""
+        if self.visualization is not None:
+            self.visualization.set_render_scale(zoom)
 
     def init_diagram(self):
         # Создаем и добавляем виджет визуализации        
         self.visualization.spheres = self.example_data
-        self.view.ui.graphicsView.setScene(QGraphicsScene(self.view))  # Create a new QGraphicsScene
-        self.view.ui.graphicsView.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        self.view.ui.graphicsView.scene().addWidget(self.visualization)  # Add the VisualizationWidget to the scene
+        self.show_visualization_in_view()
 
     def create_and_visualization(self, city_spheres_data):
         if self.visualization is not None:
             self.visualization.plot.close()
-        self.visualization = VisualizationWidget()
+        self.visualization = self.new_visualization_widget()
         self.visualization.spheres = city_spheres_data
-        self.view.ui.graphicsView.setScene(QGraphicsScene(self.view))  # Create a new QGraphicsScene
-        self.view.ui.graphicsView.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        self.view.ui.graphicsView.scene().addWidget(self.visualization)
+        self.show_visualization_in_view()
 
     def comboBox_setting(self):
         self.view.ui.comboBox_sort.addItem("Не выбран")
-        self.view.ui.comboBox_sort.addItem("Вариант 1")
-        self.view.ui.comboBox_sort.addItem("Вариант 2")
+
+    def fill_sort_methods(self):
+        """
+        Добавляет в список сортировок методы из реестра DataAnalysis.ranking_methods
+        (после загрузки первого файла, чтобы numpy не загружался при запуске).
+        """
+        from Foothold_city.Utils.data_analysis import DataAnalysis
+        if self.view.ui.comboBox_sort.count() > 1:
+            return
+        for method_name in DataAnalysis.ranking_methods:
+            self.view.ui.comboBox_sort.addItem(method_name)
 
     def pushButton_start_sort_clicked(self):
         # Получаем выбранные элементы из QListWidget
@@ -244,7 +315,7 @@ class FootholdCityController:
         selected_option = self.view.ui.comboBox_sort.currentText()
 
         # Проверяем, загружены ли нормализованные данные
-        if self.normalized_data is None:
+        if self.file_manager is None:
             QMessageBox.warning(
                 self.view,  # Родительский виджет
                 "Ошибка",  # Заголовок окна
@@ -270,37 +341,34 @@ class FootholdCityController:
             )
             return
 
+        import numpy as np
+        from Foothold_city.Utils.data_analysis import DataAnalysis
+
         self.file_manager.print_criterion_data("Качество городской среды")
         selected_cities = [item.text() for item in selected_items]
         # data_selected_cities = self.normalized_data[self.normalized_data['Город'].isin(selected_cities)]
-        cities_values = {}
         filled_criteria_list = []  # Список для хранения дополненных критериев
         criteria_names = self.file_manager.get_criteria_names()
 
-        for city in selected_cities:
-            data = self.file_manager.get_city_normalized_data(city)
-            full_data, filled_criteria = DataAnalysis.fill_data(data, criteria_names)
+        # Заполнение пропусков и расчет площадей для всех выбранных городов одной матричной операцией
+        matrix = self.file_manager.get_cities_normalized_matrix(selected_cities)
+        full_matrix, filled_mask, areas = DataAnalysis.score_cities(matrix, criteria_names)
+
+        for i, city in enumerate(selected_cities):
+            filled_criteria = [criteria_names[j] for j in np.flatnonzero(filled_mask[i])]
 
             if filled_criteria:
                 filled_criteria_list.append({city: filled_criteria})
 
-            value = DataAnalysis.calculate_polygon_area(full_data)
-            cities_values[city] = {
-                "full_data": full_data,
-                "value": value
-            }
-
         print("Дополненные критерии:")
         for entry in filled_criteria_list:
             print(entry)
 
-        # Распределение по действиям
-        if selected_option == "Вариант 1":
-            results = DataAnalysis.sort_variant_1(cities_values)
-            self.show_results(results, filled_criteria_list)
-        elif selected_option == "Вариант 2":
-            results = DataAnalysis.sort_variant_2(cities_values)
-            self.show_results(results, filled_criteria_list)
+        # Распределение по порядкам выбранным методом из реестра
+        results = DataAnalysis.rank_cities(selected_option, selected_cities, areas, full_matrix, criteria_names,
+                                           self.file_manager.get_spheres_columns())
+        self.last_sort = {"method": selected_option, "results": results, "filled_criteria": filled_criteria_list}
+        self.show_results(results, filled_criteria_list)
 
     def show_results(self, result, filled_criteria_list):
         if result is None:
@@ -356,10 +424,42 @@ class FootholdCityController:
         self.view.ui.graphicsView.scene().clear()
         self.view.ui.textEdit_sort.clear()
         self.view.ui.comboBox_sort.setCurrentIndex(0)
-        self.file_manager = FileManager()
+        self.file_manager = None  # Индекс городов прежнего файла не сохраняется
+        self.last_sort = None
         self.visualization = None
-        self.normalized_data = None
         self.popup_window = None  # Добавляем переменную для хранения ссылки на окно
+        self.popup_visualization = None  # График всплывающего окна
+
+    def save_session(self, file_path):
+        """
+        Сохраняет текущий сеанс: данные, выбранные города и результат последней сортировки.
+        :return: True, если сеанс сохранен.
+        """
+        if self.file_manager is None:
+            return False
+        from Foothold_city.Utils.session_store import SessionStore
+        selected_cities = [item.text() for item in self.view.ui.listWidget.selectedItems()]
+        return SessionStore.save(file_path, self.file_manager, source=self.source_path,
+                                 selected_cities=selected_cities, sort=self.last_sort)
+
+    def save_session_as(self):
+        """Обработчик Ctrl+S: сохранение сеанса в выбранный файл."""
+        if self.file_manager is None:
+            QMessageBox.warning(self.view, "Ошибка", "Данные не загружены.")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self.view, "Сохранить сеанс", "", "Сеанс (*.fcsession)")
+        if not file_path:
+            return
+        if not file_path.lower().endswith(".fcsession"):
+            file_path += ".fcsession"
+        if self.save_session(file_path):
+            self.view.statusBar().showMessage(f"Сеанс сохранен: {file_path}", 5000)
+        else:
+            QMessageBox.warning(self.view, "Ошибка", f"Не удалось сохранить сеанс: {file_path}")
+
+    def autosave_session(self):
+        """Сохранение сеанса при закрытии программы (const.session_autosave_path)."""
+        self.save_session(const.session_autosave_path)
 
     def update_textEdit(self):
         # Очищаем и обновляем QTextEdit
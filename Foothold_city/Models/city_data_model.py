@@ -0,0 +1,212 @@
+import numpy as np
+
+
+class CitySphereData:
+    """
+    Значения критериев одной сферы для одного города.
+    Ведет себя как список пар (критерий, значение), но хранит только ссылку на общий
+    кортеж названий критериев и срез строки общей матрицы значений (без копирования).
+    """
+    __slots__ = ('criteria', 'values')
+
+    def __init__(self, criteria, values):
+        self.criteria = criteria
+        self.values = values
+
+    def __len__(self):
+        return len(self.criteria)
+
+    def __iter__(self):
+        return zip(self.criteria, self.values)
+
+    def __getitem__(self, i):
+        return self.criteria[i], self.values[i]
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class CityDataModel:
+    """
+    Данные загруженного файла в столбцовом виде, без таблицы pandas:
+        - city_names: массив названий городов (строки numpy);
+        - criteria_names: кортеж названий критериев в порядке столбцов матриц;
+        - values: матрица исходных значений (города × критерии) типа float64 или float32;
+        - normalized_values: нормализованные значения той же формы и типа (None до нормализации);
+        - spheres_layout: сфера → (кортеж критериев, столбцы матриц - срез или список номеров);
+        - baseline: значение опорного начала координат - виртуального города BASELINE_NAME ("Г0") - по всем
+          критериям или None. Это не строка матрицы: оно учитывается при нормализации (FileManager.normalize_data),
+          но не входит в список городов и не участвует в сортировке;
+        - sources: названия источников (листов или книг), из которых собраны города;
+        - city_sources: номер источника каждого города (массив int32) или None, если источник один;
+        - city_labels: названия городов без источника или None, если источник один. При нескольких
+          источниках ключ города в city_names - название и источник: "Город 1 (2020)".
+
+    Матрицы могут быть np.memmap (например, сеанс, открытый через SessionStore.load(mmap=True)):
+    модель их не копирует, и строки городов читаются с диска по мере обращения.
+    """
+
+    BASELINE_NAME = "Г0"
+
+    def __init__(self, city_names, criteria_names, values, spheres_mapping=None, normalized_values=None,
+                 dtype=None, baseline=None, sources=(), city_sources=None, city_labels=None):
+        """
+        :param city_names: Названия городов (по строкам матриц).
+        :param criteria_names: Названия критериев (по столбцам матриц).
+        :param values: Матрица исходных значений (города × критерии).
+        :param spheres_mapping: Словарь {сфера: список критериев}.
+        :param normalized_values: Матрица нормализованных значений или None.
+        :param dtype: Тип матриц (np.float64 или np.float32); None - тип values, если он вещественный.
+        :param baseline: Значение опорного начала координат по всем критериям или None.
+        :param sources: Названия источников.
+        :param city_sources: Номер источника каждого города или None.
+        :param city_labels: Названия городов без источника или None.
+        """
+        self.city_names = np.asarray(city_names, dtype=str)
+        self.criteria_names = tuple(criteria_names)
+        self.values = self._as_matrix(values, dtype)
+        if self.values.shape != (len(self.city_names), len(self.criteria_names)):
+            raise ValueError(f"Размер матрицы {self.values.shape} не совпадает с числом городов и критериев "
+                             f"({len(self.city_names)} × {len(self.criteria_names)}).")
+        self.baseline = baseline
+        self.sources = tuple(sources)
+        self.city_sources = None if city_sources is None else np.asarray(city_sources, dtype=np.int32)
+        self.city_labels = None if city_labels is None else np.asarray(city_labels, dtype=str)
+        self.normalized_values = None
+        if normalized_values is not None:
+            self.set_normalized(normalized_values)
+
+        # Индексы "город → номер строки" (при повторах - первая строка) и "критерий → номер столбца"
+        self.city_index = {}
+        for position, city_name in enumerate(self.city_names.tolist()):
+            self.city_index.setdefault(city_name, position)
+        self.criteria_index = {criterion: j for j, criterion in enumerate(self.criteria_names)}
+
+        self.spheres_layout = {}
+        self.set_spheres(spheres_mapping or {})
+
+    @staticmethod
+    def _as_matrix(matrix, dtype=None):
+        """Приводит матрицу к вещественному типу; массив нужного типа (в том числе np.memmap) не копируется."""
+        if dtype is None:
+            dtype = matrix.dtype if isinstance(matrix, np.ndarray) and matrix.dtype.kind == 'f' else np.float64
+        if isinstance(matrix, np.ndarray) and matrix.dtype == dtype:
+            return matrix
+        return np.asarray(matrix, dtype=dtype)
+
+    @property
+    def dtype(self):
+        """Тип значений матриц."""
+        return self.values.dtype
+
+    @property
+    def nbytes(self):
+        """Объем матриц и названий городов в байтах (для np.memmap - размер данных на диске)."""
+        total = self.values.nbytes + self.city_names.nbytes
+        if self.normalized_values is not None:
+            total += self.normalized_values.nbytes
+        return total
+
+    def __len__(self):
+        return len(self.city_names)
+
+    def set_normalized(self, normalized_values):
+        """Сохраняет нормализованные значения (приводятся к типу исходной матрицы)."""
+        normalized_values = self._as_matrix(normalized_values, self.dtype)
+        if normalized_values.shape != self.values.shape:
+            raise ValueError(f"Размер нормализованной матрицы {normalized_values.shape} "
+                             f"не совпадает с исходной {self.values.shape}.")
+        self.normalized_values = normalized_values
+
+    def set_spheres(self, spheres_mapping):
+        """
+        Определяет для каждой сферы ее критерии и номера их столбцов.
+        Если критерии сферы идут подряд (после упорядочивания столбцов в FileManager.load_excel),
+        вместо списка номеров хранится срез - выборка значений города становится представлением
+        строки матрицы без копирования.
+        :param spheres_mapping: Словарь {сфера: список критериев}.
+        """
+        self.spheres_layout = {}
+        for sphere, criteria in spheres_mapping.items():
+            criteria = tuple(criterion for criterion in criteria if criterion in self.criteria_index)
+            columns = [self.criteria_index[criterion] for criterion in criteria]
+            if columns and columns == list(range(columns[0], columns[0] + len(columns))):
+                columns = slice(columns[0], columns[0] + len(columns))
+            self.spheres_layout[sphere] = (criteria, columns)
+
+    def get_position(self, city_name):
+        """Номер строки города или None, если город не найден."""
+        return self.city_index.get(city_name)
+
+    def get_source(self, position):
+        """Название источника города или None, если источник один."""
+        if self.city_sources is None:
+            return None
+        return self.sources[self.city_sources[position]]
+
+    def get_label(self, position):
+        """Название города без источника."""
+        names = self.city_labels if self.city_labels is not None else self.city_names
+        return names[position].item()
+
+    def get_city_spheres_data(self, position, normalized=True):
+        """
+        Значения критериев города, сгруппированные по сферам.
+        :param position: Номер строки города.
+        :param normalized: True - нормализованные значения, False - исходные.
+        :return: Словарь {сфера: CitySphereData}.
+        """
+        city_values = (self.normalized_values if normalized else self.values)[position]
+        return {
+            sphere: CitySphereData(criteria, city_values[columns])
+            for sphere, (criteria, columns) in self.spheres_layout.items()
+        }
+
+    def get_rows(self, city_names, normalized=True):
+        """
+        Значения нескольких городов одной матрицей float64.
+        :param city_names: Список названий городов.
+        :param normalized: True - нормализованные значения, False - исходные.
+        :return: Двумерный массив (города × критерии) в порядке city_names; для отсутствующих городов - NaN.
+        """
+        source = self.normalized_values if normalized else self.values
+        positions = [self.city_index.get(city_name) for city_name in city_names]
+        found = [i for i, position in enumerate(positions) if position is not None]
+
+        matrix = np.full((len(city_names), len(self.criteria_names)), np.nan)
+        matrix[found] = source[[positions[i] for i in found]]
+        return matrix
+
+    def to_frame(self, normalized=False):
+        """
+        Таблица pandas (столбец "Город" и столбцы критериев; у нормализованных - с суффиксом "_норм").
+        Строится по запросу (для сохранения в Excel и вывода), модель ее не хранит.
+        :return: DataFrame или None, если нормализованных значений еще нет.
+        """
+        import pandas as pd
+
+        source = self.normalized_values if normalized else self.values
+        if source is None:
+            return None
+        suffix = "_норм" if normalized else ""
+        columns = {"Город": self.city_names.astype(object)}
+        for j, criterion in enumerate(self.criteria_names):
+            columns[f"{criterion}{suffix}"] = source[:, j]
+        return pd.DataFrame(columns)
+
+    @classmethod
+    def from_frame(cls, data, spheres_mapping=None, dtype=None, baseline=None):
+        """
+        Модель из таблицы pandas со столбцом "Город" и столбцами критериев.
+        Нечисловые значения критериев заменяются на NaN.
+        :param baseline: Значение опорного начала координат по всем критериям или None.
+        """
+        import pandas as pd
+
+        criteria = data.drop(columns=['Город'])
+        try:
+            # Быстрый путь: все значения уже числовые (или NaN)
+            values = criteria.to_numpy(dtype=dtype or np.float64)
+        except (TypeError, ValueError):
+            values = criteria.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=dtype or np.float64)
+        return cls(data['Город'].tolist(), list(criteria.columns), values, spheres_mapping, baseline=baseline)
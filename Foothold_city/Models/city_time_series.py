@@ -0,0 +1,160 @@
+import numpy as np
+
+
+class CityTimeSeries:
+    """
+    Данные одних и тех же городов по годам и результаты их расчета:
+        - years: названия лет (листов или книг) по порядку;
+        - city_names: названия городов - объединение городов всех лет в порядке первого появления;
+        - criteria_names: кортеж названий критериев; spheres_mapping - словарь {сфера: список критериев};
+        - values: куб исходных значений (годы × города × критерии); строки городов, которых нет в году, - NaN;
+        - present: матрица (годы × города), True - город есть в данных года;
+        - baseline: значение опорного начала координат "Г0" (см. CityDataModel.baseline).
+
+    Результаты расчета (DataAnalysis.analyze_time_series), по годам:
+        - normalized, filled: кубы нормированных и заполненных нормированных значений;
+        - filled_mask: куб дополненных ячеек; areas: площади фигур (годы × города);
+        - orders: номер порядка опорного города (годы × города; 0 - город отсутствует или год не рассчитан);
+        - scores: значение value результата сортировки (годы × города);
+        - method: метод сортировки, которым рассчитаны orders.
+    Номера лет, данные которых изменились после расчета (set_year), хранятся в stale -
+    пересчитываются только они.
+    """
+
+    def __init__(self, years, city_names, criteria_names, values, present=None, spheres_mapping=None, baseline=None):
+        """
+        :param years: Названия лет.
+        :param city_names: Названия городов (по второй оси куба).
+        :param criteria_names: Названия критериев (по третьей оси куба).
+        :param values: Куб исходных значений (годы × города × критерии).
+        :param present: Матрица присутствия городов (годы × города); None - города без значений считаются отсутствующими.
+        :param spheres_mapping: Словарь {сфера: список критериев}.
+        :param baseline: Значение опорного начала координат или None.
+        """
+        self.years = [str(year) for year in years]
+        self.city_names = [str(city_name) for city_name in city_names]
+        self.criteria_names = tuple(criteria_names)
+        self.values = np.asarray(values, dtype=np.float64)
+        if self.values.shape != (len(self.years), len(self.city_names), len(self.criteria_names)):
+            raise ValueError(f"Размер куба {self.values.shape} не совпадает с числом лет, городов и критериев "
+                             f"({len(self.years)} × {len(self.city_names)} × {len(self.criteria_names)}).")
+        if present is None:
+            present = ~np.isnan(self.values).all(axis=2)
+        self.present = np.asarray(present, dtype=bool)
+        self.spheres_mapping = {sphere: list(criteria) for sphere, criteria in (spheres_mapping or {}).items()}
+        self.baseline = baseline
+        self.city_index = {city_name: i for i, city_name in enumerate(self.city_names)}
+
+        self.method = None
+        self.normalized = np.full(self.values.shape, np.nan)
+        self.filled = np.full(self.values.shape, np.nan)
+        self.filled_mask = np.zeros(self.values.shape, dtype=bool)
+        self.areas = np.full(self.present.shape, np.nan)
+        self.orders = np.zeros(self.present.shape, dtype=np.int8)
+        self.scores = np.full(self.present.shape, np.nan)
+        self.stale = set(range(len(self.years)))
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Ряд по годам из модели нескольких листов (FileManager.load_excel_files): каждый источник - год,
+        города разных лет сопоставляются по названию без источника.
+        :param model: CityDataModel.
+        """
+        labels = (model.city_labels if model.city_labels is not None else model.city_names).tolist()
+        if model.city_sources is None:
+            years = list(model.sources[:1]) or [""]
+            year_positions = np.zeros(len(labels), dtype=np.intp)
+        else:
+            years = list(model.sources)
+            year_positions = model.city_sources.astype(np.intp)
+
+        city_index = {}
+        for label in labels:
+            city_index.setdefault(label, len(city_index))
+        city_positions = np.fromiter((city_index[label] for label in labels), dtype=np.intp, count=len(labels))
+
+        values = np.full((len(years), len(city_index), len(model.criteria_names)), np.nan)
+        present = np.zeros((len(years), len(city_index)), dtype=bool)
+        # Повтор города в одном году: используется первая строка, как в индексе городов модели
+        rows = np.arange(len(labels))[::-1]
+        values[year_positions[rows], city_positions[rows]] = model.values[rows]
+        present[year_positions, city_positions] = True
+        spheres_mapping = {sphere: list(criteria) for sphere, (criteria, columns) in model.spheres_layout.items()}
+        return cls(years, list(city_index), model.criteria_names, values, present, spheres_mapping, model.baseline)
+
+    def year_index(self, year):
+        """Номер года или None, если года нет в ряду."""
+        year = str(year)
+        return self.years.index(year) if year in self.years else None
+
+    def spheres_columns(self):
+        """Столбцы критериев каждой сферы (см. FileManager.get_spheres_columns)."""
+        criteria_index = {criterion: j for j, criterion in enumerate(self.criteria_names)}
+        spheres = {}
+        for sphere, criteria in self.spheres_mapping.items():
+            columns = [criteria_index[criterion] for criterion in criteria if criterion in criteria_index]
+            if columns:
+                spheres[sphere] = columns
+        return spheres
+
+    def set_year(self, year, city_names, values):
+        """
+        Заменяет данные одного года (или добавляет новый год в конец ряда) и отмечает его для пересчета.
+        Новые города добавляются в конец списка городов, для остальных лет они отсутствуют.
+        :param year: Название года.
+        :param city_names: Названия городов года.
+        :param values: Матрица значений (города × критерии) в порядке criteria_names.
+        :return: Номер года.
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(len(city_names), len(self.criteria_names))
+        new_cities = [city_name for city_name in dict.fromkeys(map(str, city_names))
+                      if city_name not in self.city_index]
+        if new_cities:
+            self._grow(cities=len(new_cities))
+            for city_name in new_cities:
+                self.city_index[city_name] = len(self.city_names)
+                self.city_names.append(city_name)
+
+        y = self.year_index(year)
+        if y is None:
+            self._grow(years=1)
+            self.years.append(str(year))
+            y = len(self.years) - 1
+
+        positions = np.fromiter((self.city_index[str(city_name)] for city_name in city_names), dtype=np.intp,
+                                count=len(city_names))
+        rows = np.arange(len(positions))[::-1]  # при повторе города - первая строка
+        self.values[y] = np.nan
+        self.values[y, positions[rows]] = values[rows]
+        self.present[y] = False
+        self.present[y, positions] = True
+        self.stale.add(y)
+        return y
+
+    def _grow(self, years=0, cities=0):
+        """Увеличивает кубы и матрицы на years лет и cities городов (новые ячейки - пустые)."""
+        def grow(array, fill):
+            shape = (array.shape[0] + years, array.shape[1] + cities) + array.shape[2:]
+            grown = np.full(shape, fill, dtype=array.dtype)
+            grown[:array.shape[0], :array.shape[1]] = array
+            return grown
+
+        self.values = grow(self.values, np.nan)
+        self.present = grow(self.present, False)
+        self.normalized = grow(self.normalized, np.nan)
+        self.filled = grow(self.filled, np.nan)
+        self.filled_mask = grow(self.filled_mask, False)
+        self.areas = grow(self.areas, np.nan)
+        self.orders = grow(self.orders, 0)
+        self.scores = grow(self.scores, np.nan)
+
+    def get_city_orders(self, city_name):
+        """
+        Порядки опорного города по годам.
+        :return: Словарь {год: номер порядка 1-4} (годы, где города нет, пропускаются) или None, если город не найден.
+        """
+        i = self.city_index.get(city_name)
+        if i is None:
+            return None
+        return {year: int(order) for year, order in zip(self.years, self.orders[:, i].tolist()) if order}
@@ -1,3 +1,4 @@
+import os
 
 """Установка глобальных параметров для шрифта"""
 font_family = 'serif'       #семейство шрифтов
@@ -8,6 +9,27 @@ font_size = 14  # Размер шрифта по умолчанию
 subplots_figsize_width = 50 #ширина графика
 subplots_figsize_heigh = 50 #высота графика
 
+"""растеризация графика"""
+#   True - разрешение подбирается под фактический размер виджета (фигура вписывается в окно),
+#          при увеличении масштаба в окне графика изображение перерисовывается с большим разрешением
+#   False - фигура растеризуется целиком с разрешением 100 точек на дюйм (5000×5000 пикселей)
+figure_adaptive_size = True
+figure_max_render_pixels = 5000 #наибольшая сторона растрового изображения графика в пикселях
+figure_refine_delay_ms = 200 #задержка перерисовки с большим разрешением после последнего изменения масштаба (мс)
+figure_cached_levels = 3 #сколько растровых изображений разных разрешений хранить для мгновенного масштабирования
+
+"""веса для метода сортировки "Взвешенная площадь" (значение критерия умножается на вес сферы и вес критерия)"""
+sphere_weights = {
+    "Политическая": 1,
+    "Экономическая": 1,
+    "Социальная": 1,
+    "Духовная": 1,
+}
+criteria_weights = {} #название критерия -> вес (по умолчанию 1), например {"Население": 2}
+
+"""запуск программы"""
+startup_import_budget_ms = 150 #допустимое время импорта модулей до появления главного окна (мс), см. benchmark_startup_imports
+
 """максимальная длина строки (для названия осей критериев)"""
 fun_split_max_chars_per_line = 15
 
@@ -37,5 +59,28 @@ labels_offset_y = 1.18  # Добавляем смещение от конца о
 #   True - есть штриховка
 fill_polygon = False
 
+"""Загрузка файлов Excel"""
+#   True - потоковое чтение (openpyxl, read_only), False - чтение через pandas
+excel_fast_loading = True
+#   True - разобранные файлы сохраняются в дисковый кэш, повторное открытие неизмененного файла не разбирает Excel
+excel_cache_enabled = True
+#   True - загружаются все листы выбранных книг (например, по листу на год или регион), False - только первый лист;
+#          города нескольких листов и книг различаются по источнику: "Город 1 (2020)"; листы без городов
+#          и листы с другими заголовками (служебные) пропускаются с сообщением в строке состояния
+excel_all_sheets = False
+#   тип значений критериев в памяти: 'float64' или 'float32' (вдвое меньше памяти, точность ~7 значащих цифр)
+data_values_dtype = 'float64'
+
+"""Сохранение сеанса (данные, выбранные города и результат сортировки), см. SessionStore"""
+#   True - при закрытии программы сеанс сохраняется в session_autosave_path (по умолчанию выключено:
+#          сеанс сохраняется только вручную, Ctrl+S)
+session_autosave = False
+#   True - при запуске программы восстанавливается сеанс из session_autosave_path (Excel не перечитывается)
+session_restore_on_start = False
+session_autosave_path = os.path.join(os.path.expanduser("~"), ".foothold_city", "last_session.fcsession")
+#   True - значения открытого сеанса не читаются в память, а отображаются из файла (np.memmap), что позволяет
+#          просматривать данные больше объема ОЗУ; в Windows файл сеанса нельзя перезаписать, пока он открыт
+session_memmap = False
+
 """путь хранения иконки приложения"""
 icon_path = "Foothold_city/icon.ico"
\ No newline at end of file
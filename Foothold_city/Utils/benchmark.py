@@ -0,0 +1,547 @@
+"""
+Замеры производительности вычислительных этапов программы: только время и память.
+Совпадение результатов с прежними реализациями (legacy_reference.py) проверяют тесты: python -m pytest
+
+Запуск (эталоны прежних реализаций входят в пакет, каталог tests не нужен):
+    python -m Foothold_city.Utils.benchmark
+
+Код возврата 1, если запуск программы не укладывается в бюджет startup_import_budget_ms
+или загружает тяжелые пакеты (см. benchmark_startup_imports).
+"""
+import glob
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from Foothold_city.Resources.const import startup_import_budget_ms
+from Foothold_city.Utils.data_analysis import DataAnalysis
+from Foothold_city.Utils.excel_reader import ExcelReader
+from Foothold_city.Utils.file_manager import FileManager
+from Foothold_city.Utils.label_placer import LabelPlacer
+from Foothold_city.Utils.session_store import SessionStore
+from Foothold_city.Utils.synthetic_data import (make_scaled_workbook, make_synthetic_cities_values,
+                                                make_synthetic_data, make_synthetic_labels, make_synthetic_sheet,
+                                                make_synthetic_spheres, make_synthetic_values, make_synthetic_years)
+from Foothold_city.Utils.legacy_reference import (legacy_fill_data, legacy_normalize_data, legacy_place_labels,
+                                                   legacy_polygon_area, legacy_sort_variant_1,
+                                                   legacy_sort_variant_2)
+
+
+def _measure(function, repeat=3):
+    """Возвращает лучшее время выполнения функции (в секундах) и ее результат."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark_normalize_data(sizes=((100, 20), (1000, 100), (3000, 300))):
+    """
+    Сравнивает время прежней и векторизованной нормализации.
+    :param sizes: Набор размеров (городов, критериев).
+    """
+    print("Нормализация данных (города × критерии): прежняя / векторизованная")
+    for cities_count, criteria_count in sizes:
+        data = make_synthetic_data(cities_count, criteria_count)
+        file_manager = FileManager()
+        file_manager.data = data
+
+        def normalize():
+            # Замена данных строит новую модель - замер включает построение матрицы и индекса
+            file_manager.data = data
+            return file_manager.normalize_data()
+
+        with warnings.catch_warnings():
+            # Прежняя реализация добавляет столбцы по одному, pandas предупреждает о фрагментации
+            warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+            legacy_time, _ = _measure(lambda: legacy_normalize_data(data), repeat=1)
+        vector_time, _ = _measure(normalize)
+        print(f"  {cities_count:>6} × {criteria_count:<4}: {legacy_time * 1000:10.1f} мс / "
+              f"{vector_time * 1000:8.1f} мс (x{legacy_time / vector_time:.0f})")
+
+
+def benchmark_score_cities(sizes=((100, 50), (2000, 100), (2000, 300))):
+    """
+    Сравнивает прежний поэлементный расчет (заполнение пропусков и площадь по каждому городу)
+    с пакетным DataAnalysis.score_cities.
+    :param sizes: Набор размеров (городов, критериев).
+    """
+    print("Заполнение пропусков и площади (города × критерии): по городам / пакетно")
+    for cities_count, criteria_count in sizes:
+        file_manager = FileManager()
+        file_manager.data = make_synthetic_data(cities_count, criteria_count, nan_share=0.3)
+        file_manager.normalize_data()
+        city_names = file_manager.get_city_names()
+        criteria_names = file_manager.get_criteria_names()
+        matrix = file_manager.get_cities_normalized_matrix(city_names)
+
+        def legacy():
+            return [legacy_polygon_area(legacy_fill_data(row, criteria_names)[0]) for row in matrix.tolist()]
+
+        legacy_time, _ = _measure(legacy, repeat=1)
+        batch_time, _ = _measure(lambda: DataAnalysis.score_cities(matrix, criteria_names))
+        print(f"  {cities_count:>6} × {criteria_count:<4}: {legacy_time * 1000:10.1f} мс / "
+              f"{batch_time * 1000:8.1f} мс (x{legacy_time / batch_time:.0f})")
+
+
+def benchmark_fill_data(sizes=((10, 500), (1000, 200), (20000, 100)), nan_share=0.5):
+    """
+    Сравнивает прежнее заполнение пропусков по городам с линейным пакетным fill_matrix
+    на разреженных данных.
+    :param sizes: Набор размеров (городов, критериев).
+    :param nan_share: Доля пропущенных значений.
+    """
+    print(f"Заполнение пропусков, доля NaN {nan_share:.0%} (города × критерии): по городам / пакетно")
+    for cities_count, criteria_count in sizes:
+        matrix = make_synthetic_values((cities_count, criteria_count), high=10, nan_share=nan_share)
+        criteria_names = [f"Критерий {j}" for j in range(criteria_count)]
+        rows = matrix.tolist()
+
+        legacy_time, _ = _measure(lambda: [legacy_fill_data(row, criteria_names) for row in rows], repeat=1)
+        batch_time, _ = _measure(lambda: DataAnalysis.fill_matrix(matrix))
+        print(f"  {cities_count:>6} × {criteria_count:<4}: {legacy_time * 1000:10.1f} мс / "
+              f"{batch_time * 1000:8.1f} мс (x{legacy_time / batch_time:.0f})")
+
+
+def benchmark_polygon_area(sizes=((1, 100), (2000, 100), (100000, 50))):
+    """
+    Сравнивает прежний расчет площади по городам с пакетной замкнутой формулой.
+    :param sizes: Набор размеров (городов, критериев).
+    """
+    print("Площадь многоугольника (города × критерии): по городам / пакетно")
+    for cities_count, criteria_count in sizes:
+        matrix = make_synthetic_values((cities_count, criteria_count), high=10, decimals=15)
+        rows = matrix.tolist()
+
+        legacy_time, _ = _measure(lambda: [legacy_polygon_area(row) for row in rows], repeat=1)
+        batch_time, _ = _measure(lambda: DataAnalysis.calculate_polygon_areas(matrix))
+        print(f"  {cities_count:>6} × {criteria_count:<4}: {legacy_time * 1000:10.1f} мс / "
+              f"{batch_time * 1000:8.2f} мс (x{legacy_time / batch_time:.0f})")
+
+
+def benchmark_load_excel(sizes=((2000, 10), (10000, 20))):
+    """
+    Замеряет загрузку книг Resources/Data/*.xlsx, увеличенных синтетически:
+    pandas.read_excel / потоковое чтение openpyxl / повторное открытие из дискового кэша.
+    :param sizes: Набор размеров (городов, кратность увеличения числа критериев).
+    """
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Resources", "Data")
+    print("Загрузка Excel (города × критерии): pandas / потоковое чтение / кэш")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_dir = os.path.join(temp_dir, "cache")
+        for source_path in sorted(glob.glob(os.path.join(data_dir, "*.xlsx"))):
+            for cities_count, criteria_repeat in sizes:
+                target_path = os.path.join(temp_dir, f"scaled_{cities_count}_{criteria_repeat}.xlsx")
+                make_scaled_workbook(source_path, target_path, cities_count, criteria_repeat)
+
+                pandas_time, pandas_sheet = _measure(
+                    lambda: ExcelReader.read_sheet(target_path, fast=False), repeat=1)
+                fast_time, _ = _measure(
+                    lambda: ExcelReader.read_sheet(target_path, fast=True), repeat=1)
+                ExcelReader.read_sheet(target_path, fast=True, cache_dir=cache_dir)
+                cache_time, _ = _measure(
+                    lambda: ExcelReader.read_sheet(target_path, fast=True, cache_dir=cache_dir))
+                size_mb = os.path.getsize(target_path) / 2 ** 20
+                print(f"  {os.path.basename(source_path):<16} {cities_count:>6} × {pandas_sheet[3].shape[1]:<4} "
+                      f"({size_mb:5.1f} МБ): {pandas_time * 1000:8.0f} мс / {fast_time * 1000:8.0f} мс / "
+                      f"{cache_time * 1000:6.1f} мс")
+
+
+def benchmark_load_excel_files(files_count=4, cities_count=5000, criteria_repeat=4, workers=(1, None)):
+    """
+    Замеряет загрузку нескольких книг в одну модель (FileManager.load_excel_files) без дискового кэша:
+    последовательно (workers=1) и в пуле потоков. Разбор openpyxl выполняется под GIL, поэтому
+    выигрыш пула зависит от доли чтения и распаковки файла.
+    :param files_count: Количество книг (увеличенные копии Resources/Data/data_var_1.xlsx).
+    :param cities_count: Количество городов в каждой книге.
+    :param criteria_repeat: Во сколько раз увеличить число критериев.
+    :param workers: Варианты числа потоков.
+    """
+    import contextlib
+    import io
+
+    source_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Resources", "Data", "data_var_1.xlsx")
+    print(f"Загрузка {files_count} книг по {cities_count} городов в одну модель: "
+          + " / ".join("последовательно" if count == 1 else f"потоков: {count or 'по умолчанию'}"
+                       for count in workers))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = []
+        for k in range(files_count):
+            paths.append(os.path.join(temp_dir, f"region_{k}.xlsx"))
+            make_scaled_workbook(source_path, paths[-1], cities_count, criteria_repeat, seed=k)
+
+        timings = []
+        for count in workers:
+            file_manager = FileManager()
+            with contextlib.redirect_stdout(io.StringIO()):
+                load_time, model = _measure(lambda: file_manager.load_excel_files(paths, sheet_name=0, use_cache=False,
+                                                                                  workers=count), repeat=1)
+            timings.append(load_time)
+        print(f"  {len(model)} × {len(model.criteria_names)}: "
+              + " / ".join(f"{seconds * 1000:.0f} мс" for seconds in timings))
+
+
+def benchmark_render_cities(cities_counts=(1, 10, 50), criteria_count=100, per_city_frames_limit=10, plot_size=800):
+    """
+    Замеряет отрисовку графика VisualizationWidget: добавление городов и полный кадр (canvas.draw).
+    :param cities_counts: Набор количеств городов на графике.
+    :param criteria_count: Количество критериев у каждого города.
+    :param per_city_frames_limit: До скольких городов замерять добавление по одному с кадром после каждого.
+    :param plot_size: Сторона области графика в пикселях.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    from Foothold_city.Views.visualization import VisualizationWidget
+
+    print(f"Отрисовка графика (городов × {criteria_count} критериев): по одному с кадром после каждого / add_cities / кадр / "
+          f"переключение подписей / всплывающее окно по общей модели / повторное открытие")
+    for cities_count in cities_counts:
+        cities = make_synthetic_spheres(cities_count, criteria_count)
+        bulk_widget = VisualizationWidget()
+        bulk_widget.set_plot_size(plot_size, plot_size)
+        bulk_time, _ = _measure(lambda: (bulk_widget.add_cities({name: data for name, *data in cities}),
+                                         bulk_widget.canvas.draw()), repeat=1)
+        widget = VisualizationWidget()
+        widget.set_plot_size(plot_size, plot_size)
+        if cities_count <= per_city_frames_limit:
+            add_time, _ = _measure(lambda: [(widget.add_city_data(*city), widget.canvas.draw()) for city in cities],
+                                   repeat=1)
+            add_text = f"{add_time * 1000:8.0f} мс"
+        else:
+            widget.add_cities({name: data for name, *data in cities})
+            add_text = f"{'—':>8}   "
+        frame_time, _ = _measure(widget.canvas.draw)
+        toggle_time, _ = _measure(lambda: (widget.toggle_city_values(cities[0][0], 0), widget.canvas.draw()), repeat=1)
+
+        def open_popup():
+            popup = VisualizationWidget(model=widget.model)
+            popup.set_plot_size(plot_size, plot_size)
+            popup.canvas.draw()
+            return popup
+        popup_time, popup = _measure(open_popup, repeat=1)
+        reopen_time, _ = _measure(popup.sync)
+        print(f"  {cities_count:>4} × {criteria_count}: {add_text} / {bulk_time * 1000:8.0f} мс / "
+              f"{frame_time * 1000:8.0f} мс / "
+              f"{toggle_time * 1000:8.0f} мс / {popup_time * 1000:8.0f} мс / {reopen_time * 1000:6.3f} мс")
+        for view in (widget, bulk_widget, popup):
+            view.plot.close(view.figure)
+            view.deleteLater()
+    app.processEvents()
+
+
+def benchmark_figure_size(cities_count=10, criteria_count=100, plot_sizes=(600, 900), render_scales=(1, 2, 4, 8)):
+    """
+    Сравнивает растеризацию графика фиксированного размера (50×50 дюймов при dpi по умолчанию)
+    и подстраиваемой под размер виджета и масштаб просмотра: время кадра и объем растрового буфера.
+    :param plot_sizes: Стороны области графика в пикселях.
+    :param render_scales: Масштабы просмотра (QGraphicsView).
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    from Foothold_city.Views.visualization import VisualizationWidget
+
+    cities = {name: data for name, *data in make_synthetic_spheres(cities_count, criteria_count)}
+
+    def report(title, widget):
+        frame_time, _ = _measure(widget.canvas.draw)
+        buffer = widget.canvas.buffer_rgba()  # растр последней отрисовки (с учетом уровня детализации)
+        height, width = buffer.shape[:2]
+        buffer_bytes = buffer.nbytes
+        print(f"  {title:<28}: {width:>5}×{height:<5} / {buffer_bytes / 2 ** 20:8.1f} МБ / {frame_time * 1000:7.0f} мс")
+
+    print(f"Растеризация графика ({cities_count} городов × {criteria_count} критериев): растр / буфер / кадр")
+    widgets = []
+    fixed_widget = VisualizationWidget(adaptive_size=False)
+    fixed_widget.add_cities(cities)
+    report("фиксированный размер", fixed_widget)
+    widgets.append(fixed_widget)
+    for plot_size in plot_sizes:
+        widget = VisualizationWidget(adaptive_size=True)
+        widget.add_cities(cities)
+        widget.set_plot_size(plot_size, plot_size)
+        for render_scale in render_scales:
+            widget.set_render_scale(render_scale)
+            report(f"{plot_size} пикс., масштаб {render_scale}", widget)
+        widgets.append(widget)
+    for widget in widgets:
+        widget.plot.close(widget.figure)
+        widget.deleteLater()
+    app.processEvents()
+
+
+def benchmark_ranking(cities_counts=(10, 100, 1000, 10000, 100000), criteria_count=20):
+    """
+    Сравнивает время прежних sort_variant_1/sort_variant_2 и реализации на массивах.
+    Для новой реализации приведено время sort_variant_* (со словарем городов)
+    и время самого расчета rank_variant_* на массивах.
+    :param cities_counts: Набор количеств городов.
+    :param criteria_count: Количество критериев.
+    """
+    print(f"Сортировка городов (городов × {criteria_count} критериев): прежняя / sort_variant / rank_variant")
+    for cities_count in cities_counts:
+        cities_values = make_synthetic_cities_values(cities_count, criteria_count)
+        _, values, full_data = DataAnalysis._cities_arrays(cities_values)
+        row = []
+        for legacy_sort, sort, rank in ((legacy_sort_variant_1, DataAnalysis.sort_variant_1, DataAnalysis.rank_variant_1),
+                                        (legacy_sort_variant_2, DataAnalysis.sort_variant_2, DataAnalysis.rank_variant_2)):
+            legacy_time, _ = _measure(lambda: legacy_sort(cities_values), repeat=1)
+            new_time, _ = _measure(lambda: sort(cities_values))
+            rank_time, _ = _measure(lambda: rank(values, full_data))
+            row.append(f"{legacy_time * 1000:8.2f} / {new_time * 1000:7.2f} / {rank_time * 1000:7.2f} мс")
+        print(f"  {cities_count:>7}: вариант 1 {row[0]};  вариант 2 {row[1]}")
+
+
+def benchmark_ranking_methods(cities_counts=(100, 10000, 100000), criteria_count=20, spheres_count=4):
+    """
+    Замеряет каждый метод реестра DataAnalysis.ranking_methods на синтетической матрице.
+    :param cities_counts: Набор количеств городов.
+    :param criteria_count: Количество критериев (делятся между сферами поровну).
+    :param spheres_count: Количество сфер.
+    """
+    names = list(DataAnalysis.ranking_methods)
+    print(f"Методы сортировки (городов × {criteria_count} критериев), мс: {' / '.join(names)}")
+    for cities_count in cities_counts:
+        matrix = make_synthetic_values((cities_count, criteria_count), high=10)
+        areas = DataAnalysis.calculate_polygon_areas(matrix)
+        city_names = [f"Город {i}" for i in range(cities_count)]
+        criteria_names = [f"Критерий {j}" for j in range(criteria_count)]
+        bounds = np.linspace(0, criteria_count, spheres_count + 1).astype(int)
+        spheres = {f"Сфера {k}": slice(bounds[k], bounds[k + 1]) for k in range(spheres_count)}
+
+        times = []
+        for method_name in names:
+            method_time, _ = _measure(lambda: DataAnalysis.rank_cities(
+                method_name, city_names, areas, matrix, criteria_names, spheres))
+            times.append(f"{method_time * 1000:.1f}")
+        print(f"  {cities_count:>7}: {' / '.join(times)}")
+
+
+def benchmark_session_store(sizes=((10000, 20), (100000, 20), (100000, 100))):
+    """
+    Замеряет сохранение и восстановление сеанса (SessionStore). Для сравнения приведено время нормализации, которую
+    восстановление сеанса не выполняет (чтение Excel - см. benchmark_load_excel).
+    :param sizes: Набор размеров (городов, критериев).
+    """
+    print("Сеанс (города × критерии): сохранение / восстановление / восстановление через memmap / "
+          "нормализация / размер файла")
+    with tempfile.TemporaryDirectory() as directory:
+        session_path = os.path.join(directory, f"session{SessionStore.EXTENSION}")
+        for cities_count, criteria_count in sizes:
+            file_manager = FileManager()
+            file_manager.data = make_synthetic_data(cities_count, criteria_count)
+            file_manager.spheres_mapping["Политическая"] = [column for column in file_manager.data.columns
+                                                            if column != 'Город']
+            normalize_time, _ = _measure(file_manager.normalize_data, repeat=1)
+            city_names = file_manager.get_city_names()
+            matrix = file_manager.get_cities_normalized_matrix(city_names)
+            full_matrix, filled_mask, areas = DataAnalysis.score_cities(matrix, file_manager.get_criteria_names())
+            results = DataAnalysis.rank_cities("Вариант 1", city_names, areas, full_matrix,
+                                               file_manager.get_criteria_names())
+            sort = {"method": "Вариант 1", "results": results, "filled_criteria": []}
+
+            save_time, _ = _measure(lambda: SessionStore.save(session_path, file_manager, None, city_names[:10], sort))
+            load_time, _ = _measure(lambda: SessionStore.load(session_path))
+            mmap_time, _ = _measure(lambda: SessionStore.load(session_path, mmap=True))
+            size_mb = os.path.getsize(session_path) / 2 ** 20
+            print(f"  {cities_count:>7} × {criteria_count:<4}: {save_time * 1000:7.1f} / {load_time * 1000:7.1f} / "
+                  f"{mmap_time * 1000:7.1f} / {normalize_time * 1000:7.1f} мс / {size_mb:6.1f} МБ")
+
+
+def benchmark_data_model(sizes=((100000, 20), (100000, 100)), dtypes=("float64", "float32")):
+    """
+    Замеряет память загрузки и нормализации (FileManager.load_sheet + normalize_data) через tracemalloc:
+    сколько памяти остается занятым после загрузки и пиковое потребление. Разобранный лист создается
+    до начала замера. Для сеанса, открытого через np.memmap, значения в замер не попадают - они
+    остаются в файле и читаются по мере обращения.
+    :param sizes: Набор размеров (городов, критериев).
+    :param dtypes: Типы значений модели.
+    """
+    import contextlib
+    import io
+    import tracemalloc
+
+    print("Память модели данных (города × критерии, тип): размер матрицы / занято после загрузки / пик / "
+          "занято сеансом через memmap")
+    with tempfile.TemporaryDirectory() as directory:
+        session_path = os.path.join(directory, f"session{SessionStore.EXTENSION}")
+        for cities_count, criteria_count in sizes:
+            sheet = make_synthetic_sheet(cities_count, criteria_count)
+            for dtype in dtypes:
+                file_manager = FileManager()
+                tracemalloc.start()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    file_manager.load_sheet(*sheet, dtype=dtype)
+                    file_manager.normalize_data()
+                retained, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                SessionStore.save(session_path, file_manager)
+                del file_manager
+                tracemalloc.start()
+                restored, _ = SessionStore.load(session_path, mmap=True)
+                mapped, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                del restored
+
+                print(f"  {cities_count:>7} × {criteria_count:<4} {dtype}: {sheet[3].nbytes / 2 ** 20:6.1f} / "
+                      f"{retained / 2 ** 20:6.1f} / {peak / 2 ** 20:6.1f} / {mapped / 2 ** 20:6.1f} МБ")
+
+
+def measure_import_time(modules, repeat=5):
+    """
+    Замеряет импорт модулей в отдельном процессе через python -X importtime.
+    :param modules: Имена модулей, импортируемых в одной строке import.
+    :return: Кортеж (медиана общего времени импорта в мс,
+        {модуль верхнего уровня: время с учетом вложенных импортов в мс} последнего запуска,
+        множество всех загруженных модулей, включая вложенные импорты).
+    """
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    command = [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"]
+    totals = []
+    top_level = {}
+    loaded = set()
+    for _ in range(repeat):
+        completed = subprocess.run(command, cwd=project_root, capture_output=True, text=True, check=True)
+        total = 0
+        top_level = {}
+        loaded = set()
+        for line in completed.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            total += int(self_us)
+            # Вложенные импорты выводятся с отступом, пакеты верхнего уровня (numpy, pandas) - тоже среди них
+            loaded.add(name.strip())
+            if not name.startswith("  "):  # импорт верхнего уровня (без отступа)
+                top_level[name.strip()] = int(cumulative_us) / 1000
+        totals.append(total / 1000)
+    return statistics.median(totals), top_level, loaded
+
+
+def benchmark_startup_imports(budget_ms=startup_import_budget_ms, heavy_modules=("numpy", "pandas", "matplotlib")):
+    """
+    Время импорта модулей, нужных до появления главного окна (main.py), и модулей,
+    которые загружаются при первом открытии файла и построении графика.
+    :param budget_ms: Допустимое время импорта при запуске.
+    :param heavy_modules: Пакеты, которые не должны загружаться при запуске.
+    :return: True, если запуск укладывается в бюджет и не загружает тяжелые пакеты.
+    """
+    startup_modules = ("Foothold_city.Views.foothold_city_view", "Foothold_city.Controllers.foothold_city_controller")
+    deferred_modules = ("Foothold_city.Utils.file_manager", "Foothold_city.Views.visualization")
+
+    startup_time, _, startup_loaded = measure_import_time(startup_modules)
+    full_time, full_top, _ = measure_import_time(startup_modules + deferred_modules)
+    loaded_heavy = [module for module in heavy_modules if module in startup_loaded]
+    within_budget = startup_time <= budget_ms and not loaded_heavy
+
+    print("Импорт модулей (python -X importtime, медиана)")
+    print(f"  до появления окна: {startup_time:7.1f} мс (бюджет {budget_ms} мс) - "
+          f"{'в пределах бюджета' if within_budget else 'бюджет превышен'}")
+    if loaded_heavy:
+        print(f"  при запуске загружаются: {', '.join(loaded_heavy)}")
+    print(f"  вместе с загрузкой файла и графиком: {full_time:7.1f} мс")
+    for name, cumulative_ms in sorted(full_top.items(), key=lambda item: -item[1])[:5]:
+        print(f"    {name:<40} {cumulative_ms:7.1f} мс")
+    return within_budget
+
+
+def benchmark_label_placement(sizes=((1, 100), (10, 100), (50, 100), (200, 100))):
+    """
+    Сравнивает подбор позиций подписей: перебор всех подписей / сетка LabelPlacer.
+    :param sizes: Набор размеров (городов, критериев); подписи всех городов размещаются совместно.
+    """
+    def place(labels):
+        placer = LabelPlacer(threshold=0.5)
+        return [placer.place(*label, max_attempts=10) for label in labels]
+
+    print("Размещение подписей (города × критерии): перебор / сетка")
+    for cities_count, criteria_count in sizes:
+        labels = make_synthetic_labels(cities_count, criteria_count)
+        legacy_time, _ = _measure(lambda: legacy_place_labels(labels), repeat=1)
+        grid_time, _ = _measure(lambda: place(labels))
+        print(f"  {cities_count:>4} × {criteria_count:<4}: {legacy_time * 1000:9.1f} мс / {grid_time * 1000:7.1f} мс "
+              f"(ускорение {legacy_time / grid_time:5.1f}x)")
+
+
+def benchmark_time_series(sizes=((10, 1000, 20), (20, 10000, 20), (10, 50000, 40)), method_name="Вариант 1"):
+    """
+    Сравнивает расчет ряда по годам: по году за раз, как в интерфейсе (load_sheet, normalize_data, score_cities,
+    rank_cities) / DataAnalysis.analyze_time_series по кубу (годы × города × критерии) / пересчет одного
+    измененного года. В каждом году часть городов отсутствует.
+    :param sizes: Набор размеров (лет, городов, критериев).
+    :param method_name: Метод сортировки.
+    """
+    import contextlib
+    import io
+
+    from Foothold_city.Models.city_time_series import CityTimeSeries
+
+    print(f"Ряд по годам ({method_name}): по годам / куб / пересчет одного года")
+    for years_count, cities_count, criteria_count in sizes:
+        years, sheets = make_synthetic_years(years_count, cities_count, criteria_count)
+
+        def per_year():
+            for sheet in sheets:
+                file_manager = FileManager()
+                file_manager.load_sheet(*sheet)
+                file_manager.normalize_data()
+                city_names = file_manager.get_city_names()
+                criteria_names = file_manager.get_criteria_names()
+                full_matrix, _, areas = DataAnalysis.score_cities(
+                    file_manager.get_cities_normalized_matrix(city_names), criteria_names)
+                DataAnalysis.rank_cities(method_name, city_names, areas, full_matrix, criteria_names,
+                                         file_manager.get_spheres_columns())
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            series = CityTimeSeries.from_model(FileManager().load_sheets(sheets, years))
+            loop_time, _ = _measure(per_year, repeat=1)
+
+        def cube():
+            series.method = None  # смена метода - пересчет всех лет
+            return DataAnalysis.analyze_time_series(series, method_name)
+
+        cube_time, _ = _measure(cube)
+
+        # Изменение данных последнего года (значения - в порядке критериев ряда)
+        headers, _, city_names, values = sheets[-1]
+        columns = [headers[1:].index(criterion) for criterion in series.criteria_names]
+        last_year = series.set_year(years[-1], city_names, values[:, columns] * 1.01)
+        update_time, _ = _measure(lambda: DataAnalysis.analyze_time_series(series, method_name, [last_year]))
+        transitions = DataAnalysis.order_transitions(series)
+        print(f"  {years_count:>3} × {cities_count:>6} × {criteria_count:<3}: {loop_time * 1000:8.1f} мс / "
+              f"{cube_time * 1000:7.1f} мс / {update_time * 1000:6.1f} мс "
+              f"(ускорение {loop_time / cube_time:4.1f}x, переходов между порядками: {len(transitions)})")
+
+
+if __name__ == "__main__":
+    startup_within_budget = benchmark_startup_imports()
+    benchmark_ranking()
+    benchmark_ranking_methods()
+    benchmark_session_store()
+    benchmark_data_model()
+    benchmark_time_series()
+    benchmark_normalize_data()
+    benchmark_score_cities()
+    benchmark_fill_data()
+    benchmark_polygon_area()
+    benchmark_load_excel()
+    benchmark_load_excel_files()
+    benchmark_label_placement()
+    benchmark_render_cities()
+    benchmark_figure_size()
+    if not startup_within_budget:
+        print(f"Ошибка: импорт при запуске превышает бюджет {startup_import_budget_ms} мс "
+              "или загружает тяжелые пакеты.", file=sys.stderr)
+    sys.exit(0 if startup_within_budget else 1)
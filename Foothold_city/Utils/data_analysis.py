@@ -1,65 +1,72 @@
+import functools
+
 import numpy as np
-import pandas as pd
+
+from Foothold_city.Resources.const import criteria_weights, sphere_weights
 
 
 class DataAnalysis:
 
+    @staticmethod
+    def normalize_matrix(matrix, scale=10, decimals=2, baseline=None):
+        """
+        Min-max нормализация матрицы критериев (города × критерии) по столбцам.
+        NaN сохраняются, постоянный столбец нормализуется в 0, столбец из одних NaN остается NaN.
+        Для массива большей размерности (например, годы × города × критерии) каждая матрица по последним
+        двум осям нормализуется отдельно.
+        :param matrix: Двумерный (или многомерный) массив числовых значений (float64 или float32).
+        :param scale: Верхняя граница шкалы нормализации.
+        :param decimals: Количество знаков после запятой при округлении.
+        :param baseline: Значение опорного начала координат (виртуальный город "Г0") для всех критериев
+            или None. Оно учитывается в min и max столбцов так же, как строка с этим значением, но в матрицу
+            не добавляется.
+        :return: Двумерный массив нормализованных значений той же формы (float32 для float32, иначе float64).
+        """
+        matrix = np.asarray(matrix)
+        if matrix.dtype != np.float32:
+            matrix = matrix.astype(np.float64, copy=False)
+
+        # min и max по столбцам без NaN; fmin/fmax пропускают NaN, для столбцов из одних NaN остается NaN
+        min_val = np.fmin.reduce(matrix, axis=-2, initial=np.nan, keepdims=True)
+        max_val = np.fmax.reduce(matrix, axis=-2, initial=np.nan, keepdims=True)
+        if baseline is not None:
+            min_val = np.fmin(min_val, baseline)
+            max_val = np.fmax(max_val, baseline)
+
+        # Избегаем деления на ноль: постоянные столбцы (и столбцы из одних NaN) получают 0
+        span = max_val - min_val
+        varying = span > 0
+        safe_span = np.where(varying, span, 1.0)
+        min_val = np.where(varying, min_val, 0.0)
+
+        # Порядок операций совпадает с прежней поэлементной формулой ((x - min) / (max - min)) * 10;
+        # операции выполняются на месте, чтобы не держать в памяти промежуточные копии матрицы.
+        # NaN сохраняются сами: любая операция с NaN дает NaN
+        normalized = np.subtract(matrix, min_val)
+        normalized /= safe_span
+        normalized *= scale
+        np.round(normalized, decimals, out=normalized)
+        if not varying.all():
+            # В постоянных столбцах нормализованное значение - 0 (кроме NaN)
+            np.copyto(normalized, 0.0, where=~varying & ~np.isnan(normalized))
+        return normalized
+
     @staticmethod
     def fill_data(data, criteria_names):
         """
         Заполняет NaN значения в списке на основе ближайших левого и правого значений.
-        :param data: Список числовых значений, который может содержать NaN.
+        :param data: Список (или одномерный массив) числовых значений, который может содержать NaN.
         :param criteria_names: Список названий критериев (для определения, какие критерии были дополнены).
         :return: Кортеж из двух элементов:
-            1. Список с заполненными значениями вместо NaN.
+            1. Список (массив - для массива на входе) с заполненными значениями вместо NaN.
             2. Список названий критериев, которые были дополнены.
         """
-        n = len(data)
-        filled_data = data.copy()  # Создаем копию списка для изменения
-        filled_criteria = []  # Список для хранения названий дополненных критериев
-
-        for i in range(n):
-            if pd.isna(filled_data[i]):  # Проверяем, является ли значение NaN
-                left_value = None
-                right_value = None
-
-                # Ищем ближайшее левое значение
-                for j in range(i - 1, -1, -1):  # Обратный проход от текущего к началу
-                    if not pd.isna(filled_data[j]):
-                        left_value = filled_data[j]
-                        break
-
-                # Ищем ближайшее правое значение
-                for k in range(i + 1, n):  # Прямой проход от текущего к концу
-                    if not pd.isna(filled_data[k]):
-                        right_value = filled_data[k]
-                        break
-
-                # Если значение все еще не найдено, используем циклическую обработку
-                if left_value is None:  # Если левое значение не найдено
-                    for j in range(n - 1, -1, -1):  # Ищем справа (конец списка)
-                        if not pd.isna(filled_data[j]):
-                            left_value = filled_data[j]
-                            break
-
-                if right_value is None:  # Если правое значение не найдено
-                    for k in range(n):  # Ищем слева (начало списка)
-                        if not pd.isna(filled_data[k]):
-                            right_value = filled_data[k]
-                            break
-
-                # Заполняем NaN средним арифметическим левого и правого значений
-                if left_value is not None and right_value is not None:
-                    filled_data[i] = (left_value + right_value) / 2
-                elif left_value is not None:
-                    filled_data[i] = left_value
-                elif right_value is not None:
-                    filled_data[i] = right_value
-
-                # Добавляем название критерия в список дополненных
-                filled_criteria.append(criteria_names[i])
-
-        return filled_data, filled_criteria
+        filled, filled_mask = DataAnalysis.fill_matrix(np.asarray(data, dtype=np.float64))
+        filled_criteria = [criteria_names[i] for i in np.flatnonzero(filled_mask)]  # Названия дополненных критериев
+
+        if isinstance(data, list):
+            return filled.tolist(), filled_criteria
+        return filled, filled_criteria
 
     @staticmethod
     def calculate_polygon_area(city_data):
@@ -68,153 +75,535 @@ class DataAnalysis:
         :param city_data: Список нормированных значений критериев для города.
         :return: Площадь фигуры.
         """
-        n = len(city_data)  # Количество критериев
-        angles = [2 * 3.14159 * i / n for i in range(n)]  # Углы для каждой оси
-        points = []
+        return float(DataAnalysis.calculate_polygon_areas(city_data))
 
-        # Вычисляем координаты точек
-        for i, value in enumerate(city_data):
-            x = value * np.cos(angles[i])  # Координата x
-            y = value * np.sin(angles[i])  # Координата y
-            points.append((x, y))
+    @staticmethod
+    def fill_matrix(matrix):
+        """
+        Заполняет NaN в одномерном массиве или в каждой строке матрицы (города × критерии).
+
+        Правило совпадает с прежним последовательным проходом слева направо: пропуск заменяется
+        средним арифметическим левого соседа (уже заполненного, для первого столбца - последнего
+        значения строки) и ближайшего исходного значения справа (если его нет - циклически первого
+        столбца). Поэтому внутри серии пропусков k-й элемент зависит от (k-1)-го, и серии
+        заполняются по глубине: все k-е элементы всех серий всех строк за одну операцию.
+        Индексы соседей находятся двумя проходами (вперед и назад), общая работа линейна
+        по числу ячеек.
+        :param matrix: Одномерный или двумерный массив нормированных значений.
+        :return: Кортеж из двух элементов:
+            1. Массив той же формы с заполненными значениями.
+            2. Булева маска дополненных ячеек.
+        """
+        filled = np.array(matrix, dtype=np.float64, order='C')
+        missing = np.isnan(filled)
+        if filled.ndim == 1:
+            filled_rows, missing_rows = DataAnalysis.fill_matrix(filled[np.newaxis, :])
+            return filled_rows[0], missing_rows[0]
+        if not missing.any():
+            return filled, missing
+
+        n = filled.shape[1]
+        positions = np.arange(n, dtype=np.int32)
+
+        # Прямой проход: индекс ближайшего исходного значения слева (-1 - значения нет)
+        prev_valid = np.maximum.accumulate(np.where(missing, np.int32(-1), positions), axis=1)
+        # Обратный проход: индекс ближайшего исходного значения справа (n - значения нет)
+        next_valid = np.minimum.accumulate(np.where(missing, np.int32(n), positions)[:, ::-1], axis=1)[:, ::-1]
+        # Последнее исходное значение строки - циклический левый сосед для начальной серии пропусков
+        last_valid = prev_valid[:, -1]
+
+        # Работаем с плоскими индексами ячеек; строки без единого значения заполнить невозможно,
+        # они остаются NaN
+        flat = filled.reshape(-1)
+        cells = np.flatnonzero(missing & (last_valid >= 0)[:, np.newaxis])
+        if cells.size == 0:
+            return filled, missing
+        cols = cells % n
+        row_starts = cells - cols
+
+        # Первый столбец: левый сосед - последнее значение строки, правый - ближайшее справа
+        first = cols == 0
+        first_cells = cells[first]
+        flat[first_cells] = (flat[first_cells + last_valid[first_cells // n]] +
+                             flat[first_cells + next_valid.reshape(-1)[first_cells]]) / 2
+
+        # Правые соседи: исходное значение справа, для конечной серии - циклически первый столбец
+        rest = ~first
+        cells, cols, row_starts = cells[rest], cols[rest], row_starts[rest]
+        right_index = next_valid.reshape(-1)[cells]
+        right_value = flat[row_starts + np.where(right_index < n, right_index, 0)]
+
+        # Глубина ячейки в серии пропусков (для начальной серии отсчет от циклического левого соседа)
+        prev_index = prev_valid.reshape(-1)[cells]
+        depth = np.where(prev_index >= 0, cols - prev_index, cols + 1)
+
+        # Группировка ячеек по глубине (для коротких целых numpy использует поразрядную сортировку)
+        if n < np.iinfo(np.uint16).max:
+            depth = depth.astype(np.uint16)
+        order = np.argsort(depth, kind='stable')
+        bounds = np.flatnonzero(np.diff(depth[order])) + 1
+        for group in np.split(order, bounds):
+            group_cells = cells[group]
+            flat[group_cells] = (flat[group_cells - 1] + right_value[group]) / 2
+
+        return filled, missing
 
-        # Добавляем первую точку в конец для замыкания фигуры
-        points.append(points[0])
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def polygon_area_factor(n):
+        """
+        Постоянный множитель площади для n равномерно расположенных осей: ½·sin(2π/n).
+        Кэшируется для каждого n.
+        :param n: Количество критериев (осей).
+        :return: Множитель площади (0 для n < 3, когда многоугольник вырожден).
+        """
+        if n < 3:
+            return 0.0
+        return 0.5 * np.sin(2 * np.pi / n)
 
-        # Вычисляем площадь многоугольника
-        area = 0
-        for i in range(len(points) - 1):
-            x1, y1 = points[i]
-            x2, y2 = points[i + 1]
-            area += x1 * y2 - y1 * x2
+    @staticmethod
+    def calculate_polygon_areas(matrix):
+        """
+        Вычисляет площади многоугольников по значениям на равномерно расположенных осях.
+
+        Соседние оси разделены углом 2π/n, поэтому площадь сводится к
+        ½·sin(2π/n)·Σ rᵢ·rᵢ₊₁ (с замыканием rₙ₋₁ → r₀) - одно скалярное произведение
+        с циклически сдвинутым вектором на город.
+
+        Прежний расчет использовал π ≈ 3.14159 и строил точки по углам 2·3.14159·i/n.
+        Относительная разница с ним не превышает 5·10⁻⁶ (оценка и проверка - в
+        Utils/benchmark.py, compare_polygon_area_with_legacy), поэтому порядок городов
+        может измениться только для площадей, отличающихся меньше чем на эту величину.
+        :param matrix: Одномерный массив значений одного города или двумерный массив (города × критерии).
+        :return: Площадь (для одномерного входа) или одномерный массив площадей.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        n = matrix.shape[-1]
+        if n == 0:
+            return np.zeros(matrix.shape[:-1])
 
-        return abs(area) / 2
+        products = np.einsum('...i,...i->...', matrix, np.roll(matrix, -1, axis=-1))
+        return np.abs(DataAnalysis.polygon_area_factor(n) * products)
 
     @staticmethod
-    def sort_variant_1(cities_values):
-        # Сортировка городов по убыванию значений value
-        sorted_cities_all = sorted(
-            cities_values.items(),
-            key=lambda x: x[1]["value"], reverse=True
-        )
+    def score_cities(matrix, criteria_names):
+        """
+        Пакетная обработка выбранных городов: заполнение пропусков и расчет площадей за один проход.
+        :param matrix: Двумерный массив нормированных значений (города × критерии).
+        :param criteria_names: Список названий критериев (по столбцам матрицы).
+        :return: Кортеж из трех элементов:
+            1. Матрица с заполненными значениями.
+            2. Булева маска дополненных ячеек.
+            3. Массив площадей фигур городов.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.ndim != 2 or matrix.shape[1] != len(criteria_names):
+            raise ValueError("Число столбцов матрицы не совпадает с числом критериев.")
 
-        # Исключение первого и последнего города для анализа
-        filtered_cities = [data["full_data"] for city, data in sorted_cities_all[1:-1]]
-
-        # Вычисление среднего значения для каждого критерия
-        avg_full_data = [sum(values) / len(filtered_cities) for values in zip(*filtered_cities)]
-
-        # Формирование результата
-        result = []
-        order_priority = {
-            "Опорный город 1 порядка": 1,
-            "Опорный город 2 порядка": 2,
-            "Опорный город 3 порядка": 3,
-            "Опорный город 4 порядка": 4
-        }
-
-        for i, (city, data) in enumerate(sorted_cities_all):
-            if i == 0:
-                order = "Опорный город 1 порядка"
-            elif i == len(sorted_cities_all) - 1:
-                order = "Опорный город 4 порядка"
-            else:
-                # Инициализируем счётчик
-                count_above_avg = 0
-
-                # Проходим по парам значений из двух списков
-                for value, avg in zip(data["full_data"], avg_full_data):
-                    # Проверяем условие
-                    if value >= avg:
-                        count_above_avg += 1  # Увеличиваем счётчик, если условие выполнено
-                order = "Опорный город 2 порядка" if count_above_avg / len(
-                    avg_full_data) > 0.5 else "Опорный город 3 порядка"
-
-            result.append({
-                "Название города": city,
-                "Порядок опорного города": order,
-                "value": data["value"]
-            })
-
-        # Сортировка результата по порядку опорного города
-        result = sorted(result, key=lambda x: order_priority[x["Порядок опорного города"]])
+        filled, filled_mask = DataAnalysis.fill_matrix(matrix)
+        areas = DataAnalysis.calculate_polygon_areas(filled)
+        return filled, filled_mask, areas
 
-        return result
+    @staticmethod
+    def stable_order(values, descending=False):
+        """
+        Индексы сортировки значений; равные значения сохраняют исходный порядок
+        (как sorted(..., reverse=descending)).
+        :param values: Одномерный массив значений.
+        :param descending: True - по убыванию.
+        :return: Массив индексов.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        return np.argsort(-values if descending else values, kind='stable')
 
     @staticmethod
-    def sort_variant_2(cities_values):
-        # Шаг 3: Убираем из расчета город с максимальной и минимальной площадью
-        sorted_areas = sorted(cities_values.items(), key=lambda x: x[1]["value"])
-        min_city, max_city = sorted_areas[0][0], sorted_areas[-1][0]
-        remaining_cities = {city: data for city, data in cities_values.items() if city not in [min_city, max_city]}
+    def stable_ranks(values, descending=False):
+        """
+        Места значений в порядке stable_order (0 - первое место).
+        :return: Массив мест той же длины, что и values.
+        """
+        order = DataAnalysis.stable_order(values, descending)
+        ranks = np.empty(len(order), dtype=np.intp)
+        ranks[order] = np.arange(len(order))
+        return ranks
+
+    @staticmethod
+    def extreme_positions(values):
+        """
+        Положение минимума и максимума за один проход без сортировки:
+        первый из равных минимумов и последний из равных максимумов (как sorted(...)[0] и sorted(...)[-1]).
+        :return: Кортеж (индекс минимума, индекс максимума).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        return int(np.argmin(values)), len(values) - 1 - int(np.argmax(values[::-1]))
 
-        print("remaining_cities")
-        print(remaining_cities)
+    # Методы распределения городов по порядкам (см. register_ranking_method)
+    ranking_methods = {}
 
-        # Шаг 4: Определяем экстремумы для каждого критерия (всегда 0 и 10)
-        criteria_count = len(next(iter(cities_values.values()))["full_data"])
-        extremes = [(0, 10)] * criteria_count
+    # Названия порядков опорного города (индекс - номер порядка)
+    ORDER_NAMES = (None, "Опорный город 1 порядка", "Опорный город 2 порядка",
+                   "Опорный город 3 порядка", "Опорный город 4 порядка")
 
-        print("extremes")
-        print(extremes)
+    # Число строк, суммируемых за один шаг при расчете средних по критериям (above_average_mask)
+    SUM_BLOCK_ROWS = 4096
 
-        # Шаг 5: Фактор 1
-        factor_1_scores = {}
-        for city, data in remaining_cities.items():
-            # Шаг 5.1: Сравниваем города по каждому критерию
-            criterion_scores = []
-            for value, (min_val, max_val) in zip(data["full_data"], extremes):
-                # Чем ближе значение к максимуму, тем меньше баллов
-                score = max_val - value
-                criterion_scores.append(score)
+    @staticmethod
+    def _cities_arrays(cities_values):
+        """Названия городов, массив значений value и матрица full_data из словаря cities_values."""
+        names = np.array(list(cities_values), dtype=str)
+        values = np.fromiter((data["value"] for data in cities_values.values()), dtype=np.float64, count=len(names))
+        full_data = np.array([data["full_data"] for data in cities_values.values()], dtype=np.float64)
+        return names, values, full_data.reshape(len(names), -1)
+
+    @staticmethod
+    def ranking_result(names, positions, orders, scores):
+        """
+        Результат sort_variant_* по результату функции rank_variant_*.
+        :param names: Массив названий городов.
+        :param positions: Индексы городов в порядке результата.
+        :param orders: Номера порядков опорного города (1-4).
+        :param scores: Значения value в порядке результата.
+        :return: Структурированный массив с полями "Название города", "Порядок опорного города", "value".
+        """
+        order_names = np.array(DataAnalysis.ORDER_NAMES[1:])
+        result = np.empty(len(positions), dtype=[("Название города", names.dtype),
+                                                 ("Порядок опорного города", order_names.dtype),
+                                                 ("value", np.float64)])
+        result["Название города"] = names[positions]
+        result["Порядок опорного города"] = order_names[orders - 1]
+        result["value"] = scores
+        return result
 
-            # Шаг 5.3: Суммируем баллы для каждого города по всем критериям
-            total_score = sum(criterion_scores)
-            factor_1_scores[city] = total_score
+    @staticmethod
+    def above_average_mask(matrix):
+        """
+        Города, у которых больше половины критериев не ниже среднего значения критерия по всем городам матрицы.
+        Средние считаются последовательным суммированием строк (np.cumsum), как сумма значений по порядку,
+        поэтому значения, равные среднему, классифицируются так же, как при поэлементном расчете.
+        Строки суммируются блоками по SUM_BLOCK_ROWS в накопитель по критериям: промежуточный массив
+        ограничен размером блока, а не всей матрицы.
+        :param matrix: Двумерный массив значений (города × критерии).
+        :return: Булев массив по строкам матрицы.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if len(matrix) == 0:
+            return np.zeros(0, dtype=bool)
+        column_sums = np.zeros(matrix.shape[1])
+        for start in range(0, len(matrix), DataAnalysis.SUM_BLOCK_ROWS):
+            block = matrix[start:start + DataAnalysis.SUM_BLOCK_ROWS]
+            # Накопленная сумма - первая строка блока, поэтому порядок сложения тот же, что у np.cumsum по всей матрице
+            column_sums = np.cumsum(np.vstack((column_sums, block)), axis=0)[-1]
+        column_means = column_sums / len(matrix)
+        return (matrix >= column_means).mean(axis=1) > 0.5
 
-        print("factor_1_scores")
-        print(factor_1_scores)
+    @staticmethod
+    def rank_variant_1(values, full_data):
+        """
+        Вариант 1 на массивах: город с наибольшей площадью - 1 порядка, с наименьшей - 4 порядка,
+        остальные - 2 порядка, если больше половины их критериев не ниже среднего по этим городам,
+        иначе 3 порядка. Города с равной площадью сохраняют исходный порядок.
+        :param values: Площади городов.
+        :param full_data: Матрица значений критериев (города × критерии).
+        :return: Кортеж (индексы городов в порядке результата, номера порядков 1-4):
+            1 порядок, 2 порядок и 3 порядок (по убыванию площади), 4 порядок.
+        """
+        # Одна устойчивая сортировка по убыванию площади: первый и последний город и порядок остальных
+        order = DataAnalysis.stable_order(values, descending=True)
+        if len(order) == 0:
+            return order, np.empty(0, dtype=np.int8)
+        middle = order[1:-1]
 
-        # Шаг 5.4: Присваиваем баллы за удаление от первого места
-        sorted_factor_1 = sorted(factor_1_scores.items(), key=lambda x: x[1])
-        factor_1_ranks = {city: rank for rank, (city, _) in enumerate(sorted_factor_1)}
+        # Исключение первого и последнего города для анализа
+        above_average = DataAnalysis.above_average_mask(np.asarray(full_data, dtype=np.float64)[middle])
 
-        print("factor_1_ranks")
-        print(factor_1_ranks)
+        # По порядку опорного города, внутри порядка - по убыванию площади
+        positions = np.concatenate((order[:1], middle[above_average], middle[~above_average], order[1:][-1:]))
+        orders = np.concatenate((
+            [1], np.full(np.count_nonzero(above_average), 2), np.full(np.count_nonzero(~above_average), 3),
+            [4] * min(len(order) - 1, 1))).astype(np.int8)
+        return positions, orders
 
-        # Шаг 6: Фактор 2
-        factor_2_scores = {}
-        for city, data in remaining_cities.items():
-            # Шаг 6.1: Сравниваем города по площади графиков
-            area = data["value"]
+    @staticmethod
+    def rank_variant_2(values, full_data, max_value=10):
+        """
+        Вариант 2 на массивах: город с наибольшей площадью - 1 порядка, с наименьшей - 4 порядка,
+        остальные упорядочиваются по среднему из двух мест: по сумме отставаний критериев
+        от максимума (фактор 1) и по площади (фактор 2). Лучший из них - 2 порядка, остальные - 3 порядка.
+        :param values: Площади городов.
+        :param full_data: Матрица значений критериев (города × критерии).
+        :param max_value: Максимум шкалы критериев.
+        :return: Кортеж (индексы городов в порядке результата, номера порядков 1-4,
+            среднее место для городов 2 и 3 порядка (NaN для 1 и 4 порядка)).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        full_data = np.asarray(full_data, dtype=np.float64)
 
-            # Шаг 6.2: Присваиваем баллы за удаление от первого места
-            factor_2_scores[city] = area
+        # Шаг 3: Убираем из расчета город с максимальной и минимальной площадью
+        min_position, max_position = DataAnalysis.extreme_positions(values)
+        remaining = np.ones(len(values), dtype=bool)
+        remaining[[min_position, max_position]] = False
+        remaining_positions = np.flatnonzero(remaining)
 
-        # Присваиваем баллы за удаление от первого места
-        sorted_factor_2 = sorted(factor_2_scores.items(), key=lambda x: x[1], reverse=True)
-        factor_2_ranks = {city: rank for rank, (city, _) in enumerate(sorted_factor_2)}
+        # Шаг 5: Фактор 1 - сумма отставаний от максимума по всем критериям.
+        # Суммирование по столбцам по порядку, как при поэлементном расчете
+        factor_1_scores = np.zeros(len(remaining_positions))
+        for column in full_data[remaining_positions].T:
+            factor_1_scores += max_value - column
 
-        print("factor_2_ranks")
-        print(factor_2_ranks)
+        # Шаги 5.4 и 6: места городов по фактору 1 (по возрастанию) и по площади (по убыванию)
+        factor_1_ranks = DataAnalysis.stable_ranks(factor_1_scores)
+        factor_2_ranks = DataAnalysis.stable_ranks(values[remaining_positions], descending=True)
 
         # Шаг 7: Рассчитываем среднее арифметическое между факторами
-        overall_scores = {
-            city: (factor_1_ranks[city] + factor_2_ranks[city]) / 2 for city in remaining_cities
-        }
+        overall_scores = (factor_1_ranks + factor_2_ranks) / 2
+        overall_order = DataAnalysis.stable_order(overall_scores)
 
-        # Формируем результат
-        result = [{"Название города": max_city, "Порядок опорного города": "Опорный город 1 порядка",
-                   "value": cities_values[max_city]["value"]}]
+        positions = np.concatenate(([max_position], remaining_positions[overall_order], [min_position]))
+        orders = np.full(len(positions), 3, dtype=np.int8)
+        orders[[0, -1]] = (1, 4)
+        if len(positions) > 2:
+            orders[1] = 2
+        scores = np.concatenate(([np.nan], overall_scores[overall_order], [np.nan]))
+        return positions, orders, scores
 
-        for city, _ in sorted(overall_scores.items(), key=lambda x: x[1]):
-            result.append({
-                "Название города": city,
-                "Порядок опорного города": "Опорный город 2 порядка" if len(result) == 1 else "Опорный город 3 порядка",
-                "value": overall_scores[city]
-            })
+    @staticmethod
+    def sort_variant_1(cities_values):
+        """
+        Вариант 1 (см. rank_variant_1) для словаря городов.
+        :param cities_values: Словарь {город: {"full_data": значения критериев, "value": площадь}}.
+        :return: Структурированный массив с полями "Название города", "Порядок опорного города", "value".
+        """
+        names, values, full_data = DataAnalysis._cities_arrays(cities_values)
+        return DataAnalysis.rank_cities("Вариант 1", names, values, full_data, criteria_names=())
+
+    @staticmethod
+    def sort_variant_2(cities_values):
+        """
+        Вариант 2 (см. rank_variant_2) для словаря городов.
+        :param cities_values: Словарь {город: {"full_data": значения критериев, "value": площадь}}.
+        :return: Структурированный массив с полями "Название города", "Порядок опорного города", "value"
+            (для городов 2 и 3 порядка value - среднее место, для 1 и 4 порядка - площадь).
+        """
+        names, values, full_data = DataAnalysis._cities_arrays(cities_values)
+        return DataAnalysis.rank_cities("Вариант 2", names, values, full_data, criteria_names=())
+
+    @staticmethod
+    def register_ranking_method(name):
+        """
+        Декоратор, добавляющий метод распределения городов по порядкам в реестр ranking_methods.
+        Методы реестра выводятся в списке сортировок окна программы и доступны в Foothold_city.cli.
+
+        Метод вызывается как method(areas, matrix, criteria_names, spheres), где
+            areas - площади фигур городов (массив длины n),
+            matrix - матрица заполненных нормированных значений (n × критерии),
+            criteria_names - названия критериев по столбцам матрицы,
+            spheres - словарь {сфера: срез или список столбцов матрицы},
+        и возвращает кортеж (индексы городов в порядке результата, номера порядков 1-4, значения value).
+        :param name: Название метода в списке сортировок.
+        """
+        def register(method):
+            DataAnalysis.ranking_methods[name] = method
+            return method
+        return register
+
+    @staticmethod
+    def rank_cities(method_name, city_names, areas, matrix, criteria_names, spheres=None):
+        """
+        Распределяет города по порядкам методом из реестра.
+        :param method_name: Название метода (ключ ranking_methods).
+        :param city_names: Названия городов (по строкам матрицы).
+        :param spheres: Столбцы критериев сфер (None или пустой словарь, например у листа без строки
+            сфер, - все критерии в одной сфере).
+        :return: Структурированный массив с полями "Название города", "Порядок опорного города", "value".
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if not spheres:
+            spheres = {None: slice(None)}
+        positions, orders, scores = DataAnalysis.ranking_methods[method_name](
+            np.asarray(areas, dtype=np.float64), matrix, list(criteria_names), spheres)
+        return DataAnalysis.ranking_result(np.array(city_names, dtype=str), positions, orders, scores)
 
-        result.append({"Название города": min_city, "Порядок опорного города": "Опорный город 4 порядка",
-                       "value": cities_values[min_city]["value"]})
+    @staticmethod
+    def analyze_time_series(series, method_name="Вариант 1", years=None):
+        """
+        Расчет ряда по годам (CityTimeSeries): нормализация, заполнение пропусков, площади и порядки
+        опорных городов. Нормализация (каждый год - отдельно), заполнение и площади считаются для всех
+        пересчитываемых лет одним вызовом по кубу; распределение по порядкам - методом из реестра по каждому году.
+        Пересчитываются только годы из series.stale (после смены метода - все годы).
+        :param series: Ряд по годам (CityTimeSeries); результаты записываются в него.
+        :param method_name: Название метода (ключ ranking_methods).
+        :param years: Номера лет для принудительного пересчета или None.
+        :return: Список номеров пересчитанных лет.
+        """
+        if series.method != method_name:
+            series.stale.update(range(len(series.years)))
+            series.method = method_name
+        if years is not None:
+            series.stale.update(years)
+        stale = sorted(series.stale)
+        series.stale.clear()
+        if not stale:
+            return []
+
+        present = series.present[stale]
+        normalized = DataAnalysis.normalize_matrix(series.values[stale], baseline=series.baseline)
+        normalized[~present] = np.nan
+        series.normalized[stale] = normalized
+
+        # Строки присутствующих городов всех лет - одна матрица: заполнение и площади считаются построчно
+        filled, filled_mask, areas = DataAnalysis.score_cities(normalized[present], series.criteria_names)
+        year_filled = np.full(normalized.shape, np.nan)
+        year_filled[present] = filled
+        year_mask = np.zeros(normalized.shape, dtype=bool)
+        year_mask[present] = filled_mask
+        year_areas = np.full(present.shape, np.nan)
+        year_areas[present] = areas
+        series.filled[stale] = year_filled
+        series.filled_mask[stale] = year_mask
+        series.areas[stale] = year_areas
+
+        method = DataAnalysis.ranking_methods[method_name]
+        criteria_names = list(series.criteria_names)
+        spheres = series.spheres_columns() or {None: slice(None)}
+        for y in stale:
+            series.orders[y] = 0
+            series.scores[y] = np.nan
+            cities = np.flatnonzero(series.present[y])
+            if len(cities) < 3:
+                continue  # для сортировки нужно минимум три города
+            positions, orders, scores = method(series.areas[y, cities], series.filled[y, cities],
+                                               criteria_names, spheres)
+            series.orders[y, cities[positions]] = orders
+            series.scores[y, cities[positions]] = scores
+        return stale
 
+    @staticmethod
+    def order_transitions(series, changed_only=True):
+        """
+        Переходы опорных городов между порядками в соседние годы ряда (по результату analyze_time_series).
+        :param series: Рассчитанный ряд по годам (CityTimeSeries).
+        :param changed_only: True - только города, порядок которых изменился.
+        :return: Структурированный массив с полями "Название города", "Год", "Следующий год",
+            "Порядок было", "Порядок стало" (номера 1-4) - по парам лет, внутри пары - в порядке городов.
+        """
+        before, after = series.orders[:-1], series.orders[1:]
+        mask = (before > 0) & (after > 0)
+        if changed_only:
+            mask &= before != after
+        year_positions, city_positions = np.nonzero(mask)
+
+        years = np.array(series.years, dtype=str)
+        names = np.array(series.city_names, dtype=str)
+        result = np.empty(len(city_positions), dtype=[("Название города", names.dtype), ("Год", years.dtype),
+                                                      ("Следующий год", years.dtype),
+                                                      ("Порядок было", np.int8), ("Порядок стало", np.int8)])
+        result["Название города"] = names[city_positions]
+        result["Год"] = years[year_positions]
+        result["Следующий год"] = years[year_positions + 1]
+        result["Порядок было"] = before[mask]
+        result["Порядок стало"] = after[mask]
         return result
+
+    @staticmethod
+    def transition_counts(series):
+        """
+        Матрицы переходов между порядками для каждой пары соседних лет.
+        :return: Массив (пары лет × 4 × 4): [i, a - 1, b - 1] - число городов, перешедших из порядка a в порядок b.
+        """
+        before = series.orders[:-1].astype(np.intp)
+        after = series.orders[1:].astype(np.intp)
+        mask = (before > 0) & (after > 0)
+        pairs = np.nonzero(mask)[0] * 16 + (before[mask] - 1) * 4 + (after[mask] - 1)
+        return np.bincount(pairs, minlength=16 * len(before)).reshape(len(before), 4, 4)
+
+    @staticmethod
+    def criteria_weight_vector(criteria_names, spheres):
+        """
+        Веса критериев для метода "Взвешенная площадь": вес сферы (sphere_weights) × вес критерия (criteria_weights).
+        :return: Массив весов по столбцам матрицы.
+        """
+        weights = np.array([criteria_weights.get(name, 1) for name in criteria_names], dtype=np.float64)
+        for sphere, columns in spheres.items():
+            weights[columns] *= sphere_weights.get(sphere, 1)
+        return weights
+
+    @staticmethod
+    def sphere_means(matrix, spheres):
+        """
+        Среднее значение критериев каждой сферы.
+        :return: Матрица (города × сферы).
+        """
+        return np.column_stack([matrix[:, columns].mean(axis=1) for columns in spheres.values()])
+
+    @staticmethod
+    def percentile_ranks(matrix):
+        """
+        Процентильный ранг значения среди городов по каждому критерию (от 0 до 1):
+        доля городов с меньшим значением плюс половина доли городов с равным значением.
+        :return: Матрица той же формы.
+        """
+        columns = np.ascontiguousarray(matrix.T)  # столбцы подряд в памяти
+        ranks = np.empty_like(columns)
+        count = columns.shape[1]
+        for j, column in enumerate(columns):
+            order = np.argsort(column)
+            sorted_column = column[order]
+            # Группы равных значений в отсортированном столбце: начало и конец группы каждого значения
+            new_group = np.r_[True, sorted_column[1:] != sorted_column[:-1]]
+            group_starts = np.flatnonzero(new_group)
+            group_ends = np.r_[group_starts[1:], count]
+            groups = np.cumsum(new_group) - 1
+            ranks[j, order] = (group_starts[groups] + group_ends[groups]) / (2 * count)
+        return ranks.T
+
+    @staticmethod
+    def rank_by_score(scores, features):
+        """
+        Общая схема методов на основе оценки города: наибольшая оценка - 1 порядок, наименьшая - 4 порядок,
+        остальные - 2 порядка, если больше половины признаков не ниже среднего по ним (above_average_mask),
+        иначе 3 порядка.
+        :param scores: Оценки городов.
+        :param features: Признаки городов (города × признаки), по которым делятся 2 и 3 порядок.
+        :return: Кортеж (индексы городов в порядке результата, номера порядков, оценки в порядке результата).
+        """
+        positions, orders = DataAnalysis.rank_variant_1(scores, features)
+        return positions, orders, np.asarray(scores, dtype=np.float64)[positions]
+
+
+@DataAnalysis.register_ranking_method("Вариант 1")
+def _rank_variant_1(areas, matrix, criteria_names, spheres):
+    """Площадь фигуры; 2 и 3 порядок - по доле критериев не ниже среднего."""
+    return DataAnalysis.rank_by_score(areas, matrix)
+
+
+@DataAnalysis.register_ranking_method("Вариант 2")
+def _rank_variant_2(areas, matrix, criteria_names, spheres):
+    """Среднее из мест по отставанию критериев от максимума и по площади."""
+    positions, orders, scores = DataAnalysis.rank_variant_2(areas, matrix)
+    scores[[0, -1]] = areas[positions[[0, -1]]]
+    return positions, orders, scores
+
+
+@DataAnalysis.register_ranking_method("Взвешенная площадь")
+def _rank_weighted_area(areas, matrix, criteria_names, spheres):
+    """Площадь фигуры по значениям, умноженным на веса сфер и критериев (const.py)."""
+    weighted = matrix * DataAnalysis.criteria_weight_vector(criteria_names, spheres)
+    return DataAnalysis.rank_by_score(DataAnalysis.calculate_polygon_areas(weighted), weighted)
+
+
+@DataAnalysis.register_ranking_method("Баланс сфер")
+def _rank_sphere_balance(areas, matrix, criteria_names, spheres):
+    """
+    Среднее геометрическое средних значений сфер: город с провалом в одной из сфер
+    получает низкую оценку, даже если остальные сферы развиты сильно.
+    """
+    means = DataAnalysis.sphere_means(matrix, spheres)
+    balance = np.prod(means, axis=1) ** (1 / means.shape[1])
+    return DataAnalysis.rank_by_score(balance, means)
+
+
+@DataAnalysis.register_ranking_method("Процентили")
+def _rank_percentiles(areas, matrix, criteria_names, spheres):
+    """Средний процентильный ранг города по критериям (устойчив к выбросам значений)."""
+    ranks = DataAnalysis.percentile_ranks(matrix)
+    return DataAnalysis.rank_by_score(ranks.mean(axis=1), ranks)
@@ -0,0 +1,256 @@
+import hashlib
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+
+class ExcelReader:
+    """
+    Чтение листа Excel в формате программы: строка заголовков, строка сфер и блок данных
+    (первый столбец - название города, остальные - значения критериев).
+
+    Поддерживает два режима чтения:
+        - быстрый: потоковый разбор openpyxl в режиме read_only, без построения полного DataFrame;
+        - совместимый: pandas.read_excel.
+    Разобранный лист сохраняется в дисковый кэш (.npz), ключ - путь, время изменения и размер
+    файла, поэтому повторное открытие неизмененного файла обходится без разбора Excel.
+    При записи кэша удаляется кэш прежних версий того же листа, а при превышении CACHE_MAX_BYTES -
+    давно не использованные файлы кэша.
+    """
+
+    # Версия формата кэша: меняется при изменении состава сохраняемых массивов
+    CACHE_VERSION = 1
+
+    # Наибольший суммарный размер дискового кэша в байтах
+    CACHE_MAX_BYTES = 512 * 2 ** 20
+
+    # Как часто (в строках) потоковое чтение сообщает о ходе загрузки
+    PROGRESS_ROWS = 2000
+
+    @staticmethod
+    def default_cache_dir():
+        """
+        Каталог дискового кэша по умолчанию - в домашнем каталоге пользователя (рядом с файлом сеанса),
+        а не в общем временном каталоге, куда другие пользователи могут подложить свои файлы .npz.
+        """
+        return os.path.join(os.path.expanduser("~"), ".foothold_city", "cache")
+
+    @staticmethod
+    def sheet_names(file_path, fast=True):
+        """
+        Названия листов книги в порядке следования.
+        :param fast: True - через openpyxl (read_only), False - через pandas.ExcelFile (в том числе для xls).
+        """
+        if not fast:
+            with pd.ExcelFile(file_path) as workbook:
+                return [str(name) for name in workbook.sheet_names]
+
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def read_sheet(file_path, sheet_name=0, fast=True, cache_dir=None, progress=None, warnings=None):
+        """
+        Читает лист Excel.
+
+        :param file_path: Путь к файлу Excel.
+        :param sheet_name: Название листа или его индекс.
+        :param fast: True - потоковое чтение openpyxl, False - pandas.read_excel.
+        :param cache_dir: Каталог дискового кэша; None - кэш не используется.
+        :param progress: Функция для сообщений о ходе чтения (вызывается каждые PROGRESS_ROWS строк
+            при потоковом чтении; может прервать чтение исключением).
+        :param warnings: Список, в который добавляются сообщения об ошибках кэша (чтение при этом
+            продолжается без кэша, см. FileManager.load_warnings); None - сообщения выводятся.
+        :return: Кортеж (заголовки, метки сфер, названия городов, матрица значений float64).
+            Нечисловые значения критериев заменяются на NaN.
+        """
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = ExcelReader._cache_path(file_path, sheet_name, cache_dir)
+            cached = ExcelReader._load_cache(cache_path, warnings)
+            if cached is not None:
+                return cached
+
+        if fast:
+            sheet = ExcelReader._read_streaming(file_path, sheet_name, progress)
+        else:
+            sheet = ExcelReader._read_pandas(file_path, sheet_name)
+
+        if cache_path is not None:
+            ExcelReader._save_cache(cache_path, sheet, warnings)
+        return sheet
+
+    @staticmethod
+    def _read_streaming(file_path, sheet_name, progress=None):
+        """Потоковое чтение листа через openpyxl (read_only): строки разбираются по одной."""
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            if isinstance(sheet_name, int):
+                worksheet = workbook.worksheets[sheet_name]
+            else:
+                worksheet = workbook[sheet_name]
+
+            rows = worksheet.iter_rows(values_only=True)
+            headers = list(next(rows, ()))
+            sphere_labels = list(next(rows, ()))
+            # Пустые строки (в том числе «хвост» листа, который openpyxl отдает по размеру листа) пропускаем
+            body = []
+            for row in rows:
+                if any(value is not None for value in row):
+                    body.append(row)
+                    if progress is not None and len(body) % ExcelReader.PROGRESS_ROWS == 0:
+                        progress(f"Чтение файла: {len(body)} строк")
+        finally:
+            workbook.close()
+
+        return ExcelReader._make_sheet(headers, sphere_labels, body)
+
+    @staticmethod
+    def _read_pandas(file_path, sheet_name):
+        """Чтение листа через pandas.read_excel."""
+        df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
+        df = df.astype(object).where(df.notna(), None)
+        rows = df.values.tolist()
+        return ExcelReader._make_sheet(rows[0] if rows else [], rows[1] if len(rows) > 1 else [], rows[2:])
+
+    @staticmethod
+    def _make_sheet(headers, sphere_labels, body):
+        """
+        Приводит прочитанные строки к единому виду.
+        :return: Кортеж (заголовки, метки сфер, названия городов, матрица значений float64).
+        """
+        # Минимум один столбец (названия городов) - в том числе у пустого листа
+        width = max([1, len(headers), len(sphere_labels)] + [len(row) for row in body])
+        headers = ExcelReader._pad(headers, width)
+        sphere_labels = ExcelReader._pad(sphere_labels, width)
+        body = [ExcelReader._pad(row, width) for row in body]
+
+        # Отбрасываем пустые столбцы в конце листа (оформленные, но не заполненные ячейки)
+        while width > 1 and headers[-1] is None and sphere_labels[-1] is None and all(row[-1] is None for row in body):
+            width -= 1
+            headers, sphere_labels = headers[:-1], sphere_labels[:-1]
+            body = [row[:-1] for row in body]
+
+        headers = [ExcelReader._to_label(value) for value in headers]
+        sphere_labels = [ExcelReader._to_label(value) for value in sphere_labels]
+        city_names = [ExcelReader._to_label(row[0]) for row in body]
+
+        cells = [row[1:] for row in body]
+        try:
+            # Быстрый путь: все значения числовые или пустые
+            values = np.array(cells, dtype=np.float64).reshape(len(body), width - 1)
+        except (TypeError, ValueError):
+            values = pd.DataFrame(cells).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+            values = values.reshape(len(body), width - 1)
+        return headers, sphere_labels, city_names, values
+
+    @staticmethod
+    def _pad(row, width):
+        """Дополняет строку пустыми ячейками до нужной ширины."""
+        row = list(row)
+        return row + [None] * (width - len(row))
+
+    @staticmethod
+    def _to_label(value):
+        """Приводит значение ячейки заголовка или названия города к строке."""
+        if value is None:
+            return ""
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value).strip() if isinstance(value, str) else str(value)
+
+    @staticmethod
+    def _cache_path(file_path, sheet_name, cache_dir):
+        """
+        Путь к файлу кэша "<лист>_<состояние>.npz": первая часть - хэш пути к файлу, листа и версии кэша,
+        вторая - хэш времени изменения и размера файла. По первой части находится кэш прежних версий листа.
+        """
+        stat = os.stat(file_path)
+        sheet_key = f"{os.path.abspath(file_path)}|{sheet_name!r}|{ExcelReader.CACHE_VERSION}"
+        state_key = f"{stat.st_mtime_ns}|{stat.st_size}"
+        sheet_digest = hashlib.sha1(sheet_key.encode("utf-8")).hexdigest()
+        state_digest = hashlib.sha1(state_key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(cache_dir, f"{sheet_digest}_{state_digest}.npz")
+
+    @staticmethod
+    def _report(warnings, message):
+        """Передает сообщение об ошибке кэша в список warnings или выводит его, если списка нет."""
+        if warnings is not None:
+            warnings.append(message)
+        else:
+            print(message)
+
+    @staticmethod
+    def _load_cache(cache_path, warnings=None):
+        """Читает лист из кэша или возвращает None, если кэша нет или он поврежден."""
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with np.load(cache_path, allow_pickle=False) as cached:
+                sheet = (cached["headers"].tolist(), cached["sphere_labels"].tolist(),
+                         cached["city_names"].tolist(), cached["values"])
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            ExcelReader._report(warnings, f"Кэш файла поврежден и будет перезаписан: {e}")
+            return None
+        try:
+            os.utime(cache_path)  # время использования - для удаления давно не использованных файлов
+        except OSError:
+            pass
+        return sheet
+
+    @staticmethod
+    def _save_cache(cache_path, sheet, warnings=None):
+        """Сохраняет разобранный лист в кэш (запись через временный файл) и удаляет устаревший кэш."""
+        headers, sphere_labels, city_names, values = sheet
+        try:
+            os.makedirs(os.path.dirname(cache_path), mode=0o700, exist_ok=True)  # доступ только владельцу
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as file:
+                np.savez(file, headers=np.array(headers, dtype=str), sphere_labels=np.array(sphere_labels, dtype=str),
+                         city_names=np.array(city_names, dtype=str), values=values)
+            os.replace(temp_path, cache_path)
+            ExcelReader._evict_cache(cache_path)
+        except OSError as e:
+            ExcelReader._report(warnings, f"Не удалось сохранить кэш файла: {e}")
+
+    @staticmethod
+    def _evict_cache(cache_path, max_bytes=None):
+        """
+        Удаляет кэш прежних версий того же листа, затем, пока суммарный размер кэша больше max_bytes
+        (по умолчанию CACHE_MAX_BYTES), - файлы кэша, которые дольше всего не использовались.
+        Файлы, удаленные одновременно другим потоком или процессом, пропускаются.
+        """
+        max_bytes = ExcelReader.CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        cache_dir, name = os.path.split(cache_path)
+        sheet_prefix = name.split("_", 1)[0] + "_"
+        entries = []
+        for entry in os.scandir(cache_dir):
+            if not entry.name.endswith(".npz") or entry.name == name:
+                continue
+            try:
+                if entry.name.startswith(sheet_prefix):
+                    os.remove(entry.path)
+                else:
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            except FileNotFoundError:
+                pass
+
+        total = os.path.getsize(cache_path) + sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -1,18 +1,98 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 
+from Foothold_city.Models.city_data_model import CityDataModel
+from Foothold_city.Resources.const import data_values_dtype, excel_cache_enabled, excel_fast_loading
+from Foothold_city.Utils.data_analysis import DataAnalysis
+from Foothold_city.Utils.excel_reader import ExcelReader
+
+
+class LoadCancelled(Exception):
+    """Загрузка файла отменена (исключение выбрасывает функция progress)."""
+
 
 class FileManager:
+    # Порядок сфер; столбцы критериев при загрузке упорядочиваются по нему
+    SPHERE_ORDER = ("Политическая", "Экономическая", "Социальная", "Духовная")
+    # Значение опорного начала координат "Г0" (CityDataModel.baseline) для всех моделей, которые строит
+    # FileManager (из Excel и из таблицы pandas). Прежняя загрузка добавляла в таблицу строку "Г0" из нулей,
+    # и она входила в min и max нормализации; значение сохранено, чтобы нормализованные значения, площади
+    # и порядки городов совпадали с прежними результатами, а шкала каждого критерия начиналась с нуля
+    BASELINE = 0.0
+
     def __init__(self):
         """Инициализация класса для управления файлами."""
-        self.data = None  # Переменная для хранения данных из файла
-        self.normalized_data = None
-        self.spheres_mapping = {
-            "Политическая": [],
-            "Экономическая": [],
-            "Социальная": [],
-            "Духовная": []
-        }
+        self.model = None  # Данные загруженного файла (CityDataModel)
+        self.load_error = None  # Текст ошибки последней загрузки (для сообщения в интерфейсе)
+        self.load_warnings = []  # Пропущенные листы и ошибки кэша последней загрузки (для сообщения в интерфейсе)
+
+        self.spheres_mapping = {sphere: [] for sphere in FileManager.SPHERE_ORDER}
+
+    @property
+    def data(self):
+        """
+        Данные из загруженного файла в виде DataFrame (столбец "Город" и столбцы критериев).
+        Таблица строится по запросу из модели (для сохранения и вывода) и не хранится.
+        """
+        return self.model.to_frame() if self.model is not None else None
+
+    @data.setter
+    def data(self, data):
+        """
+        Замена данных таблицей pandas: строится новая модель с опорным началом координат BASELINE,
+        как при загрузке из Excel; нормализация сбрасывается.
+        """
+        self.model = CityDataModel.from_frame(data, self.spheres_mapping, data_values_dtype, FileManager.BASELINE) \
+            if data is not None else None
+
+    @property
+    def normalized_data(self):
+        """Нормализованные данные в виде DataFrame (столбцы "<критерий>_норм"), строятся по запросу."""
+        return self.model.to_frame(normalized=True) if self.model is not None else None
+
+    @property
+    def values(self):
+        """Исходные значения критериев (города × критерии) или None."""
+        return self.model.values if self.model is not None else None
+
+    @property
+    def normalized_values(self):
+        """Нормализованные значения критериев (города × критерии) или None."""
+        return self.model.normalized_values if self.model is not None else None
+
+    def get_spheres_columns(self):
+        """
+        Столбцы критериев каждой сферы в матрицах значений (get_cities_normalized_matrix).
+        :return: Словарь {сфера: срез или список номеров столбцов}; сферы без критериев пропускаются.
+        """
+        if self.model is None:
+            return {}
+        return {sphere: columns for sphere, (criteria, columns) in self.model.spheres_layout.items() if criteria}
+
+    def get_city_spheres_data(self, city_name, normalized=True):
+        """
+        Возвращает значения критериев города, сгруппированные по сферам.
+        :param city_name: Название города.
+        :param normalized: True - нормализованные значения, False - исходные.
+        :return: Словарь {сфера: CitySphereData} или пустой словарь, если город не найден.
+        """
+        values = self.normalized_values if normalized else self.values
+        position = self.get_city_position(city_name)
+        if values is None or position is None:
+            print(f"Город '{city_name}' не найден в данных.")
+            return {}
+        return self.model.get_city_spheres_data(position, normalized)
+
+    def get_city_position(self, city_name):
+        """
+        Возвращает номер строки города в данных (и в массивах values/normalized_values).
+        :param city_name: Название города.
+        :return: Номер строки или None, если город не найден.
+        """
+        return self.model.get_position(city_name) if self.model is not None else None
 
     def get_data(self):
         """Возвращает данные из загруженного файла."""
@@ -44,8 +124,8 @@ class FileManager:
 
         :return: Список названий городов.
         """
-        if self.data is not None and 'Город' in self.data.columns:
-            return self.data['Город'].tolist()
+        if self.model is not None:
+            return self.model.city_names.tolist()
         else:
             print("Данные не загружены или столбец 'Город' отсутствует.")
             return []
@@ -57,10 +137,11 @@ class FileManager:
         :param city_name: Название города.
         :return: Словарь с данными о городе или None, если город не найден.
         """
-        if self.data is not None and 'Город' in self.data.columns:
-            city_data = self.data[self.data['Город'] == city_name]
-            if not city_data.empty:
-                return city_data.to_dict(orient='records')[0]
+        position = self.get_city_position(city_name)
+        if position is not None:
+            city_data = {'Город': self.model.city_names[position].item()}
+            city_data.update(zip(self.model.criteria_names, self.model.values[position].tolist()))
+            return city_data
         print(f"Город '{city_name}' не найден в данных.")
         return None
 
@@ -70,14 +151,12 @@ class FileManager:
         :param city_name: Название города.
         :return: Список числовых значений (или NaN) или None, если город не найден.
         """
-        if self.normalized_data is not None and 'Город' in self.normalized_data.columns:
-            # Ищем данные для указанного города
-            city_data = self.normalized_data[self.normalized_data['Город'] == city_name]
+        if self.normalized_values is not None:
+            # Ищем строку города по индексу
+            position = self.get_city_position(city_name)
 
-            if not city_data.empty:
-                # Исключаем столбец "Город" и преобразуем оставшиеся данные в список
-                numeric_data = city_data.drop(columns=['Город']).values.flatten().tolist()
-                return numeric_data
+            if position is not None:
+                return self.normalized_values[position].tolist()
 
             print(f"Город '{city_name}' не найден в данных.")
             return None
@@ -85,132 +164,341 @@ class FileManager:
             print("Нормализованные данные не загружены или столбец 'Город' отсутствует.")
             return None
 
-    def load_excel(self, file_path, sheet_name=0):
+    def get_cities_normalized_matrix(self, city_names):
+        """
+        Возвращает нормализованные данные нескольких городов одной матрицей.
+        :param city_names: Список названий городов.
+        :return: Двумерный массив (города × критерии) в порядке city_names или None, если данные не загружены.
+            Для отсутствующих городов строка заполняется NaN.
+        """
+        if self.normalized_values is not None:
+            return self.model.get_rows(city_names, normalized=True)
+        print("Нормализованные данные не загружены или столбец 'Город' отсутствует.")
+        return None
+
+    def load_excel(self, file_path, sheet_name=0, fast=excel_fast_loading, use_cache=excel_cache_enabled,
+                   progress=None, dtype=data_values_dtype):
         """
         Загружает данные из Excel-файла.
 
         :param file_path: Путь к файлу Excel.
-        :param sheet_name: Название листа или его индекс (по умолчанию первый лист).
-        :return: DataFrame с данными или None в случае ошибки.
+        :param sheet_name: Название листа или его индекс (по умолчанию первый лист); None - все листы книги.
+        :param fast: True - потоковое чтение (openpyxl, read_only), False - pandas.read_excel.
+        :param use_cache: Использовать дисковый кэш разобранных файлов.
+        :param progress: Функция, которая вызывается с названием текущего этапа загрузки.
+            Чтобы отменить загрузку, она может выбросить LoadCancelled.
+        :param dtype: Тип значений критериев в модели ('float64' или 'float32').
+        :return: Модель данных (CityDataModel) или None в случае ошибки. Таблица pandas, которую метод
+            возвращал раньше, доступна через свойство data.
+        """
+        return self.load_excel_files([file_path], sheet_name, fast, use_cache, progress, dtype)
+
+    def load_excel_files(self, file_paths, sheet_name=None, fast=excel_fast_loading, use_cache=excel_cache_enabled,
+                         progress=None, dtype=data_values_dtype, workers=None):
+        """
+        Загружает листы нескольких книг Excel (например, по листу на год или регион) в одну модель,
+        чтобы распределить по порядкам все города сразу. Листы читаются параллельно в пуле потоков.
+        Заголовки и сферы листов должны совпадать с первым загруженным листом (порядок столбцов может
+        различаться - столбцы выравниваются по названиям критериев). Листы без городов и листы с другими
+        заголовками или сферами (например, служебные) пропускаются, сообщения о них и об ошибках дискового
+        кэша - в load_warnings.
+
+        :param file_paths: Пути к файлам Excel (повторы пропускаются).
+        :param sheet_name: Название или индекс листа каждой книги; None - все листы.
+        :param fast: True - потоковое чтение (openpyxl, read_only), False - pandas.read_excel.
+        :param use_cache: Использовать дисковый кэш разобранных файлов.
+        :param progress: Функция, которая вызывается с названием текущего этапа загрузки (см. load_excel).
+        :param dtype: Тип значений критериев в модели ('float64' или 'float32').
+        :param workers: Число потоков чтения (None - по умолчанию ThreadPoolExecutor).
+        :return: Модель данных (CityDataModel) или None в случае ошибки (текст ошибки - в load_error).
+        """
+        progress = progress or (lambda stage: None)
+        self.load_error = None
+        self.load_warnings = []
+        try:
+            progress("Чтение файла")
+            sources = self._list_sources(file_paths, sheet_name, fast)
+            cache_dir = ExcelReader.default_cache_dir() if use_cache else None
+
+            def read(source):
+                return ExcelReader.read_sheet(source[0], sheet_name=source[1], fast=fast, cache_dir=cache_dir,
+                                              progress=progress, warnings=self.load_warnings)
+
+            if len(sources) == 1:
+                sheets = [read(sources[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(read, source) for source in sources]
+                    try:
+                        sheets = [future.result() for future in futures]
+                    except BaseException:
+                        # Отмена или ошибка: еще не начатые листы не читаем
+                        for future in futures:
+                            future.cancel()
+                        raise
+
+            # Листы без городов и листы с другими заголовками (например, служебные) пропускаются
+            labels = self._source_labels(sources)
+            loaded = []
+            for label, sheet in zip(labels, sheets):
+                if not sheet[2]:
+                    self.load_warnings.append(f"Лист \"{label}\" не содержит городов и пропущен.")
+                    continue
+                if loaded:
+                    try:
+                        self._check_headers([loaded[0][0], label], [loaded[0][1], sheet])
+                    except ValueError as e:
+                        self.load_warnings.append(f"Лист \"{label}\" пропущен: {e}")
+                        continue
+                loaded.append((label, sheet))
+            for warning in self.load_warnings:
+                print(warning)
+            if not loaded and sheets:
+                loaded = [(labels[0], sheets[0])]
+
+            model = self.load_sheets([sheet for label, sheet in loaded], [label for label, sheet in loaded],
+                                     progress=progress, dtype=dtype)
+            for file_path in dict.fromkeys(source[0] for source in sources):
+                print(f"Файл успешно загружен: {file_path}")
+            return model
+        except LoadCancelled:
+            raise
+        except FileNotFoundError as e:
+            self.load_error = f"Ошибка: Файл не найден по пути {e.filename}"
+        except Exception as e:
+            self.load_error = f"Ошибка при загрузке файла: {e}"
+        print(self.load_error)
+        return None
+
+    def load_time_series(self, file_paths, sheet_name=None, fast=excel_fast_loading, use_cache=excel_cache_enabled,
+                         progress=None):
+        """
+        Загружает ряд по годам: каждый лист (или книга при заданном sheet_name) - отдельный год,
+        города разных лет сопоставляются по названию (см. load_excel_files).
+        :return: Ряд по годам (CityTimeSeries) или None в случае ошибки (текст ошибки - в load_error).
+        """
+        from Foothold_city.Models.city_time_series import CityTimeSeries
+
+        model = self.load_excel_files(file_paths, sheet_name, fast, use_cache, progress, dtype='float64')
+        if model is None:
+            return None
+        return CityTimeSeries.from_model(model)
+
+    def update_time_series_year(self, series, file_path, sheet_name=0, year=None, fast=excel_fast_loading):
+        """
+        Заменяет в ряду данные одного года листом Excel (или добавляет новый год) без перечитывания остальных лет.
+        Пересчитать ряд после этого - DataAnalysis.analyze_time_series (пересчитывается только этот год).
+
+        :param series: Ряд по годам (CityTimeSeries).
+        :param file_path: Путь к файлу Excel.
+        :param sheet_name: Название листа или его индекс.
+        :param year: Название года; None - название листа (для индекса листа - название книги).
+        :param fast: True - потоковое чтение (openpyxl, read_only), False - pandas.read_excel.
+        :return: Номер года в ряду или None в случае ошибки (текст ошибки - в load_error).
         """
+        self.load_error = None
         try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
-
-            # Определение соответствия заголовков сферам
-            headers = df.iloc[0]  # Названия заголовков (первая строка)
-            sphere_labels = df.iloc[1]  # Метки сфер (вторая строка)
-            print("______________headers_______________")
-            print(headers)
-            print("______________sphere_labels_______________")
-            print(sphere_labels)
-
-            for header, sphere in zip(headers, sphere_labels):
-                if sphere in self.spheres_mapping:
-                    self.spheres_mapping[sphere].append(header)
-            print("______________spheres_mapping_______________")
-            print(self.spheres_mapping)
-            print(f"Файл успешно загружен: {file_path}")
-
-            # Теперь заполняем data
-            # Удаление первых трех строк (служебные строки) и сброс индекса
-            self.data = df.iloc[2:].reset_index(drop=True)
-
-            # Переименование столбцов на основе второй строки
-            self.data.columns = headers
-
-            # Переименование первого столбца в "Город"
-            if len(self.data.columns) > 0:
-                self.data.rename(columns={self.data.columns[0]: "Город"}, inplace=True)
-
-            # Сортировка столбцов по порядку: политическая → экономическая → социальная → духовная
-            sorted_columns = ["Город"]  # Первый столбец всегда "Город"
-
-            # Определяем порядок сфер
-            sphere_order = ["Политическая", "Экономическая", "Социальная", "Духовная"]
-
-            # Добавляем столбцы в соответствии с порядком сфер
-            for sphere in sphere_order:
-                if sphere in self.spheres_mapping:
-                    sorted_columns.extend(self.spheres_mapping[sphere])
-
-            # Фильтруем только те столбцы, которые существуют в данных
-            sorted_columns = [col for col in sorted_columns if col in self.data.columns]
-
-            # Перестраиваем DataFrame в соответствии с новым порядком столбцов
-            self.data = self.data[sorted_columns]
-
-            """# Добавление строки с нулями в конец DataFrame
-            zero_row = pd.DataFrame([[0] * len(self.data.columns)], columns=self.data.columns)
-            self.data = pd.concat([self.data, zero_row], ignore_index=True)"""
-            # Создаем новую строку
-            new_row = ["Г0"] + [0] * (len(self.data.columns) - 1)
-            # Добавляем строку в DataFrame
-            self.data.loc[len(self.data)] = new_row
-
-            print("______________data_______________")
-            print(self.data)
-            return self.data
-        except FileNotFoundError:
-            print(f"Ошибка: Файл не найден по пути {file_path}")
+            headers, sphere_labels, city_names, values = ExcelReader.read_sheet(file_path, sheet_name=sheet_name,
+                                                                                fast=fast)
+            if year is None:
+                year = sheet_name if isinstance(sheet_name, str) else os.path.splitext(os.path.basename(file_path))[0]
+            # Критерии и сферы листа должны совпадать с рядом (порядок столбцов может различаться)
+            reference = ([""] + list(series.criteria_names),
+                         [""] + [next((sphere for sphere, criteria in series.spheres_mapping.items()
+                                       if criterion in criteria), None) for criterion in series.criteria_names])
+            self._check_headers(["ряд по годам", str(year)],
+                                [(reference[0], reference[1], [], None), (headers, sphere_labels, city_names, values)])
+            column_positions = {header: j for j, header in reversed(list(enumerate(headers[1:])))}
+            columns = [column_positions[criterion] for criterion in series.criteria_names]
+            return series.set_year(year, city_names, values[:, columns])
+        except FileNotFoundError as e:
+            self.load_error = f"Ошибка: Файл не найден по пути {e.filename}"
         except Exception as e:
-            print(f"Ошибка при загрузке файла: {e}")
+            self.load_error = f"Ошибка при загрузке файла: {e}"
+        print(self.load_error)
         return None
 
-    def normalize_data(self):
+    @staticmethod
+    def _list_sources(file_paths, sheet_name, fast):
+        """Список источников (путь к книге, лист) без повторов; при sheet_name=None - все листы каждой книги."""
+        sources = []
+        for file_path in dict.fromkeys(file_paths):
+            sheets = ExcelReader.sheet_names(file_path, fast) if sheet_name is None else [sheet_name]
+            sources.extend((file_path, sheet) for sheet in sheets)
+        return sources
+
+    @staticmethod
+    def _source_labels(sources):
+        """
+        Названия источников для ключей городов: название листа, если книга одна; название книги,
+        если из каждой книги взят один лист; иначе "книга: лист".
+        """
+        files = list(dict.fromkeys(file_path for file_path, sheet in sources))
+        single_sheets = len(files) == len(sources)
+        labels = []
+        for file_path, sheet in sources:
+            book = os.path.splitext(os.path.basename(file_path))[0]
+            if len(files) == 1:
+                labels.append(str(sheet))
+            elif single_sheets:
+                labels.append(book)
+            else:
+                labels.append(f"{book}: {sheet}")
+        return labels
+
+    @staticmethod
+    def _sheet_layout(headers, sphere_labels):
+        """
+        Распределение критериев листа по сферам и порядок столбцов модели.
+        :return: Кортеж (словарь {сфера: список критериев}, критерии в порядке сфер SPHERE_ORDER).
+        """
+        spheres_mapping = {sphere: [] for sphere in FileManager.SPHERE_ORDER}
+        for header, sphere in zip(headers[1:], sphere_labels[1:]):
+            if sphere in spheres_mapping:
+                spheres_mapping[sphere].append(header)
+        sorted_columns = [criterion for sphere in FileManager.SPHERE_ORDER for criterion in spheres_mapping[sphere]]
+        return spheres_mapping, sorted_columns
+
+    @staticmethod
+    def _check_headers(labels, sheets):
+        """Проверяет, что заголовки и сферы всех листов совпадают с первым листом (без учета порядка столбцов)."""
+        reference = dict(zip(sheets[0][0][1:], sheets[0][1][1:]))
+        for label, (headers, sphere_labels, _, _) in zip(labels[1:], sheets[1:]):
+            criteria = dict(zip(headers[1:], sphere_labels[1:]))
+            if criteria == reference:
+                continue
+            problems = []
+            missing = [header for header in reference if header not in criteria]
+            extra = [header for header in criteria if header not in reference]
+            changed = [header for header in criteria if header in reference and criteria[header] != reference[header]]
+            if missing:
+                problems.append(f"нет критериев {', '.join(missing)}")
+            if extra:
+                problems.append(f"лишние критерии {', '.join(extra)}")
+            if changed:
+                problems.append(f"другая сфера у критериев {', '.join(changed)}")
+            raise ValueError(f"заголовки листа \"{label}\" не совпадают с листом \"{labels[0]}\": "
+                             f"{'; '.join(problems)}")
+
+    def load_sheet(self, headers, sphere_labels, city_names, values, progress=None, dtype=data_values_dtype):
+        """
+        Строит модель данных из разобранного листа (см. ExcelReader.read_sheet), см. load_sheets.
+
+        :param headers: Заголовки столбцов (первый - столбец названий городов).
+        :param sphere_labels: Метки сфер столбцов.
+        :param city_names: Названия городов.
+        :param values: Матрица значений (города × критерии) в порядке headers[1:].
+        :param progress: Функция, которая вызывается с названием текущего этапа (см. load_excel).
+        :param dtype: Тип значений критериев в модели ('float64' или 'float32').
+        :return: Модель данных (CityDataModel).
+        """
+        return self.load_sheets([(headers, sphere_labels, city_names, values)], progress=progress, dtype=dtype)
+
+    def load_sheets(self, sheets, labels=None, progress=None, dtype=data_values_dtype):
+        """
+        Строит одну модель данных из разобранных листов: критерии распределяются по сферам (заново
+        при каждой загрузке), столбцы упорядочиваются по сферам, строки листов идут подряд.
+        Опорное начало координат "Г0" (BASELINE по всем критериям) задается как виртуальный город модели
+        (CityDataModel.baseline), строка в матрицу не добавляется.
+
+        :param sheets: Листы в формате ExcelReader.read_sheet с одинаковыми заголовками и сферами.
+        :param labels: Названия источников листов; при нескольких листах города получают ключ "Город (источник)".
+        :param progress: Функция, которая вызывается с названием текущего этапа (см. load_excel).
+        :param dtype: Тип значений критериев в модели ('float64' или 'float32').
+        :return: Модель данных (CityDataModel).
+        """
+        progress = progress or (lambda stage: None)
+        labels = list(labels) if labels is not None else [str(k) for k in range(len(sheets))]
+        # Определение соответствия заголовков сферам (первый столбец - названия городов)
+        progress("Распределение критериев по сферам")
+        self._check_headers(labels, sheets)
+        self.spheres_mapping, sorted_columns = self._sheet_layout(sheets[0][0], sheets[0][1])
+        print("______________spheres_mapping_______________")
+        print(self.spheres_mapping)
+
+        # Матрица собирается сразу в нужном порядке столбцов (политическая → экономическая → социальная →
+        # духовная); копирование по столбцам приводит тип без промежуточной копии листа
+        progress("Упорядочивание столбцов")
+        matrix = np.empty((sum(len(sheet[2]) for sheet in sheets), len(sorted_columns)), dtype=dtype)
+        city_sources = np.empty(len(matrix), dtype=np.int32)
+        start = 0
+        for k, (headers, _, city_names, values) in enumerate(sheets):
+            column_positions = {header: j for j, header in reversed(list(enumerate(headers[1:])))}
+            rows = slice(start, start + len(city_names))
+            for j, column in enumerate(sorted_columns):
+                matrix[rows, j] = values[:, column_positions[column]]
+            city_sources[rows] = k
+            start = rows.stop
+
+        city_labels = [city_name for sheet in sheets for city_name in sheet[2]]
+        if len(sheets) == 1:
+            self.model = CityDataModel(city_labels, sorted_columns, matrix, self.spheres_mapping,
+                                       baseline=FileManager.BASELINE, sources=labels)
+        else:
+            # Города разных листов различаются по названию и источнику
+            city_names = [f"{city_name} ({labels[k]})" for city_name, k in zip(city_labels, city_sources.tolist())]
+            self.model = CityDataModel(city_names, sorted_columns, matrix, self.spheres_mapping,
+                                       baseline=FileManager.BASELINE, sources=labels, city_sources=city_sources,
+                                       city_labels=city_labels)
+        return self.model
+
+    def restore(self, city_names, criteria_names, spheres_mapping, values, normalized_values, baseline=None,
+                sources=(), city_sources=None, city_labels=None):
+        """
+        Восстанавливает загруженные и нормализованные данные без чтения Excel (например, из сохраненного сеанса).
+        Массивы значений используются как есть (в том числе np.memmap), нормализация не пересчитывается.
+
+        :param city_names: Названия городов (по строкам массивов).
+        :param criteria_names: Названия критериев (по столбцам массивов), в порядке сфер.
+        :param spheres_mapping: Словарь {сфера: список критериев}.
+        :param values: Исходные значения (города × критерии).
+        :param normalized_values: Нормализованные значения той же формы.
+        :param baseline: Значение опорного начала координат "Г0" или None (см. CityDataModel.baseline).
+        :param sources: Названия источников (листов или книг).
+        :param city_sources: Номер источника каждого города или None, если источник один.
+        :param city_labels: Названия городов без источника или None.
+        """
+        self.spheres_mapping = {sphere: list(criteria) for sphere, criteria in spheres_mapping.items()}
+        self.model = CityDataModel(city_names, criteria_names, values, self.spheres_mapping, normalized_values,
+                                   baseline=baseline, sources=sources, city_sources=city_sources,
+                                   city_labels=city_labels)
+
+    def normalize_data(self, progress=None):
         """
         Нормализует данные для каждого города.
-        :return: DataFrame с нормализованными данными.
-        """
-        if self.data is not None and 'Город' in self.data.columns:
-            # Создаем новый DataFrame для нормализованных данных
-            normalized_data = self.data.copy()
-
-            # Преобразуем все столбцы, кроме "Город", в числовой формат
-            for column in normalized_data.columns:
-                if column != 'Город':
-                    normalized_data[column] = pd.to_numeric(normalized_data[column], errors='coerce')
-
-            # Проходим по всем числовым столбцам, кроме "Город"
-            for column in normalized_data.columns:
-                if column != 'Город' and pd.api.types.is_numeric_dtype(normalized_data[column]):
-                    # Удаляем NaN значения для вычисления min и max
-                    valid_data = normalized_data[column].dropna()
-
-                    if not valid_data.empty:
-                        min_val = valid_data.min()
-                        max_val = valid_data.max()
-
-                        if max_val > min_val:  # Избегаем деления на ноль
-                            # Выполняем нормализацию только для числовых значений
-                            normalized_data[f"{column}_норм"] = normalized_data[column].apply(
-                                lambda x: ((x - min_val) / (max_val - min_val)) * 10 if pd.notnull(x) else np.nan
-                            ).round(2)
-                        else:
-                            # Если все значения одинаковы, оставляем NaN или исходное значение
-                            normalized_data[f"{column}_норм"] = normalized_data[column].apply(
-                                lambda x: np.nan if pd.isnull(x) else 0
-                            )
-                    else:
-                        # Если все значения NaN, оставляем столбец как NaN
-                        normalized_data[f"{column}_норм"] = np.nan
-
-            # Возвращаем только столбцы с нормализованными данными
-            normalized_columns = [col for col in normalized_data.columns if col.endswith('_норм')]
-            self.normalized_data = normalized_data[['Город'] + normalized_columns]
-            return self.normalized_data
+        Возвращает матрицу, а не таблицу pandas, как раньше: таблица со столбцами "Город" и "<критерий>_норм"
+        удваивала бы память на больших файлах. Она строится по запросу через свойство normalized_data.
+        :param progress: Функция, которая вызывается с названием текущего этапа (см. load_excel).
+        :return: Матрица нормализованных значений (города × критерии, столбцы в порядке get_criteria_names)
+            или None, если данные не загружены.
+        """
+        if self.model is not None:
+            if progress is not None:
+                progress("Нормализация")
+            # Распределение по сферам могло измениться после загрузки данных
+            self.model.set_spheres(self.spheres_mapping)
+            # Опорное начало координат "Г0" входит в min и max столбцов, не являясь строкой матрицы
+            self.model.set_normalized(DataAnalysis.normalize_matrix(self.model.values, baseline=self.model.baseline))
+            return self.model.normalized_values
         else:
             print("Данные не загружены или столбец 'Город' отсутствует.")
             return None
 
+    def get_criteria_matrix(self):
+        """
+        Возвращает исходные значения критериев в виде матрицы (города × критерии).
+        Нечисловые значения заменены на NaN при загрузке.
+        :return: Двумерный массив или None, если данные не загружены.
+        """
+        return self.values
+
     def get_criteria_names(self):
         """
         Возвращает список названий критериев из нормализованных данных.
         :return: Список названий критериев.
         """
-        if self.normalized_data is not None and 'Город' in self.normalized_data.columns:
-            # Исключаем столбец "Город" и возвращаем остальные названия столбцов
-            criteria_names = [col.replace('_норм', '') for col in self.normalized_data.columns if col != 'Город']
-            return criteria_names
+        if self.normalized_values is not None:
+            return list(self.model.criteria_names)
         else:
             print("Нормализованные данные не загружены или столбец 'Город' отсутствует.")
             return []
@@ -221,13 +509,14 @@ class FileManager:
 
         :param criterion_name: Название критерия (например, "Качество городской среды").
         """
-        if self.data is None:
+        if self.model is None:
             print("Данные не загружены.")
             return
 
-        # Проверяем, есть ли критерий в заголовках DataFrame
-        if criterion_name in self.data.columns:
+        # Проверяем, есть ли критерий среди критериев модели
+        j = self.model.criteria_index.get(criterion_name)
+        if j is not None:
             print(f"Данные для критерия '{criterion_name}':")
-            print(self.data[['Город', criterion_name]])
+            print(pd.DataFrame({'Город': self.model.city_names, criterion_name: self.model.values[:, j]}))
         else:
             print(f"Критерий '{criterion_name}' не найден в данных.")
\ No newline at end of file
@@ -0,0 +1,75 @@
+import math
+
+
+class LabelPlacer:
+    """
+    Размещение подписей значений без наложения.
+
+    Занятые позиции хранятся в равномерной сетке с шагом, равным порогу близости,
+    поэтому проверка позиции просматривает только 9 соседних ячеек, а не все подписи.
+    Один экземпляр используется для всех городов на графике: подписи разных городов
+    тоже не накладываются друг на друга.
+    """
+
+    def __init__(self, threshold=0.5):
+        """
+        :param threshold: Порог близости подписей по каждой из координат.
+        """
+        self.threshold = threshold
+        self._cells = {}  # (столбец, строка) сетки -> [(x, y, владелец)]
+        self._owners = {}  # владелец (город) -> ячейки его подписей
+
+    def __len__(self):
+        return sum(len(positions) for positions in self._cells.values())
+
+    def _cell(self, x, y):
+        return math.floor(x / self.threshold), math.floor(y / self.threshold)
+
+    def is_too_close(self, x, y):
+        """
+        Проверяет, есть ли рядом уже размещенная подпись.
+        :return: True, если есть подпись ближе порога по обеим координатам.
+        """
+        column, row = self._cell(x, y)
+        for neighbour_column in (column - 1, column, column + 1):
+            for neighbour_row in (row - 1, row, row + 1):
+                for px, py, _ in self._cells.get((neighbour_column, neighbour_row), ()):
+                    if abs(x - px) < self.threshold and abs(y - py) < self.threshold:
+                        return True
+        return False
+
+    def add(self, x, y, owner=None):
+        """Отмечает позицию как занятую."""
+        cell = self._cell(x, y)
+        self._cells.setdefault(cell, []).append((x, y, owner))
+        self._owners.setdefault(owner, []).append(cell)
+
+    def place(self, x, y, step_x, step_y, max_attempts=10, owner=None):
+        """
+        Находит свободную позицию для подписи, сдвигая ее на шаг (step_x, step_y),
+        пока рядом есть другие подписи (не более max_attempts раз), и занимает ее.
+
+        :param owner: Владелец подписи (например, название города) для последующего удаления.
+        :return: Кортеж (x, y) выбранной позиции.
+        """
+        attempts = 0
+        while self.is_too_close(x, y) and attempts < max_attempts:
+            x += step_x
+            y += step_y
+            attempts += 1
+        self.add(x, y, owner)
+        return x, y
+
+    def remove(self, owner):
+        """Освобождает позиции всех подписей владельца."""
+        for cell in set(self._owners.pop(owner, ())):
+            positions = [position for position in self._cells[cell] if position[2] != owner]
+            if positions:
+                self._cells[cell] = positions
+            else:
+                del self._cells[cell]
+
+    def clear(self):
+        """Освобождает все позиции."""
+        self._cells.clear()
+        self._owners.clear()
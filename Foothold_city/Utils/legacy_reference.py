@@ -0,0 +1,237 @@
+"""
+Прежние реализации вычислительных этапов - эталоны для проверки эквивалентности (tests/)
+и для сравнения времени (benchmark.py). Код сохранен как был, без отладочного вывода.
+"""
+import numpy as np
+import pandas as pd
+
+
+def legacy_normalize_data(data):
+    """Прежняя поэлементная нормализация (эталон для сравнения)."""
+    normalized_data = data.copy()
+
+    for column in normalized_data.columns:
+        if column != 'Город':
+            normalized_data[column] = pd.to_numeric(normalized_data[column], errors='coerce')
+
+    for column in normalized_data.columns:
+        if column != 'Город' and pd.api.types.is_numeric_dtype(normalized_data[column]):
+            valid_data = normalized_data[column].dropna()
+
+            if not valid_data.empty:
+                min_val = valid_data.min()
+                max_val = valid_data.max()
+
+                if max_val > min_val:
+                    normalized_data[f"{column}_норм"] = normalized_data[column].apply(
+                        lambda x: ((x - min_val) / (max_val - min_val)) * 10 if pd.notnull(x) else np.nan
+                    ).round(2)
+                else:
+                    normalized_data[f"{column}_норм"] = normalized_data[column].apply(
+                        lambda x: np.nan if pd.isnull(x) else 0
+                    )
+            else:
+                normalized_data[f"{column}_норм"] = np.nan
+
+    normalized_columns = [col for col in normalized_data.columns if col.endswith('_норм')]
+    return normalized_data[['Город'] + normalized_columns]
+
+
+def legacy_fill_data(data, criteria_names):
+    """Прежнее заполнение пропусков вложенными проходами (эталон для сравнения)."""
+    n = len(data)
+    filled_data = data.copy()
+    filled_criteria = []
+
+    for i in range(n):
+        if pd.isna(filled_data[i]):
+            left_value = None
+            right_value = None
+
+            for j in range(i - 1, -1, -1):
+                if not pd.isna(filled_data[j]):
+                    left_value = filled_data[j]
+                    break
+
+            for k in range(i + 1, n):
+                if not pd.isna(filled_data[k]):
+                    right_value = filled_data[k]
+                    break
+
+            if left_value is None:
+                for j in range(n - 1, -1, -1):
+                    if not pd.isna(filled_data[j]):
+                        left_value = filled_data[j]
+                        break
+
+            if right_value is None:
+                for k in range(n):
+                    if not pd.isna(filled_data[k]):
+                        right_value = filled_data[k]
+                        break
+
+            if left_value is not None and right_value is not None:
+                filled_data[i] = (left_value + right_value) / 2
+            elif left_value is not None:
+                filled_data[i] = left_value
+            elif right_value is not None:
+                filled_data[i] = right_value
+
+            filled_criteria.append(criteria_names[i])
+
+    return filled_data, filled_criteria
+
+
+def legacy_polygon_area(city_data):
+    """Прежний расчет площади через список точек и цикл по формуле шнурков (эталон для сравнения)."""
+    n = len(city_data)
+    angles = [2 * 3.14159 * i / n for i in range(n)]
+    points = []
+
+    for i, value in enumerate(city_data):
+        points.append((value * np.cos(angles[i]), value * np.sin(angles[i])))
+    points.append(points[0])
+
+    area = 0
+    for i in range(len(points) - 1):
+        x1, y1 = points[i]
+        x2, y2 = points[i + 1]
+        area += x1 * y2 - y1 * x2
+
+    return abs(area) / 2
+
+
+def legacy_sort_variant_1(cities_values):
+    """Прежняя реализация (эталон для сравнения), без отладочного вывода."""
+    # Сортировка городов по убыванию значений value
+    sorted_cities_all = sorted(
+        cities_values.items(),
+        key=lambda x: x[1]["value"], reverse=True
+    )
+
+    # Исключение первого и последнего города для анализа
+    filtered_cities = [data["full_data"] for city, data in sorted_cities_all[1:-1]]
+
+    # Вычисление среднего значения для каждого критерия
+    avg_full_data = [sum(values) / len(filtered_cities) for values in zip(*filtered_cities)]
+
+    # Формирование результата
+    result = []
+    order_priority = {
+        "Опорный город 1 порядка": 1,
+        "Опорный город 2 порядка": 2,
+        "Опорный город 3 порядка": 3,
+        "Опорный город 4 порядка": 4
+    }
+
+    for i, (city, data) in enumerate(sorted_cities_all):
+        if i == 0:
+            order = "Опорный город 1 порядка"
+        elif i == len(sorted_cities_all) - 1:
+            order = "Опорный город 4 порядка"
+        else:
+            # Инициализируем счётчик
+            count_above_avg = 0
+
+            # Проходим по парам значений из двух списков
+            for value, avg in zip(data["full_data"], avg_full_data):
+                # Проверяем условие
+                if value >= avg:
+                    count_above_avg += 1  # Увеличиваем счётчик, если условие выполнено
+            order = "Опорный город 2 порядка" if count_above_avg / len(
+                avg_full_data) > 0.5 else "Опорный город 3 порядка"
+
+        result.append({
+            "Название города": city,
+            "Порядок опорного города": order,
+            "value": data["value"]
+        })
+
+    # Сортировка результата по порядку опорного города
+    result = sorted(result, key=lambda x: order_priority[x["Порядок опорного города"]])
+
+    return result
+
+
+def legacy_sort_variant_2(cities_values):
+    """Прежняя реализация (эталон для сравнения), без отладочного вывода."""
+    # Шаг 3: Убираем из расчета город с максимальной и минимальной площадью
+    sorted_areas = sorted(cities_values.items(), key=lambda x: x[1]["value"])
+    min_city, max_city = sorted_areas[0][0], sorted_areas[-1][0]
+    remaining_cities = {city: data for city, data in cities_values.items() if city not in [min_city, max_city]}
+
+    # Шаг 4: Определяем экстремумы для каждого критерия (всегда 0 и 10)
+    criteria_count = len(next(iter(cities_values.values()))["full_data"])
+    extremes = [(0, 10)] * criteria_count
+
+    # Шаг 5: Фактор 1
+    factor_1_scores = {}
+    for city, data in remaining_cities.items():
+        # Шаг 5.1: Сравниваем города по каждому критерию
+        criterion_scores = []
+        for value, (min_val, max_val) in zip(data["full_data"], extremes):
+            # Чем ближе значение к максимуму, тем меньше баллов
+            score = max_val - value
+            criterion_scores.append(score)
+
+        # Шаг 5.3: Суммируем баллы для каждого города по всем критериям
+        total_score = sum(criterion_scores)
+        factor_1_scores[city] = total_score
+
+    # Шаг 5.4: Присваиваем баллы за удаление от первого места
+    sorted_factor_1 = sorted(factor_1_scores.items(), key=lambda x: x[1])
+    factor_1_ranks = {city: rank for rank, (city, _) in enumerate(sorted_factor_1)}
+
+    # Шаг 6: Фактор 2
+    factor_2_scores = {}
+    for city, data in remaining_cities.items():
+        # Шаг 6.1: Сравниваем города по площади графиков
+        area = data["value"]
+
+        # Шаг 6.2: Присваиваем баллы за удаление от первого места
+        factor_2_scores[city] = area
+
+    # Присваиваем баллы за удаление от первого места
+    sorted_factor_2 = sorted(factor_2_scores.items(), key=lambda x: x[1], reverse=True)
+    factor_2_ranks = {city: rank for rank, (city, _) in enumerate(sorted_factor_2)}
+
+    # Шаг 7: Рассчитываем среднее арифметическое между факторами
+    overall_scores = {
+        city: (factor_1_ranks[city] + factor_2_ranks[city]) / 2 for city in remaining_cities
+    }
+
+    # Формируем результат
+    result = [{"Название города": max_city, "Порядок опорного города": "Опорный город 1 порядка",
+               "value": cities_values[max_city]["value"]}]
+
+    for city, _ in sorted(overall_scores.items(), key=lambda x: x[1]):
+        result.append({
+            "Название города": city,
+            "Порядок опорного города": "Опорный город 2 порядка" if len(result) == 1 else "Опорный город 3 порядка",
+            "value": overall_scores[city]
+        })
+
+    result.append({"Название города": min_city, "Порядок опорного города": "Опорный город 4 порядка",
+                   "value": cities_values[min_city]["value"]})
+
+    return result
+
+
+def legacy_place_labels(labels, threshold=0.5, max_attempts=10):
+    """Прежний подбор позиций подписей перебором всех размещенных (эталон для сравнения)."""
+    placed = []
+
+    def is_too_close(x1, y1, positions):
+        for (px, py) in positions:
+            if abs(x1 - px) < threshold and abs(y1 - py) < threshold:
+                return True
+        return False
+
+    for label_x, label_y, step_x, step_y in labels:
+        attempts = 0
+        while is_too_close(label_x, label_y, placed) and attempts < max_attempts:
+            label_x += step_x
+            label_y += step_y
+            attempts += 1
+        placed.append((label_x, label_y))
+    return placed
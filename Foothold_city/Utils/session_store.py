@@ -0,0 +1,178 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from Foothold_city.Utils.data_analysis import DataAnalysis
+from Foothold_city.Utils.file_manager import FileManager
+
+
+class SessionStore:
+    """
+    Сохранение и восстановление сеанса работы: загруженные и нормализованные данные,
+    выбранные города и результат последней сортировки.
+
+    Формат файла:
+        - сигнатура MAGIC и длина заголовка (8 байт, little-endian);
+        - заголовок JSON: названия городов и критериев, распределение критериев по сферам,
+          опорное начало координат "Г0" (CityDataModel.baseline), источники городов (листы и книги),
+          выбранные города, метод сортировки и описание массивов (тип, форма, смещение);
+        - массивы в двоичном виде (C-порядок), каждый с выравниванием ALIGNMENT байт.
+    Массивы можно открыть через np.memmap без чтения всего файла, Excel при восстановлении не нужен.
+    """
+
+    MAGIC = b"FHCSESS\x00"
+    # Открываются только файлы этой версии; файлы версии 1 (город "Г0" - последняя строка массивов)
+    # не поддерживаются, сеанс в этом случае загружается заново из Excel
+    VERSION = 2
+    ALIGNMENT = 64
+    EXTENSION = ".fcsession"
+
+    @staticmethod
+    def save(file_path, file_manager, source=None, selected_cities=(), sort=None):
+        """
+        Сохраняет сеанс в файл (запись через временный файл).
+
+        :param file_path: Путь к файлу сеанса.
+        :param file_manager: FileManager с загруженными и нормализованными данными.
+        :param source: Путь к исходному файлу Excel или список путей (для справки).
+        :param selected_cities: Выбранные города.
+        :param sort: None или словарь {"method": название метода, "results": результат DataAnalysis.rank_cities,
+            "filled_criteria": список {город: [дополненные критерии]}}. Результат с городами, которых нет
+            в модели, не сохраняется.
+        :return: True, если сеанс сохранен.
+        """
+        model = file_manager.model if file_manager is not None else None
+        if model is None or model.normalized_values is None:
+            print("Нет загруженных данных для сохранения сеанса.")
+            return False
+
+        header = {
+            "version": SessionStore.VERSION,
+            "source": source,
+            "city_names": model.city_names.tolist(),
+            "criteria_names": list(model.criteria_names),
+            "spheres_mapping": file_manager.spheres_mapping,
+            "baseline": model.baseline,
+            "sources": list(model.sources),
+            "city_labels": model.city_labels.tolist() if model.city_labels is not None else None,
+            "selected_cities": list(selected_cities),
+            "sort": None,
+            "arrays": {},
+        }
+        arrays = {
+            "values": np.ascontiguousarray(model.values),
+            "normalized_values": np.ascontiguousarray(model.normalized_values),
+        }
+        if model.city_sources is not None:
+            arrays["city_sources"] = np.ascontiguousarray(model.city_sources)
+        if sort is not None:
+            results = sort["results"]
+            positions = [model.get_position(city) for city in results["Название города"].tolist()]
+            if None in positions:
+                # Результат сортировки относится к другим данным (города нет в модели): сеанс сохраняется без него
+                print("Результат сортировки не соответствует загруженным данным и не сохранен в сеансе.")
+            else:
+                header["sort"] = {"method": sort["method"], "filled_criteria": sort.get("filled_criteria", [])}
+                arrays["sort_positions"] = np.array(positions, dtype=np.int64)
+                arrays["sort_orders"] = np.array([DataAnalysis.ORDER_NAMES.index(order)
+                                                  for order in results["Порядок опорного города"].tolist()],
+                                                 dtype=np.int8)
+                arrays["sort_values"] = np.ascontiguousarray(results["value"], dtype=np.float64)
+
+        # Смещения массивов считаются от начала блока данных, выровненного после заголовка
+        offset = 0
+        for name, array in arrays.items():
+            header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset = SessionStore._align(offset + array.nbytes)
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        data_start = SessionStore._align(len(SessionStore.MAGIC) + 8 + len(header_bytes))
+
+        try:
+            directory = os.path.dirname(os.path.abspath(file_path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as file:
+                file.write(SessionStore.MAGIC)
+                file.write(struct.pack("<Q", len(header_bytes)))
+                file.write(header_bytes)
+                for name, array in arrays.items():
+                    file.seek(data_start + header["arrays"][name]["offset"])
+                    array.tofile(file)
+                file.truncate(data_start + offset)
+            os.replace(temp_path, file_path)
+            return True
+        except OSError as e:
+            print(f"Не удалось сохранить сеанс: {e}")
+            return False
+
+    @staticmethod
+    def load(file_path, mmap=False):
+        """
+        Восстанавливает сеанс.
+
+        :param file_path: Путь к файлу сеанса.
+        :param mmap: True - массивы открываются через np.memmap (только чтение, данные читаются по мере
+            обращения), False - читаются в память.
+        :return: Кортеж (FileManager, сеанс) или None в случае ошибки. Сеанс - словарь с ключами
+            "source", "selected_cities" и "sort" (None или {"method", "results", "filled_criteria"}).
+        """
+        try:
+            header, data_start = SessionStore._read_header(file_path)
+            arrays = {name: SessionStore._read_array(file_path, data_start, description, mmap)
+                      for name, description in header["arrays"].items()}
+        except FileNotFoundError:
+            print(f"Ошибка: Файл не найден по пути {file_path}")
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ошибка при чтении сеанса: {e}")
+            return None
+
+        city_names = header["city_names"]
+        values, normalized_values = arrays["values"], arrays["normalized_values"]
+        file_manager = FileManager()
+        file_manager.restore(city_names, header["criteria_names"], header["spheres_mapping"],
+                             values, normalized_values, header["baseline"], header.get("sources", ()),
+                             arrays.get("city_sources"), header.get("city_labels"))
+
+        sort = None
+        if header["sort"] is not None:
+            city_names = np.array(city_names, dtype=str)
+            positions = np.asarray(arrays["sort_positions"])
+            sort = {
+                "method": header["sort"]["method"],
+                "results": DataAnalysis.ranking_result(city_names, positions, np.asarray(arrays["sort_orders"]),
+                                                       arrays["sort_values"]),
+                "filled_criteria": header["sort"]["filled_criteria"],
+            }
+        session = {"source": header["source"], "selected_cities": header["selected_cities"], "sort": sort}
+        return file_manager, session
+
+    @staticmethod
+    def _align(offset):
+        return -(-offset // SessionStore.ALIGNMENT) * SessionStore.ALIGNMENT
+
+    @staticmethod
+    def _read_header(file_path):
+        """Читает заголовок сеанса; возвращает (заголовок, смещение блока данных)."""
+        with open(file_path, "rb") as file:
+            if file.read(len(SessionStore.MAGIC)) != SessionStore.MAGIC:
+                raise ValueError("файл не является сохраненным сеансом")
+            header_length, = struct.unpack("<Q", file.read(8))
+            header = json.loads(file.read(header_length).decode("utf-8"))
+        if header.get("version") != SessionStore.VERSION:
+            raise ValueError(f"неподдерживаемая версия сеанса: {header.get('version')}")
+        return header, SessionStore._align(len(SessionStore.MAGIC) + 8 + header_length)
+
+    @staticmethod
+    def _read_array(file_path, data_start, description, mmap):
+        dtype = np.dtype(description["dtype"])
+        shape = tuple(description["shape"])
+        offset = data_start + description["offset"]
+        count = int(np.prod(shape))
+        if count == 0:
+            return np.empty(shape, dtype=dtype)
+        if mmap:
+            return np.memmap(file_path, dtype=dtype, mode="r", offset=offset, shape=shape)
+        return np.fromfile(file_path, dtype=dtype, count=count, offset=offset).reshape(shape)
@@ -0,0 +1,146 @@
+"""
+Синтетические данные городов для замеров (benchmark.py) и тестов (tests/).
+Все генераторы строятся на make_synthetic_values, поэтому одинаковые параметры дают одинаковые значения.
+"""
+import numpy as np
+
+SPHERES = ("Политическая", "Экономическая", "Социальная", "Духовная")
+
+
+def make_synthetic_values(shape, high=1000, decimals=2, nan_share=0.0, seed=0):
+    """
+    Случайные значения критериев.
+    :param shape: Форма массива (например, (городов, критериев)).
+    :param high: Верхняя граница значений (нижняя - 0).
+    :param decimals: Количество знаков после запятой.
+    :param nan_share: Доля пропущенных значений.
+    :param seed: Зерно генератора случайных чисел.
+    :return: Массив float64.
+    """
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(0, high, size=shape).round(decimals)
+    if nan_share:
+        values[rng.random(values.shape) < nan_share] = np.nan
+    return values
+
+
+def make_synthetic_sheet(cities_count, criteria_count, nan_share=0.1, seed=0):
+    """
+    Синтетический лист в формате ExcelReader.read_sheet: критерии поочередно относятся к четырем сферам.
+    :return: Кортеж (заголовки, метки сфер, названия городов, матрица значений float64).
+    """
+    values = make_synthetic_values((cities_count, criteria_count), nan_share=nan_share, seed=seed)
+    headers = ["Город"] + [f"Критерий {j}" for j in range(criteria_count)]
+    sphere_labels = [None] + [SPHERES[j % len(SPHERES)] for j in range(criteria_count)]
+    return headers, sphere_labels, [f"Город {i}" for i in range(cities_count)], values
+
+
+def make_synthetic_years(years_count, cities_count, criteria_count, missing_share=0.05):
+    """
+    Листы ряда по годам (make_synthetic_sheet с зерном по номеру года); в каждом году
+    доля missing_share городов отсутствует.
+    :return: Кортеж (названия лет, список листов).
+    """
+    sheets = []
+    for year in range(years_count):
+        headers, sphere_labels, city_names, values = make_synthetic_sheet(cities_count, criteria_count, seed=year)
+        kept = np.random.default_rng(year).random(cities_count) >= missing_share
+        sheets.append((headers, sphere_labels, [name for name, keep in zip(city_names, kept) if keep], values[kept]))
+    return [str(2000 + year) for year in range(years_count)], sheets
+
+
+def make_synthetic_data(cities_count, criteria_count, nan_share=0.1, seed=0):
+    """
+    Синтетическая таблица в формате FileManager.data (object dtype, как после чтения Excel)
+    с теми же значениями, что и make_synthetic_sheet.
+    :return: DataFrame со столбцом "Город" и столбцами критериев.
+    """
+    import pandas as pd
+
+    headers, _, city_names, values = make_synthetic_sheet(cities_count, criteria_count, nan_share, seed)
+    data = pd.DataFrame(values, columns=headers[1:]).astype(object)
+    data.insert(0, 'Город', city_names)
+    return data
+
+
+def make_synthetic_cities_values(cities_count, criteria_count, seed=0):
+    """
+    Входные данные sort_variant_*. Площади и значения округлены грубо,
+    чтобы было много равных значений и проверялся порядок при равенстве.
+    """
+    areas = make_synthetic_values(cities_count, high=300, decimals=0, seed=seed)
+    full_data = make_synthetic_values((cities_count, criteria_count), high=10, decimals=1, seed=seed + 1)
+    return {f"Город {i}": {"full_data": full_data[i].tolist(), "value": areas[i]} for i in range(cities_count)}
+
+
+def make_synthetic_spheres(cities_count, criteria_count, seed=0):
+    """
+    Данные городов в формате VisualizationWidget.add_city_data; критерии делятся между четырьмя сферами поровну.
+    :return: Список кортежей (название города, нормализованные данные, исходные данные).
+    """
+    from Foothold_city.Models.city_data_model import CitySphereData
+
+    values = make_synthetic_values((cities_count, criteria_count), seed=seed)
+    normalized = np.round(values / 100, 2)
+    criteria = [f"Критерий {i + 1}" for i in range(criteria_count)]
+    groups = np.array_split(np.arange(criteria_count), len(SPHERES))
+    cities = []
+    for city in range(cities_count):
+        cities.append((
+            f"Город {city + 1}",
+            {sphere: CitySphereData([criteria[i] for i in group], normalized[city, group])
+             for sphere, group in zip(SPHERES, groups)},
+            {sphere: CitySphereData([criteria[i] for i in group], values[city, group])
+             for sphere, group in zip(SPHERES, groups)},
+        ))
+    return cities
+
+
+def make_synthetic_labels(cities_count, criteria_count, seed=0):
+    """
+    Начальные позиции и шаги сдвига подписей значений, как на графике городов.
+    :return: Список кортежей (x, y, шаг по x, шаг по y).
+    """
+    values = make_synthetic_values((cities_count, criteria_count), high=10, seed=seed)
+    angles = np.linspace(np.pi / 12, 23 * np.pi / 12, criteria_count)
+    labels = []
+    for row in values:
+        for angle, value in zip(angles, row):
+            shift_amount = 0.1 + 0.05 * len(f"{value * 100}")
+            radius = value + shift_amount + (3 if value <= 3 else 0)
+            labels.append((radius * np.cos(angle), radius * np.sin(angle),
+                           shift_amount * np.cos(angle), shift_amount * np.sin(angle)))
+    return labels
+
+
+def make_scaled_workbook(source_path, target_path, cities_count, criteria_repeat, seed=0):
+    """
+    Создает увеличенную копию книги Excel: заголовки и сферы исходного листа повторяются
+    criteria_repeat раз (с номером повтора в названии), значения - случайные в диапазоне
+    исходных данных, с долей пропусков как в исходном листе.
+    :param source_path: Исходная книга из Resources/Data.
+    :param target_path: Путь для сохранения увеличенной книги.
+    :param cities_count: Количество городов.
+    :param criteria_repeat: Во сколько раз увеличить число критериев.
+    :param seed: Зерно генератора случайных чисел.
+    """
+    import openpyxl
+
+    from Foothold_city.Utils.excel_reader import ExcelReader
+
+    headers, sphere_labels, _, values = ExcelReader.read_sheet(source_path, fast=True)
+    rng = np.random.default_rng(seed)
+    high = np.nanmax(values) if np.isfinite(values).any() else 100
+    nan_share = np.isnan(values).mean() if values.size else 0
+
+    scaled_headers = [headers[0]] + [f"{header} {k}" for k in range(criteria_repeat) for header in headers[1:]]
+    scaled_spheres = [sphere_labels[0]] + sphere_labels[1:] * criteria_repeat
+    scaled_values = rng.uniform(0, high, size=(cities_count, len(scaled_headers) - 1)).round(2)
+
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    worksheet.append(scaled_headers)
+    worksheet.append(scaled_spheres)
+    for i, row in enumerate(scaled_values.tolist()):
+        worksheet.append([f"Город {i}"] + [None if rng.random() < nan_share else value for value in row])
+    workbook.save(target_path)
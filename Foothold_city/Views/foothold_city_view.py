@@ -2,7 +2,7 @@ from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import QMainWindow, QGraphicsScene, QSizePolicy
 
 from Foothold_city.Ui.ui_foothold_city import Ui_FootholdCity
-from Foothold_city.Views.visualization import *
+from Foothold_city.Resources.const import icon_path
 
 
 class FootholdCityView(QMainWindow):
@@ -0,0 +1,303 @@
+import math
+
+import numpy as np
+
+from Foothold_city.Resources.const import color_palette, fun_split_max_chars_per_line, labels_offset_x, labels_offset_y
+from Foothold_city.Utils.label_placer import LabelPlacer
+
+
+class CityGeometry:
+    """Подготовленная геометрия города: точки на осях, подписи значений и полигон."""
+    __slots__ = ('color', 'points', 'labels', 'polygon')
+
+    def __init__(self, color, points, labels, polygon):
+        self.color = color  # цвет города
+        self.points = points  # массив (n, 2) точек на осях критериев
+        self.labels = labels  # подписи значений: [(x, y, текст, поворот)]
+        self.polygon = polygon  # вершины полигона или None (меньше трех точек)
+
+
+class AxesGeometry:
+    """Подготовленная геометрия осей критериев: концы стрелок и подписи осей."""
+    __slots__ = ('layout', 'ends', 'labels')
+
+    def __init__(self, layout, ends, labels):
+        self.layout = layout  # состав сфер и критериев, по которому построены оси
+        self.ends = ends  # концы осей: [(x, y)]
+        self.labels = labels  # подписи осей: [(x, y, текст, ha, va, поворот)]
+
+
+class PlotModel:
+    """
+    Общие данные графика городов: исходные данные, цвета и подготовленная геометрия.
+
+    Геометрия рассчитывается один раз при добавлении города, а виджеты (на главном окне
+    и во всплывающем окне) только рисуют ее. Номер версии меняется при каждом изменении,
+    по нему виджет понимает, что нарисованное изображение устарело.
+
+    Подписи значений всех городов размещаются общим LabelPlacer. Подписи городов со скрытыми
+    значениями не размещаются и не занимают мест, поэтому при смене видимости подписи
+    размещаются заново.
+    """
+
+    # Углы секторов сфер
+    sphere_angles = {
+        "Политическая": (np.pi / 12, 5 * np.pi / 12),  # 15°–75°
+        "Экономическая": (7 * np.pi / 12, 11 * np.pi / 12),  # 105°–165°
+        "Социальная": (13 * np.pi / 12, 17 * np.pi / 12),  # 195°–255°
+        "Духовная": (19 * np.pi / 12, 23 * np.pi / 12)  # 285°–345°
+    }
+
+    # Длина оси критерия
+    max_length = 10
+
+    def __init__(self, label_threshold=0.5):
+        self.cities_data = {}  # словарь для хранения данных нескольких городов
+        self.cities_data_not_normalized = {}  # словарь для хранения ненормализованных данных нескольких городов
+        self.cities = {}  # город -> CityGeometry (в порядке добавления)
+        self.color_palette = color_palette
+        self.label_placer = LabelPlacer(threshold=label_threshold)  # занятые позиции подписей значений всех городов
+        self.hidden_values = set()  # города, подписи значений которых скрыты
+        self._label_anchors = {}  # город -> исходные позиции подписей: [(x, y, шаг x, шаг y, текст, поворот)]
+        self.axes = None  # AxesGeometry или None, если осей нет
+        self._spheres = None
+        self.version = 0
+
+    @property
+    def spheres(self):
+        """Данные, по которым строятся оси (последний добавленный город)"""
+        return self._spheres
+
+    @spheres.setter
+    def spheres(self, spheres):
+        self._spheres = spheres
+        self._update_axes()
+        self.version += 1
+
+    def add_city(self, city_name, city_spheres_data_normalaized, city_spheres_data):
+        """
+        Добавляет или обновляет город и рассчитывает его геометрию.
+        :return: Геометрия города.
+        """
+        if city_name in self.cities_data:
+            self._forget_city(city_name)
+            self.cities_data.pop(city_name)
+            self.cities_data_not_normalized.pop(city_name)
+        self.cities_data[city_name] = city_spheres_data_normalaized
+        self.cities_data_not_normalized[city_name] = city_spheres_data
+        self._spheres = city_spheres_data_normalaized  # оси строятся по данным последнего добавленного города
+        self._update_axes()
+
+        color = self._pick_color()
+        self.cities[city_name] = self._build_city(city_name, city_spheres_data_normalaized, city_spheres_data, color)
+        self.version += 1
+        return self.cities[city_name]
+
+    def set_values_visible(self, city_name, visible):
+        """
+        Показывает или скрывает подписи значений города. Подписи всех городов размещаются
+        заново, как если бы скрытых подписей не было.
+        """
+        if city_name not in self.cities or (city_name not in self.hidden_values) == visible:
+            return
+        if visible:
+            self.hidden_values.discard(city_name)
+        else:
+            self.hidden_values.add(city_name)
+        self._replace_labels()
+        self.version += 1
+
+    def remove_city(self, city_name):
+        """Удаляет город; геометрия остальных городов не пересчитывается."""
+        if city_name not in self.cities_data:
+            return
+        self._forget_city(city_name)
+        self.cities_data.pop(city_name, None)
+        self.cities_data_not_normalized.pop(city_name, None)
+
+        # Оси строятся по данным последнего добавленного города
+        self._spheres = self.cities_data[next(reversed(self.cities_data))] if self.cities_data else None
+        self._update_axes()
+        self.version += 1
+
+    def clear(self):
+        """Удаляет все города."""
+        self.cities_data.clear()
+        self.cities_data_not_normalized.clear()
+        self.cities.clear()
+        self.label_placer.clear()
+        self.hidden_values.clear()
+        self._label_anchors.clear()
+        self._spheres = None
+        self.axes = None
+        self.version += 1
+
+    def _forget_city(self, city_name):
+        self.cities.pop(city_name, None)
+        self.label_placer.remove(city_name)
+        self.hidden_values.discard(city_name)
+        self._label_anchors.pop(city_name, None)
+
+    def _place_labels(self, city_name):
+        """Размещает подписи значений города (у города со скрытыми значениями подписей нет)"""
+        if city_name in self.hidden_values:
+            return []
+        labels = []
+        for label_x, label_y, step_x, step_y, label_text, rotation_deg in self._label_anchors[city_name]:
+            # Сдвигаем подпись вдоль оси, пока рядом есть подписи этого или других городов
+            label_x, label_y = self.label_placer.place(label_x, label_y, step_x, step_y,
+                                                       max_attempts=10, owner=city_name)
+            labels.append((label_x, label_y, label_text, rotation_deg))
+        return labels
+
+    def _replace_labels(self):
+        """Размещает подписи всех городов заново в порядке добавления; геометрия пересоздается
+        только у городов, подписи которых изменились"""
+        self.label_placer.clear()
+        for city_name, geometry in self.cities.items():
+            labels = self._place_labels(city_name)
+            if labels != geometry.labels:
+                self.cities[city_name] = CityGeometry(geometry.color, geometry.points, labels, geometry.polygon)
+
+    def _pick_color(self):
+        """Первый свободный цвет палитры (при нехватке цвета повторяются по кругу)"""
+        used = {geometry.color for geometry in self.cities.values()}
+        for color in self.color_palette:
+            if color not in used:
+                return color
+        return self.color_palette[len(self.cities) % len(self.color_palette)]
+
+    def _update_axes(self):
+        """Пересчитывает оси критериев, только если изменился состав сфер и критериев"""
+        layout = None
+        if self._spheres:
+            layout = tuple((sphere, tuple(axis_name for axis_name, _ in axes)) for sphere, axes in self._spheres.items())
+        if self.axes is not None and layout == self.axes.layout:
+            return
+        self.axes = self._build_axes(layout) if layout else None
+
+    def _axis_angles(self, sphere, count):
+        """Углы осей критериев сферы"""
+        start_angle, end_angle = self.sphere_angles[sphere]
+        total_span = end_angle - start_angle
+        step = total_span / (count + 1) if count > 1 else total_span / 2
+        return [start_angle + step * (i + 1) for i in range(count)]
+
+    def _build_axes(self, layout):
+        """рассчитываем оси и их надписи"""
+        ends = []
+        labels = []
+        for sphere, axis_names in layout:
+            for axis_name, angle in zip(axis_names, self._axis_angles(sphere, len(axis_names))):
+                x_end = self.max_length * np.cos(angle)
+                y_end = self.max_length * np.sin(angle)
+                ends.append((x_end, y_end))
+
+                #добавить надпись оси
+                angle_deg = np.degrees(angle) % 360
+                ha, va, text_x, text_y = self.get_text_position(angle_deg, x_end, y_end)
+
+                # Разбиваем длинные надписи на несколько строк
+                wrapped_text = self.wrap_text(axis_name)
+
+                # Добавляем дополнительное вращение для второй и третьей четвертей
+                if 90 <= angle_deg < 270:  # Вторая и третья четверти
+                    rotation = angle_deg + 180
+                else:
+                    rotation = angle_deg
+                labels.append((text_x, text_y, wrapped_text, ha, va, rotation))
+        return AxesGeometry(layout, ends, labels)
+
+    def _build_city(self, city_name, city_data, city_data_not_norm, color):
+        """рассчитываем точки, подписи значений и полигон города"""
+        points = []
+        anchors = []
+        for (sphere, axes), (sphere_not_norm, axes_not_norm) in zip(city_data.items(), city_data_not_norm.items()):
+            not_norm_value = [value for axis_name, value in axes_not_norm]
+            angles = self._axis_angles(sphere, len(axes))
+
+            for i, (axis_name, value) in enumerate(axes):
+                if math.isnan(value):
+                    value = 0
+
+                angle = angles[i]
+                x_end = self.max_length * np.cos(angle)
+                y_end = self.max_length * np.sin(angle)
+
+                x = (value / self.max_length) * x_end
+                y = (value / self.max_length) * y_end
+                points.append((x, y))
+
+                if math.isnan(not_norm_value[i]):
+                    continue
+
+                # Position label along the axis direction with offset
+                label_text = f"{not_norm_value[i]}"
+                shift_amount = 0.1 + 0.05 * len(label_text)
+
+                # Calculate rotation angle for label text in degrees
+                rotation_deg = 0
+                center_offset = 0
+                if 0 <= value <= 3:
+                    rotation_deg = np.degrees(angle)
+                    # Adjust rotation for readability
+                    if 90 < rotation_deg < 270:
+                        rotation_deg += 180
+                    center_offset = 3  # Apply offset only for rotated labels
+
+                label_x = x + shift_amount * np.cos(angle) + center_offset * np.cos(angle)
+                label_y = y + shift_amount * np.sin(angle) + center_offset * np.sin(angle)
+                anchors.append((label_x, label_y, shift_amount * np.cos(angle), shift_amount * np.sin(angle),
+                                label_text, rotation_deg))
+
+        self._label_anchors[city_name] = anchors
+        points = np.array(points, dtype=float).reshape(-1, 2)
+        polygon = points if len(points) >= 3 else None
+        return CityGeometry(color, points, self._place_labels(city_name), polygon)
+
+    @staticmethod
+    def get_text_position(angle, x, y):
+        """Определение позиции подписи оси"""
+        # Добавляем смещение от конца оси
+        offset_x = x * labels_offset_x
+        offset_y = y * labels_offset_y
+
+        if 0 <= angle < 45:  # Начало 1-й четверти
+            return ('left', 'center', offset_x, offset_y)
+        elif 45 <= angle < 90:  # Конец 1-й четверти
+            return ('left', 'center', offset_x, offset_y)
+        elif 90 <= angle < 135:  # Начало 2-й четверти
+            return ('right', 'center', offset_x, offset_y)
+        elif 135 <= angle < 180:  # Конец 2-й четверти
+            return ('right', 'center', offset_x, offset_y)
+        elif 180 <= angle < 225:  # конец 3-й четверти
+            return ('right', 'center', offset_x, offset_y)
+        elif 225 <= angle < 270:  # 4-я четверть
+            return ('right', 'center', offset_x, offset_y)
+        elif 270 <= angle < 315:  # 4-я четверть
+            return ('left', 'center', offset_x, offset_y)
+        else:  # конец 4-й четверти (315-360)
+            return ('left', 'center', offset_x, offset_y)
+
+    @staticmethod
+    def wrap_text(text, max_chars_per_line=fun_split_max_chars_per_line):
+        """Разбивает текст на несколько строк,
+          если он превышает максимальную длину строки"""
+        words = text.split()
+        lines = []
+        current_line = []
+        current_length = 0
+
+        for word in words:
+            if current_length + len(word) + 1 <= max_chars_per_line:
+                current_line.append(word)
+                current_length += len(word) + 1
+            else:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+                current_length = len(word)
+
+        if current_line:
+            lines.append(' '.join(current_line))
+
+        return '\n'.join(lines)
@@ -1,30 +1,248 @@
-from matplotlib.patches import FancyArrowPatch
+from contextlib import contextmanager
+import math
+
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.lines import Line2D
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+from matplotlib.transforms import IdentityTransform
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from PyQt6.QtCore import QRectF, QTimer
+from PyQt6.QtGui import QImage, QPainter
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QCheckBox, QHBoxLayout, QListWidget, QListWidgetItem, QLabel, QPushButton
 import numpy as np
-import math
 from Foothold_city.Resources.const import *
+from Foothold_city.Views.plot_model import PlotModel
 
 # Установка глобальных параметров для шрифта Times New Roman
 plt.rcParams['font.family'] = font_family
 plt.rcParams['font.serif'] = font_serif
 plt.rcParams['font.size'] = font_size
 
+
+class AxisArrowCollection(LineCollection):
+    """
+    Стрелки осей критериев из начала координат одним набором линий (вместо FancyArrowPatch на каждую ось).
+    Наконечники повторяют стиль '->' FancyArrowPatch: размеры заданы в пунктах
+    и пересчитываются в пиксели при каждой отрисовке, поэтому не зависят от масштаба графика.
+    """
+
+    def __init__(self, ends, mutation_scale=15, shrink=2, **kwargs):
+        """
+        :param ends: Координаты концов осей (в единицах графика).
+        :param mutation_scale: Размер наконечника в пунктах (как у FancyArrowPatch).
+        :param shrink: Отступ стрелки от начала и конца оси в пунктах.
+        """
+        super().__init__([], **kwargs)
+        self._ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+        self._mutation_scale = mutation_scale
+        self._shrink = shrink
+        self.set_transform(IdentityTransform())
+
+    def draw(self, renderer):
+        if not self.get_visible() or len(self._ends) == 0:
+            return
+        points_to_pixels = renderer.points_to_pixels(1.0)
+        head_length = 0.4 * self._mutation_scale * points_to_pixels
+        head_width = 0.2 * self._mutation_scale * points_to_pixels
+        head_dist = np.hypot(head_length, head_width)
+        cos_t, sin_t = head_length / head_dist, head_width / head_dist
+        shrink = self._shrink * points_to_pixels
+        # Линия чуть отступает от острия, чтобы ее конец не выступал из наконечника
+        pad = 0.5 * self.get_linewidth()[0] * points_to_pixels / sin_t
+
+        start = self.axes.transData.transform((0, 0))
+        ends = self.axes.transData.transform(self._ends)
+        unit = ends - start
+        unit /= np.maximum(np.hypot(unit[:, 0], unit[:, 1]), 1e-12)[:, None]
+
+        shaft_start = start + unit * shrink
+        tip = ends - unit * (shrink + pad)
+        back_x, back_y = -unit[:, 0] * head_dist, -unit[:, 1] * head_dist
+        wing_1 = tip + np.column_stack((cos_t * back_x + sin_t * back_y, -sin_t * back_x + cos_t * back_y))
+        wing_2 = tip + np.column_stack((cos_t * back_x - sin_t * back_y, sin_t * back_x + cos_t * back_y))
+
+        shafts = np.stack((shaft_start, tip), axis=1)
+        heads = np.stack((wing_1, tip, wing_2), axis=1)
+        self.set_segments(list(shafts) + list(heads))
+        super().draw(renderer)
+
+
+class AdaptiveFigureCanvas(FigureCanvas):
+    """
+    Холст, растеризующий фигуру постоянного размера в дюймах под фактический размер виджета.
+
+    Разрешение (dpi) подбирается так, чтобы меньшая сторона фигуры заняла меньшую сторону виджета,
+    поэтому взаимное расположение элементов и размеры шрифтов относительно графика не меняются,
+    а буфер Agg соответствует размеру виджета на экране.
+
+    Масштабирование в QGraphicsView идет по уровням детализации (кратность растеризации 1, 2, 4, 8...):
+    на время отрисовки разрешение фигуры увеличивается в кратность уровня (Figure.set_dpi), буфер Agg
+    копируется в изображение уровня, и разрешение возвращается к экранному, поэтому координаты событий
+    мыши и размер фигуры в дюймах от уровня не зависят. Готовые изображения уровней хранятся, пока
+    не изменится содержимое графика: при смене масштаба сразу показывается ближайший готовый уровень,
+    а перерисовка с нужным разрешением выполняется по таймеру, когда масштаб перестает меняться.
+    """
+
+    def __init__(self, figure, max_render_pixels=figure_max_render_pixels,
+                 refine_delay_ms=figure_refine_delay_ms, cached_levels=figure_cached_levels):
+        """
+        :param max_render_pixels: Наибольшая сторона растрового изображения в пикселях.
+        :param refine_delay_ms: Задержка перерисовки с новым разрешением после изменения масштаба.
+        :param cached_levels: Сколько изображений разных уровней детализации хранить.
+        """
+        super().__init__(figure)
+        self.figure_inches = tuple(figure.get_size_inches())
+        self.max_render_pixels = max_render_pixels
+        self.cached_levels = cached_levels
+        self.render_scale = 1  # уровень детализации, который должен быть на экране
+        self._rendered_scale = 1  # уровень детализации последней растеризации
+        self._level_images = {}  # уровень детализации -> QImage с текущим содержимым графика
+        self._content_changed = True  # содержимое изменилось после последней растеризации
+
+        self._refine_timer = QTimer(self)
+        self._refine_timer.setSingleShot(True)
+        self._refine_timer.setInterval(refine_delay_ms)
+        self._refine_timer.timeout.connect(self.refine)
+
+    def fit_figure(self, width, height):
+        """Подбирает разрешение фигуры под логический размер холста (в пикселях)."""
+        if width <= 0 or height <= 0:
+            return
+        base_dpi = min(width / self.figure_inches[0], height / self.figure_inches[1])
+        self.figure.set_dpi(base_dpi * self.device_pixel_ratio)
+        self.figure.set_size_inches(width / base_dpi, height / base_dpi, forward=False)
+
+    def resizeEvent(self, event):
+        # Разрешение задается до обработки размера в FigureCanvasQT: размер фигуры в дюймах
+        # он пересчитывает из размера виджета и dpi фигуры (в том числе при смене device pixel ratio)
+        if self.figure is not None:
+            self.fit_figure(event.size().width(), event.size().height())
+        super().resizeEvent(event)
+
+    def draw_idle(self):
+        # Отложенная перерисовка запрашивается при изменении графика или размера:
+        # изображения других уровней детализации устаревают
+        self._content_changed = True
+        super().draw_idle()
+
+    def draw(self):
+        if self._content_changed:
+            self._level_images.clear()
+            self._content_changed = False
+        self._rendered_scale = self.render_scale
+        screen_dpi = self.figure.dpi
+        if self._rendered_scale != 1:
+            self.figure.set_dpi(screen_dpi * self._rendered_scale)
+        try:
+            super().draw()
+            self._store_level_image()
+        finally:
+            if self._rendered_scale != 1:
+                self.figure.set_dpi(screen_dpi)
+
+    def _store_level_image(self):
+        """Сохраняет копию буфера Agg как изображение текущего уровня детализации."""
+        buffer = self.buffer_rgba()
+        height, width = buffer.shape[:2]
+        if width <= 0 or height <= 0:
+            return
+        self._level_images[self._rendered_scale] = QImage(
+            buffer, width, height, QImage.Format.Format_RGBA8888).copy()
+
+        # Храним не больше cached_levels изображений, ближайших к текущему уровню
+        while len(self._level_images) > self.cached_levels:
+            farthest = max(self._level_images, key=lambda level: abs(math.log2(level / self._rendered_scale)))
+            del self._level_images[farthest]
+
+    def _nearest_level_image(self):
+        """Изображение нужного уровня детализации или ближайшего к нему (предпочтительно большего)."""
+        if not self._level_images:
+            return None
+        level = min(self._level_images,
+                    key=lambda level: (abs(math.log2(level / self.render_scale)), -level))
+        return self._level_images[level]
+
+    def paintEvent(self, event):
+        # Буфер Agg может быть растеризован с разрешением другого уровня, поэтому на экран всегда
+        # выводится изображение уровня; запрошенная перерисовка выполнится по таймеру draw_idle
+        image = self._nearest_level_image()
+        painter = QPainter(self)
+        try:
+            painter.eraseRect(event.rect())
+            if image is not None:
+                # Изображение любого уровня вписывается в логический размер холста;
+                # при масштабировании в QGraphicsView Qt использует все его пиксели
+                painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+                painter.drawImage(QRectF(self.rect()), image)
+        finally:
+            painter.end()
+
+    def set_render_scale(self, scale):
+        """
+        Задает масштаб, с которым изображение показывается на экране. Уровень детализации
+        меняется, только когда масштаб переходит через очередную ступень; готовое изображение
+        уровня показывается сразу, иначе холст перерисовывается после паузы в масштабировании.
+        :return: True, если уровень детализации изменился.
+        """
+        longest_side = max(self.width(), self.height()) * self.device_pixel_ratio
+        level = 1
+        while level < scale and longest_side * level * 2 <= self.max_render_pixels:
+            level *= 2
+        if level == self.render_scale:
+            return False
+        self.render_scale = level
+        if level == self._rendered_scale:
+            self._refine_timer.stop()
+        else:
+            self._refine_timer.start()
+        self.update()
+        return True
+
+    def refine(self):
+        """Растеризует график с разрешением текущего уровня детализации."""
+        self._refine_timer.stop()
+        if self._rendered_scale == self.render_scale and not self._content_changed:
+            return
+        if self.render_scale in self._level_images and not self._content_changed:
+            self._rendered_scale = self.render_scale  # изображение уровня уже есть
+            return
+        self.draw()
+
+
 class VisualizationWidget(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, model=None, adaptive_size=figure_adaptive_size):
+        """
+        :param model: Общие данные графика (PlotModel). Если передать модель другого виджета,
+            оба виджета рисуют одну и ту же подготовленную геометрию.
+        :param adaptive_size: True - разрешение графика подбирается под размер виджета,
+            False - фигура растеризуется целиком (subplots_figsize × 100 точек на дюйм).
+        """
         super().__init__(parent)
 
-        self.figure, self.ax = plt.subplots(figsize=(subplots_figsize_width, subplots_figsize_heigh))
-        self.canvas = FigureCanvas(self.figure)
-        self._spheres = None
+        self.figure = Figure(figsize=(subplots_figsize_width, subplots_figsize_heigh))
+        self.ax = self.figure.add_subplot()
+        self.adaptive_size = adaptive_size
+        self.canvas = AdaptiveFigureCanvas(self.figure) if adaptive_size else FigureCanvas(self.figure)
+        self.model = model if model is not None else PlotModel()
         self.plt_size = 13
         self.plot = plt
-        self.cities_data = {}  # словарь для хранения данных нескольких городов
-        self.cities_data_not_normalized = {}  # словарь для хранения ненормализованных данных нескольких городов
         #словарь для цветовой палитры
-        self.color_palette = color_palette
-        self.value_visibility = {}  # словарь для отслеживания видимости значений для каждого города
+        self.color_palette = self.model.color_palette
+
+        # Отрисованные элементы графика хранятся и изменяются точечно, без полной перерисовки
+        self._axes_artists = []  # оси критериев и их подписи
+        self._axes_geometry = None  # геометрия модели, по которой нарисованы оси
+        self._city_artists = {}  # город -> {"points": [...], "labels": [...], "polygon": [...]}
+        self._city_geometry = {}  # город -> геометрия модели, по которой нарисован город
+        self._city_legend = {}  # город -> обозначения города в легенде
+        self._legend = None
+        self._rendered_version = None  # версия модели, соответствующая нарисованному изображению
+        self._checkbox_cities = set()  # города, для которых созданы чекбоксы
+        self._batch_depth = 0  # вложенность блоков batch(): пока больше нуля, отрисовка откладывается
+        self._full_redraw_pending = False  # внутри batch() запрошена полная перерисовка
 
         # Создаем основной layout
         main_layout = QHBoxLayout(self)
@@ -64,18 +282,92 @@ class VisualizationWidget(QWidget):
         
         self.setLayout(main_layout)
 
+        # Фон (сферы и их подписи) рисуется один раз
+        self._draw_background()
+        # Города, уже имеющиеся в модели, рисуются одним проходом
+        self.sync()
+
+    def set_plot_size(self, width, height):
+        """
+        Задает размер области графика в логических пикселях (в режиме подстройки разрешения).
+        """
+        if not self.adaptive_size:
+            return
+        self.canvas.setFixedSize(width, height)
+        self.canvas.fit_figure(width, height)
+        self.canvas.draw_idle()
+
+    def set_render_scale(self, scale):
+        """Передает холсту масштаб, с которым график показывается в окне (QGraphicsView)."""
+        if self.adaptive_size:
+            self.canvas.set_render_scale(scale)
+
+    @property
+    def cities_data(self):
+        """словарь для хранения данных нескольких городов"""
+        return self.model.cities_data
+
+    @property
+    def cities_data_not_normalized(self):
+        """словарь для хранения ненормализованных данных нескольких городов"""
+        return self.model.cities_data_not_normalized
+
     def add_city_data(self, city_name, city_spheres_data_normalaized, city_spheres_data):
         """добавить или обновить данные для конкретного города"""
-        self.cities_data[city_name] = city_spheres_data_normalaized
-        self.cities_data_not_normalized[city_name] = city_spheres_data
-        self._spheres = city_spheres_data_normalaized  #сохранить данные посленего добавленного города для отрисовки осей
+        self.model.add_city(city_name, city_spheres_data_normalaized, city_spheres_data)
+        # Повторно добавленный город получает новый чекбокс, значения видимы
+        if city_name in self._checkbox_cities:
+            self.remove_city_checkbox(city_name)
+        self.sync()
+
+    def add_cities(self, cities):
+        """
+        Добавляет несколько городов с одной отрисовкой в конце.
+        :param cities: Словарь {название города: (нормализованные данные сфер, исходные данные сфер)}.
+        """
+        with self.batch():
+            for city_name, (city_spheres_data_normalaized, city_spheres_data) in cities.items():
+                self.add_city_data(city_name, city_spheres_data_normalaized, city_spheres_data)
+
+    @contextmanager
+    def batch(self):
+        """
+        Пакетное изменение графика: внутри блока добавление и удаление городов меняют только модель,
+        а чекбоксы и элементы графика создаются, и холст перерисовывается, один раз при выходе из блока.
+
+            with widget.batch():
+                for city_name in cities:
+                    widget.add_city_data(...)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                if self._full_redraw_pending:
+                    self.setup_quadrants()
+                else:
+                    self.sync()
 
-        #print("-------------------city_spheres_data_normalaized------------------------")
-        #print(city_spheres_data_normalaized)
-        #print("-------------------city_spheres_data------------------------")
-        #print(city_spheres_data)
+    def remove_city(self, city_name):
+        """удалить город с графика (остальные города не перерисовываются)"""
+        self.model.remove_city(city_name)
+        self.sync()
 
+    def remove_city_checkbox(self, city_name):
+        """Remove checkbox for a specific city from the list widget"""
+        for i in range(self.checkbox_list.count()):
+            item = self.checkbox_list.item(i)
+            widget = self.checkbox_list.itemWidget(item)
+            checkbox = widget.findChild(QCheckBox)
+            if checkbox and checkbox.text() == city_name:
+                self.checkbox_list.takeItem(i)
+                break
+        self._checkbox_cities.discard(city_name)
 
+    def _add_city_checkbox(self, city_name):
+        """Добавляет чекбокс видимости значений города"""
         # Создаем виджет для чекбокса
         checkbox_widget = QWidget()
         checkbox_layout = QHBoxLayout(checkbox_widget)
@@ -83,7 +375,7 @@ class VisualizationWidget(QWidget):
         
         # Создаем чекбокс
         checkbox = QCheckBox(f"{city_name}")
-        checkbox.setChecked(True)  # По умолчанию значения видимы
+        checkbox.setChecked(city_name not in self.model.hidden_values)  # По умолчанию значения видимы
         checkbox.stateChanged.connect(lambda state, city=city_name: self.toggle_city_values(city, state))
         checkbox_layout.addWidget(checkbox)
         
@@ -94,49 +386,105 @@ class VisualizationWidget(QWidget):
         # Добавляем виджет в список
         self.checkbox_list.addItem(item)
         self.checkbox_list.setItemWidget(item, checkbox_widget)
-        
-        self.value_visibility[city_name] = True
-        self.setup_quadrants()
-
-    def remove_city_checkbox(self, city_name):
-        """Remove checkbox for a specific city from the list widget"""
-        for i in range(self.checkbox_list.count()):
-            item = self.checkbox_list.item(i)
-            widget = self.checkbox_list.itemWidget(item)
-            checkbox = widget.findChild(QCheckBox)
-            if checkbox and checkbox.text() == city_name:
-                self.checkbox_list.takeItem(i)
-                break
+        self._checkbox_cities.add(city_name)
 
     def clear_cities(self):
         """очистить данные о городах"""
-        self.cities_data.clear()
-        self.cities_data_not_normalized.clear()
-        self._spheres = None
-        # Очищаем список чекбоксов
-        self.checkbox_list.clear()
-        self.value_visibility.clear()
-        self.setup_quadrants()
+        self.model.clear()
+        self.sync()
 
     def toggle_city_values(self, city_name, state):
-        """Переключение видимости значений для конкретного города"""
-        self.value_visibility[city_name] = bool(state)
-        self.setup_quadrants()
+        """
+        Переключение видимости значений для конкретного города. Скрытые подписи не занимают
+        мест на графике, поэтому перерисовываются города, подписи которых размещены заново.
+        """
+        self.model.set_values_visible(city_name, bool(state))
+        self.sync()
 
     @property
     def spheres(self):
         """Геттер для _spheres"""
-        return self._spheres
+        return self.model.spheres
 
     @spheres.setter
     def spheres(self, spheres):
         """Сеттер для _spheres с обновлением графика"""
-        self._spheres = spheres
-        self.setup_quadrants()
+        self.model.spheres = spheres
+        self.sync()
+
+    def sync(self):
+        """
+        Приводит нарисованное к текущему состоянию модели: удаляет и добавляет элементы
+        только изменившихся городов и осей. Если модель не менялась с последней отрисовки,
+        ранее нарисованное изображение холста используется без перерисовки.
+        """
+        if self._batch_depth or self._rendered_version == self.model.version:
+            return
+
+        # Удаляем города, которых нет в модели или геометрия которых пересчитана
+        for city_name in list(self._city_artists):
+            if self.model.cities.get(city_name) is not self._city_geometry.get(city_name):
+                self._remove_city_artists(city_name)
+
+        self._sync_checkboxes()
+
+        if self.model.axes is not self._axes_geometry:
+            self._draw_axes_geometry(self.model.axes)
+
+        for city_name, geometry in self.model.cities.items():
+            if city_name not in self._city_artists:
+                self._draw_city(city_name, geometry)
+
+        self._update_legend()
+        self._rendered_version = self.model.version
+        self.canvas.draw_idle()
+
+    def _sync_checkboxes(self):
+        """Приводит список чекбоксов к списку городов модели (список перестраивается один раз), а их
+        состояние - к видимости значений в модели"""
+        removed = self._checkbox_cities - self.model.cities.keys()
+        added = [city_name for city_name in self.model.cities if city_name not in self._checkbox_cities]
+        if removed or added:
+            self.checkbox_list.setUpdatesEnabled(False)
+            try:
+                if removed and not self.model.cities:
+                    self.checkbox_list.clear()
+                    self._checkbox_cities.clear()
+                for city_name in removed & self._checkbox_cities:
+                    self.remove_city_checkbox(city_name)
+                for city_name in added:
+                    self._add_city_checkbox(city_name)
+            finally:
+                self.checkbox_list.setUpdatesEnabled(True)
+
+        # Видимость значений хранится в общей модели и могла измениться в другом виджете
+        for i in range(self.checkbox_list.count()):
+            checkbox = self.checkbox_list.itemWidget(self.checkbox_list.item(i)).findChild(QCheckBox)
+            visible = checkbox.text() not in self.model.hidden_values
+            if checkbox.isChecked() != visible:
+                checkbox.blockSignals(True)
+                checkbox.setChecked(visible)
+                checkbox.blockSignals(False)
 
     def setup_quadrants(self):
-        """Метод разделяет график на 4 сферы"""
+        """Полная перерисовка графика: фон, оси и все города"""
+        if self._batch_depth:
+            self._full_redraw_pending = True
+            return
+        self._full_redraw_pending = False
         self.ax.clear()
+        self._axes_artists = []
+        self._axes_geometry = None
+        self._city_artists = {}
+        self._city_geometry = {}
+        self._city_legend = {}
+        self._legend = None
+        self._rendered_version = None
+        self._draw_background()
+        self.sync()
+
+    def _draw_background(self):
+        """Метод разделяет график на 4 сферы"""
         self.ax.set_xlim(-15, 15)
         self.ax.set_ylim(-12, 12)
 
@@ -150,251 +498,137 @@ class VisualizationWidget(QWidget):
         self.ax.text(-self.plt_size, -1, label_social, ha='center', va='center', fontsize=24, color='gray', alpha=0.3,)
         self.ax.text(self.plt_size, -1, label_religious, ha='center', va='center', fontsize=24, color='gray', alpha=0.3,)
 
-        self.plot_axes()
-
-    def plot_axes(self):
-        if not self._spheres:
-            return
-
-        sphere_angles = {
-            "Политическая": (np.pi / 12, 5 * np.pi / 12),  # 15°–75°
-            "Экономическая": (7 * np.pi / 12, 11 * np.pi / 12),  # 105°–165°
-            "Социальная": (13 * np.pi / 12, 17 * np.pi / 12),  # 195°–255°
-            "Духовная": (19 * np.pi / 12, 23 * np.pi / 12)  # 285°–345°
-        }
-
-        # рисуем оси один раз, используя данные последнего города
-        self._draw_axes(sphere_angles)
-
-        # рисуем матрицу для каждого города
-        for i, (city_name, city_data ) in enumerate(self.cities_data.items()):
-            color = self.color_palette[i % len(self.color_palette)]
-            #получаем исходные данные значений для города 
-            city_data_not_norm = self.cities_data_not_normalized[city_name]
-            self._draw_city_polygon(city_data, city_data_not_norm, sphere_angles, color, city_name)
-
         # Скрытие стандартных осей
         for spine in self.ax.spines.values():
             spine.set_visible(False)
         self.ax.set_xticks([])
         self.ax.set_yticks([])
 
-        self.canvas.draw()
+    def _draw_city(self, city_name, geometry):
+        """рисуем матрицу города и запоминаем ее элементы"""
+        self._city_artists[city_name] = self._draw_city_polygon(geometry, city_name)
+        self._city_geometry[city_name] = geometry
 
-    def _draw_axes(self, sphere_angles):
-        """рисуем оси и их надписи"""
+    def _remove_city_artists(self, city_name):
+        """удаляем с графика элементы города"""
+        artists = self._city_artists.pop(city_name, None)
+        if artists is None:
+            return
+        for group in artists.values():
+            for artist in group:
+                artist.remove()
+        self._city_geometry.pop(city_name, None)
+        self._city_legend.pop(city_name, None)
+
+    def _update_legend(self):
+        """Обновляем легенду (показывается, пока на графике есть города)"""
+        if self._legend is not None:
+            self._legend.remove()
+            self._legend = None
+        if not self._city_artists:
+            return
+
+        # обозначения фона и осей собираются с графика, обозначения городов добавляются отдельно
+        handles, labels = self.ax.get_legend_handles_labels()
+        for city_name, city_handles in self._city_legend.items():
+            handles += city_handles
+            labels += [city_name] * len(city_handles)
+
+        # добавление легенды
+        self._legend = self.ax.legend(handles, labels, loc='upper left', bbox_to_anchor=(1.14, 1.0), borderaxespad=0.5, labelcolor='#0000004d')
+
+        # Adjust the figure to make room for the legend
+        self.figure.subplots_adjust(right=0.65)
+
+    def _draw_axes_geometry(self, axes_geometry):
+        """Перерисовывает оси критериев по геометрии модели"""
+        for artist in self._axes_artists:
+            artist.remove()
+        self._axes_artists = self._draw_axes(axes_geometry) if axes_geometry is not None else []
+        self._axes_geometry = axes_geometry
+
+    def _draw_axes(self, axes_geometry):
+        """рисуем оси и их надписи
+        :return: Список нарисованных элементов.
+        """
+        artists = []
         # Добавляем в легенду обозначение для осей
-        self.ax.plot([0, 0], [0, 0], color = (0/255, 0/255, 0/255) , alpha=0.3, linestyle='--', linewidth=1, 
+        artists += self.ax.plot([0, 0], [0, 0], color = (0/255, 0/255, 0/255) , alpha=0.3, linestyle='--', linewidth=1,
                     marker='>', markersize=5, label=label_numeric_axes)
         
         # Добавляем в легенду обозначение для точек (только один раз)
-        self.ax.scatter([0], [0], facecolors='none', edgecolors='black', alpha=0.3, s=50, 
-                       label=label_points)
-        
-        for sphere, axes in self._spheres.items():
-            start_angle, end_angle = sphere_angles[sphere]
-            count = len(axes)
-            """for i, (axis_name, value) in enumerate(axes):
-                if math.isnan(value):
-                    count -= 1"""
-            total_span = end_angle - start_angle
-            step = total_span / (count + 1) if count > 1 else total_span / 2
-
-            for i, (axis_name, value) in enumerate(axes):
-                """if math.isnan(value):
-                    continue"""
-
-                angle = start_angle + step * (i + 1)
-                max_length = 10
-
-                x_end = max_length * np.cos(angle)
-                y_end = max_length * np.sin(angle)
-
-                # рисуем стрелку оси
-                arrow = FancyArrowPatch(
-                    (0, 0), (x_end, y_end),
-                    arrowstyle='->',
-                    linestyle='dashed',
-                    color = (0/255, 0/255, 0/255) , 
-                    alpha=0.3,
-                    mutation_scale=15,
-                    linewidth=1,
-                    zorder=1
-                )
-                self.ax.add_patch(arrow)
-
-                #добавить надпись оси
-                angle_deg = np.degrees(angle) % 360
-                ha, va, text_x, text_y = self.get_text_position(
-                    angle_deg, x_end, y_end 
-                )
-                
-                # Разбиваем длинные надписи на несколько строк
-                wrapped_text = self.wrap_text(axis_name)
-                
-                # Добавляем дополнительное вращение для второй и третьей четвертей
-                if 90 <= angle_deg < 270:  # Вторая и третья четверти
-                    rotation = angle_deg + 180
-                else:
-                    rotation = angle_deg
-                
-                self.ax.text(
-                    text_x, text_y, wrapped_text,
-                    fontsize=14,
-                    color = (0/255, 0/255, 0/255) , 
-                    alpha=0.3,
-                    ha=ha,
-                    va=va,
-                    rotation=rotation,
-                    rotation_mode='anchor',
-                    bbox=dict(boxstyle='round,pad=0.2', fc='white', ec='none')
-                )
-
-    def _draw_city_polygon(self, city_data, city_data_not_norm, sphere_angles, color, city_name):
-        """рисуем матрицу для конкретного города"""
-        points = []
-
-        # Reset placed label positions for this city only
-        self._placed_label_positions = []
-
-        for (sphere, axes), (sphere_not_norm, axes_not_norm) in zip(city_data.items(), city_data_not_norm.items()):
-            
-            start_angle, end_angle = sphere_angles[sphere]
-            count = len(axes)
-            for i, (axis_name, value) in enumerate(axes):
-                """if math.isnan(value):
-                    count -= 1"""
-            total_span = end_angle - start_angle
-            step = total_span / (count + 1) if count > 1 else total_span / 2
-
-            not_norm_value = []
-            for i, (axis_name, value) in enumerate(axes_not_norm):
-                not_norm_value.append(value)
-
-            for i, (axis_name, value) in enumerate(axes):
-                """if math.isnan(value):
-                    continue"""
-                
-                if math.isnan(value):
-                    value = 0
-
-                angle = start_angle + step * (i + 1)
-                max_length = 10
-
-                x_end = max_length * np.cos(angle)
-                y_end = max_length * np.sin(angle)
-
-                x = (value / max_length) * x_end
-                y = (value / max_length) * y_end
-                points.append((x, y))
-                
-                """координаты"""
-
-                # рисуем точку
-                self.ax.scatter(x, y, color=color, zorder=3)
-                # Показываем значение только если включена видимость для этого города
-
-                if self.value_visibility.get(city_name, True):
-                    # Position label along the axis direction with offset
-                    label_text = f"{not_norm_value[i]}"
-                    shift_amount = 0.1 + 0.05 * len(label_text)
-                    max_attempts = 10
-                    attempts = 0
-
-                    # Calculate rotation angle for label text in degrees
-                    rotation_deg = 0
-                    center_offset = 0
-                    if 0 <= value <= 3:
-                        rotation_deg = np.degrees(angle)
-                        # Adjust rotation for readability
-                        if 90 < rotation_deg < 270:
-                            rotation_deg += 180
-                        center_offset = 3  # Apply offset only for rotated labels
-
-                    label_x = x + shift_amount * np.cos(angle) + center_offset * np.cos(angle)
-                    label_y = y + shift_amount * np.sin(angle) + center_offset * np.sin(angle)
-
-                    def is_too_close(x1, y1, positions, threshold=0.5):
-                        for (px, py) in positions:
-                            if abs(x1 - px) < threshold and abs(y1 - py) < threshold:
-                                return True
-                        return False
-
-                    while is_too_close(label_x, label_y, self._placed_label_positions) and attempts < max_attempts:
-                        label_x += shift_amount * np.cos(angle)
-                        label_y += shift_amount * np.sin(angle)
-                        attempts += 1
-
-                    self._placed_label_positions.append((label_x, label_y))
-
-                    # Calculate rotation angle for label text in degrees
-                    rotation_deg = 0
-                    if 0 <= value <= 3:
-                        rotation_deg = np.degrees(angle)
-                        # Adjust rotation for readability
-                        if 90 < rotation_deg < 270:
-                            rotation_deg += 180
-
-                    if not (math.isnan(not_norm_value[i])):
-                        self.ax.text(
-                            label_x, label_y, f"{not_norm_value[i]}",
-                            fontsize=14,
-                            ha='center',
-                            va='center',
-                            rotation=rotation_deg,
-                            rotation_mode='anchor',
-                            color = (0/255, 0/255, 0/255) , 
-                            alpha=0.3,
-                        )
-        for sphere, axes_not_norm in city_data_not_norm.items():            
-            """показываем исходные значения"""
-            for i, (axis_name, value) in enumerate(axes_not_norm):
-                new_value = value
-
-                
-
-        if len(points) >= 3:
-            points = np.array(points)
-            
-            # Разделяем координаты X и Y
-            X, Y = points[:, 0], points[:, 1]
-            
+        artists.append(self.ax.scatter([0], [0], facecolors='none', edgecolors='black', alpha=0.3, s=50,
+                       label=label_points))
+
+        #добавить надписи осей
+        for text_x, text_y, wrapped_text, ha, va, rotation in axes_geometry.labels:
+            artists.append(self.ax.text(
+                text_x, text_y, wrapped_text,
+                fontsize=14,
+                color = (0/255, 0/255, 0/255) , 
+                alpha=0.3,
+                ha=ha,
+                va=va,
+                rotation=rotation,
+                rotation_mode='anchor',
+                bbox=dict(boxstyle='round,pad=0.2', fc='white', ec='none')
+            ))
+
+        # рисуем стрелки осей
+        arrows = AxisArrowCollection(
+            axes_geometry.ends,
+            mutation_scale=15,
+            linestyle='dashed',
+            colors=[(0/255, 0/255, 0/255, 0.3)],
+            linewidths=1,
+            capstyle='butt',
+            joinstyle='miter',
+            zorder=1
+        )
+        artists.append(self.ax.add_collection(arrows, autolim=False))
+        return artists
+
+    def _draw_city_polygon(self, geometry, city_name):
+        """рисуем матрицу для конкретного города
+        :return: Словарь нарисованных элементов: точки, подписи значений и полигон.
+        """
+        artists = {"points": [], "labels": [], "polygon": []}
+        color = geometry.color
+
+        # Подписи скрытых значений в геометрии города отсутствуют
+        for label_x, label_y, label_text, rotation_deg in geometry.labels:
+            label = self.ax.text(
+                label_x, label_y, label_text,
+                fontsize=14,
+                ha='center',
+                va='center',
+                rotation=rotation_deg,
+                rotation_mode='anchor',
+                color = (0/255, 0/255, 0/255) , 
+                alpha=0.3,
+            )
+            artists["labels"].append(label)
+
+        # рисуем точки
+        if len(geometry.points):
+            artists["points"].append(self.ax.scatter(geometry.points[:, 0], geometry.points[:, 1], color=color, zorder=3))
+
+        if geometry.polygon is not None:
+            # Полигон замкнут; заливка и контур рисуются одним элементом
+            face_color = to_rgba(color, 0.3) if fill_polygon else 'none'
+            polygon = PolyCollection([geometry.polygon], closed=True, facecolors=[face_color], edgecolors=[color],
+                                     linewidths=2, joinstyle='round', capstyle='projecting', zorder=2)
+            artists["polygon"].append(self.ax.add_collection(polygon, autolim=False))
+
+            # обозначения города в легенде
+            legend_handles = []
             if (fill_polygon == True ):
-                self.ax.fill(X, Y, color=color, alpha=0.3, label=city_name)
+                legend_handles.append(Patch(color=color, alpha=0.3))
+            legend_handles.append(Line2D([], [], color=color, linewidth=2))
+            self._city_legend[city_name] = legend_handles
 
-            # Рисуем полигон, замыкая его (добавляя первую точку в конец)
-            self.ax.plot(np.append(X, X[0]), np.append(Y, Y[0]), color=color, linewidth=2, label=city_name)
-            
-        # добавление легенды
-        legend = self.ax.legend(loc='upper left', bbox_to_anchor=(1.14, 1.0), borderaxespad=0.5, labelcolor='#0000004d')
-        
-        # Adjust the figure to make room for the legend
-        self.figure.subplots_adjust(right=0.65)
+        return artists
 
-    def get_text_position(self, angle, x, y):
-        """Определение позиции подписи оси"""
-        # Добавляем смещение от конца оси
-        offset_x = x * labels_offset_x
-        offset_y = y * labels_offset_y
-
-        if 0 <= angle < 45:  # Начало 1-й четверти
-            return ('left', 'center', offset_x, offset_y)
-        elif 45 <= angle < 90:  # Конец 1-й четверти
-            return ('left', 'center', offset_x, offset_y)
-        elif 90 <= angle < 135:  # Начало 2-й четверти
-            return ('right', 'center', offset_x, offset_y)
-        elif 135 <= angle < 180:  # Конец 2-й четверти
-            return ('right', 'center', offset_x, offset_y)
-        elif 180 <= angle < 225:  # конец 3-й четверти
-            return ('right', 'center', offset_x, offset_y)
-        elif 225 <= angle < 270:  # 4-я четверть
-            return ('right', 'center', offset_x, offset_y)
-        elif 270 <= angle < 315:  # 4-я четверть
-            return ('left', 'center', offset_x, offset_y)
-        else:  # конец 4-й четверти (315-360)
-            return ('left', 'center', offset_x, offset_y)
-    
-        
     def clear_checkboxes(self):
         """Сбросить чекбоксы"""
         for i in range(self.checkbox_list.count()):
@@ -412,25 +646,3 @@ class VisualizationWidget(QWidget):
             checkbox = widget.findChild(QCheckBox)
             if checkbox:
                 checkbox.setChecked(True)
-
-    def wrap_text(self, text, max_chars_per_line = fun_split_max_chars_per_line):
-            """Разбивает текст на несколько строк,
-              если он превышает максимальную длину строки"""
-            words = text.split()
-            lines = []
-            current_line = []
-            current_length = 0
-            
-            for word in words:
-                if current_length + len(word) + 1 <= max_chars_per_line:
-                    current_line.append(word)
-                    current_length += len(word) + 1
-                else:
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-                    current_length = len(word)
-            
-            if current_line:
-                lines.append(' '.join(current_line))
-            
-            return '\n'.join(lines)
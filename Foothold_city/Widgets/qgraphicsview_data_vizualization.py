@@ -1,9 +1,12 @@
 from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene
-from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtCore import Qt, QPointF, pyqtSignal
 from PyQt6.QtGui import QWheelEvent, QMouseEvent, QPainter
 
 
 class QGraphicsViewDataVisualization(QGraphicsView):
+    # Новый масштаб просмотра (после прокрутки колесом мыши)
+    zoom_changed = pyqtSignal(float)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setScene(QGraphicsScene(self))
@@ -37,8 +40,14 @@ class QGraphicsViewDataVisualization(QGraphicsView):
         elif not zoom_in and current_zoom > self.min_zoom:
             self.scale(1 / self.zoom_factor, 1 / self.zoom_factor)
 
+        if self.zoom() != current_zoom:
+            self.zoom_changed.emit(self.zoom())
         event.accept()
 
+    def zoom(self):
+        """Текущий масштаб просмотра"""
+        return self.transform().m11()
+
     def mouseMoveEvent(self, event: QMouseEvent) -> None:
         if self.is_panning:
             # Вычисляем смещение
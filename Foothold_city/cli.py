@@ -0,0 +1,289 @@
+"""
+Пакетный расчет опорных городов без графического интерфейса.
+
+Запуск из корня репозитория:
+    python -m Foothold_city.cli rank data/*.xlsx --variant 1 --out results.csv
+    python -m Foothold_city.cli rank data/*.xlsx --method "Баланс сфер"
+    python -m Foothold_city.cli rank regions/*.xlsx --sheet all --merge
+    python -m Foothold_city.cli series years.xlsx --out transitions.csv
+    python -m Foothold_city.cli methods
+
+Каждая книга обрабатывается в отдельном процессе (ProcessPoolExecutor), результаты
+записываются по мере готовности файлов, время этапов выводится в stderr.
+С --merge все книги и листы загружаются в одну модель и города распределяются по порядкам вместе.
+Команда series считает ряд по годам (лист или книга - год) и выводит переходы городов между порядками.
+PyQt при этом не импортируется.
+"""
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Foothold_city.Utils.data_analysis import DataAnalysis
+from Foothold_city.Utils.file_manager import FileManager
+
+
+# Этапы расчета в порядке выполнения
+STAGES = ("Загрузка", "Нормализация", "Площади", "Сортировка")
+
+CSV_COLUMNS = ("Файл", "Название города", "Порядок опорного города", "value")
+
+SERIES_CSV_COLUMNS = ("Название города", "Год", "Следующий год", "Порядок было", "Порядок стало")
+
+
+def make_report(file, error=None):
+    """Пустой отчет rank_workbook (например, для книги, обработка которой завершилась исключением)."""
+    return {"file": file, "results": [], "timings": {}, "error": error, "warnings": []}
+
+
+def rank_workbook(file_path, method_name="Вариант 1", sheet_name=0):
+    """
+    Загружает книгу и распределяет все ее города по порядкам опорного города.
+    Отладочный вывод FileManager и DataAnalysis перехватывается, чтобы не смешиваться с результатами.
+
+    :param file_path: Путь к файлу Excel.
+    :param method_name: Метод сортировки (ключ DataAnalysis.ranking_methods).
+    :param sheet_name: Название листа или его индекс; None - все листы книги.
+    :return: Словарь с ключами "file", "results" (результат DataAnalysis.rank_cities),
+        "timings" ({этап: секунды}), "error" (None или текст ошибки) и "warnings" (пропущенные листы,
+        ошибки кэша).
+    """
+    return rank_workbooks([file_path], method_name, sheet_name)
+
+
+def rank_workbooks(file_paths, method_name="Вариант 1", sheet_name=0):
+    """
+    Загружает несколько книг в одну модель (FileManager.load_excel_files) и распределяет все их
+    города по порядкам за один проход. Города разных листов и книг различаются по источнику.
+    :return: Отчет в формате rank_workbook; "file" - пути через "; ".
+    """
+    report = make_report("; ".join(file_paths))
+    log = io.StringIO()
+
+    def stage(name, function):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            result = function()
+        report["timings"][name] = time.perf_counter() - start
+        return result
+
+    file_manager = FileManager()
+    model = stage("Загрузка", lambda: file_manager.load_excel_files(file_paths, sheet_name=sheet_name))
+    report["warnings"] = file_manager.load_warnings
+    if model is None:
+        report["error"] = file_manager.load_error or f"Не удалось загрузить файл: {report['file']}"
+        return report
+    stage("Нормализация", file_manager.normalize_data)
+
+    city_names = file_manager.get_city_names()
+    if len(city_names) < 3:
+        report["error"] = "Для сортировки нужно минимум три города."
+        return report
+
+    criteria_names = file_manager.get_criteria_names()
+    matrix = file_manager.get_cities_normalized_matrix(city_names)
+    full_matrix, _, areas = stage("Площади", lambda: DataAnalysis.score_cities(matrix, criteria_names))
+    spheres = file_manager.get_spheres_columns()
+    report["results"] = stage("Сортировка", lambda: DataAnalysis.rank_cities(
+        method_name, city_names, areas, full_matrix, criteria_names, spheres))
+    return report
+
+
+def expand_paths(patterns):
+    """Раскрывает шаблоны путей (в Windows оболочка этого не делает), сохраняя порядок и без повторов."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def iter_reports(paths, method_name, sheet_name=0, workers=None):
+    """
+    Обрабатывает книги и выдает отчеты rank_workbook по мере готовности.
+    :param workers: Число процессов (None - по числу ядер). Одна книга или workers=1 - без пула процессов.
+    """
+    if len(paths) == 1 or workers == 1:
+        for path in paths:
+            try:
+                yield rank_workbook(path, method_name, sheet_name)
+            except Exception as e:
+                yield make_report(path, f"{type(e).__name__}: {e}")
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(rank_workbook, path, method_name, sheet_name): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield make_report(futures[future], f"{type(e).__name__}: {e}")
+
+
+def sheet_argument(args):
+    """
+    Лист книги из аргументов --sheet/--sheet-index: название листа ("2020" - тоже название),
+    номер листа (с 0) или None - все листы (--sheet all).
+    """
+    if args.sheet is None:
+        return args.sheet_index
+    return None if args.sheet == "all" else args.sheet
+
+
+def format_timings(timings):
+    """Строка времени этапов: "Загрузка 120 мс, Нормализация 3 мс, ..." """
+    return ", ".join(f"{name} {timings[name] * 1000:.0f} мс" for name in STAGES if name in timings)
+
+
+def rank_command(args):
+    method_name = args.method or f"Вариант {args.variant}"
+    if method_name not in DataAnalysis.ranking_methods:
+        print(f"Ошибка: неизвестный метод сортировки \"{method_name}\" (см. команду methods).", file=sys.stderr)
+        return 2
+    paths = expand_paths(args.files)
+    if not paths:
+        print("Ошибка: не найдено ни одного файла.", file=sys.stderr)
+        return 2
+
+    out = open(args.out, "w", newline="", encoding="utf-8-sig") if args.out else sys.stdout
+    sheet_name = sheet_argument(args)
+    if args.merge:
+        try:
+            reports = iter([rank_workbooks(paths, method_name, sheet_name)])
+        except Exception as e:
+            reports = iter([make_report("; ".join(paths), f"{type(e).__name__}: {e}")])
+    else:
+        reports = iter_reports(paths, method_name, sheet_name, args.workers)
+
+    failed = 0
+    totals = {}
+    start = time.perf_counter()
+    try:
+        writer = csv.writer(out)
+        writer.writerow(CSV_COLUMNS)
+        for report in reports:
+            file_name = "; ".join(os.path.basename(path) for path in report["file"].split("; "))
+            for warning in report["warnings"]:
+                print(f"{file_name}: {warning}", file=sys.stderr)
+            if report["error"]:
+                failed += 1
+                print(f"{file_name}: ошибка - {report['error']}", file=sys.stderr)
+                continue
+
+            for entry in report["results"]:
+                writer.writerow((report["file"], entry["Название города"],
+                                 entry["Порядок опорного города"], entry["value"]))
+            out.flush()
+            for name, seconds in report["timings"].items():
+                totals[name] = totals.get(name, 0) + seconds
+            print(f"{file_name}: {len(report['results'])} городов ({format_timings(report['timings'])})",
+                  file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    processed = (0 if failed else len(paths)) if args.merge else len(paths) - failed
+    print(f"Обработано файлов: {processed} из {len(paths)} за {time.perf_counter() - start:.2f} с; "
+          f"сумма по этапам: {format_timings(totals)}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def series_command(args):
+    method_name = args.method or f"Вариант {args.variant}"
+    if method_name not in DataAnalysis.ranking_methods:
+        print(f"Ошибка: неизвестный метод сортировки \"{method_name}\" (см. команду methods).", file=sys.stderr)
+        return 2
+    paths = expand_paths(args.files)
+    if not paths:
+        print("Ошибка: не найдено ни одного файла.", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    file_manager = FileManager()
+    sheet_name = sheet_argument(args)
+    with contextlib.redirect_stdout(io.StringIO()):
+        series = file_manager.load_time_series(paths, sheet_name)
+    for warning in file_manager.load_warnings:
+        print(warning, file=sys.stderr)
+    if series is None:
+        print(file_manager.load_error, file=sys.stderr)
+        return 1
+    loaded = time.perf_counter()
+    DataAnalysis.analyze_time_series(series, method_name)
+    transitions = DataAnalysis.order_transitions(series, changed_only=not args.all)
+
+    out = open(args.out, "w", newline="", encoding="utf-8-sig") if args.out else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(SERIES_CSV_COLUMNS)
+        writer.writerows(transitions.tolist())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    counts = DataAnalysis.transition_counts(series)
+    for year, next_year, matrix in zip(series.years, series.years[1:], counts):
+        changed = int(matrix.sum() - matrix.trace())
+        print(f"{year} → {next_year}: сменили порядок {changed} из {int(matrix.sum())} городов", file=sys.stderr)
+    print(f"Лет: {len(series.years)}, городов: {len(series.city_names)}; загрузка {(loaded - start) * 1000:.0f} мс, "
+          f"расчет {(time.perf_counter() - loaded) * 1000:.0f} мс", file=sys.stderr)
+    return 0
+
+
+def methods_command(args):
+    for method_name, method in DataAnalysis.ranking_methods.items():
+        description = " ".join((method.__doc__ or "").split())
+        print(f"{method_name}: {description}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m Foothold_city.cli",
+                                     description="Расчет опорных городов без графического интерфейса.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rank = commands.add_parser("rank", help="распределить города книг Excel по порядкам опорного города")
+    rank.add_argument("files", nargs="+", help="файлы xlsx (допускаются шаблоны, например data/*.xlsx)")
+    rank.add_argument("--variant", choices=("1", "2"), default="1", help="вариант сортировки (Вариант 1 или 2)")
+    rank.add_argument("--method", help="метод сортировки по названию (вместо --variant), см. команду methods")
+    rank.add_argument("--out", help="файл CSV для результатов (по умолчанию - стандартный вывод)")
+    rank_sheet = rank.add_mutually_exclusive_group()
+    rank_sheet.add_argument("--sheet", help="название листа или all - все листы (по умолчанию первый лист)")
+    rank_sheet.add_argument("--sheet-index", type=int, default=0, help="номер листа, с 0 (по умолчанию 0)")
+    rank.add_argument("--merge", action="store_true",
+                      help="загрузить все книги и листы в одну модель и распределить города вместе")
+    rank.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию по числу ядер)")
+    rank.set_defaults(handler=rank_command)
+
+    series = commands.add_parser("series", help="ряд по годам: переходы городов между порядками опорного города")
+    series.add_argument("files", nargs="+",
+                        help="файлы xlsx: листы одной книги или книги по годам (допускаются шаблоны)")
+    series.add_argument("--variant", choices=("1", "2"), default="1", help="вариант сортировки (Вариант 1 или 2)")
+    series.add_argument("--method", help="метод сортировки по названию (вместо --variant), см. команду methods")
+    series.add_argument("--out", help="файл CSV для переходов (по умолчанию - стандартный вывод)")
+    series_sheet = series.add_mutually_exclusive_group()
+    series_sheet.add_argument("--sheet", help="название листа каждой книги (год - книга) или all - все листы "
+                                              "(по умолчанию)")
+    series_sheet.add_argument("--sheet-index", type=int, help="номер листа каждой книги, с 0 (год - книга)")
+    series.add_argument("--all", action="store_true", help="выводить все города, а не только сменившие порядок")
+    series.set_defaults(handler=series_command)
+
+    methods = commands.add_parser("methods", help="список методов сортировки")
+    methods.set_defaults(handler=methods_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+from Foothold_city.Utils import synthetic_data
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Foothold_city", "Resources", "Data")
+
+
+@pytest.fixture
+def synthetic():
+    """Генераторы синтетических данных, общие для тестов и замеров (Foothold_city/Utils/synthetic_data.py)."""
+    return synthetic_data
+
+
+@pytest.fixture(params=sorted(name for name in os.listdir(DATA_DIR) if name.endswith(".xlsx")))
+def workbook_path(request):
+    """Путь к каждой книге из Resources/Data."""
+    return os.path.join(DATA_DIR, request.param)
@@ -0,0 +1,64 @@
+import os
+import shutil
+
+import pytest
+
+from Foothold_city.cli import main
+from conftest import DATA_DIR
+
+WORKBOOK = os.path.join(DATA_DIR, "data_03.xlsx")
+
+
+def test_rank_returns_error_code_for_missing_file(tmp_path, capsys):
+    assert main(["rank", str(tmp_path / "missing.xlsx")]) == 1
+    assert "ошибка" in capsys.readouterr().err
+
+
+def test_rank_returns_error_code_for_missing_sheet(capsys):
+    assert main(["rank", WORKBOOK, "--sheet-index", "5"]) == 1
+    assert main(["rank", WORKBOOK, "--sheet", "Нет такого листа"]) == 1
+
+
+@pytest.mark.parametrize("sheet_args", [[], ["--sheet-index", "0"], ["--sheet", "all"]])
+def test_rank_selects_first_sheet(tmp_path, sheet_args):
+    out = tmp_path / "result.csv"
+    assert main(["rank", WORKBOOK, "--workers", "1", "--out", str(out)] + sheet_args) == 0
+    assert len(out.read_text(encoding="utf-8-sig").splitlines()) > 1
+
+
+def test_series_sheet_index_selects_sheet_of_each_book(tmp_path):
+    paths = []
+    for year in ("2020", "2021"):
+        paths.append(str(tmp_path / f"{year}.xlsx"))
+        shutil.copy(WORKBOOK, paths[-1])
+    out = tmp_path / "transitions.csv"
+    assert main(["series", *paths, "--sheet-index", "0", "--all", "--out", str(out)]) == 0
+    assert "2020,2021" in out.read_text(encoding="utf-8-sig")
+
+
+@pytest.mark.parametrize("extra_args", [["--workers", "1"], ["--workers", "2"], ["--merge"]])
+def test_rank_reports_failing_workbook(tmp_path, monkeypatch, capsys, extra_args):
+    from concurrent.futures import ThreadPoolExecutor
+
+    import Foothold_city.cli as cli
+
+    broken = str(tmp_path / "broken.xlsx")
+    shutil.copy(WORKBOOK, broken)
+    rank_workbooks = cli.rank_workbooks
+
+    def failing_rank_workbooks(file_paths, *args):
+        if broken in file_paths:
+            raise RuntimeError("сбой расчета")
+        return rank_workbooks(file_paths, *args)
+
+    # Пул потоков вместо пула процессов, чтобы подмена действовала и в обработчиках пула
+    monkeypatch.setattr(cli, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(cli, "rank_workbooks", failing_rank_workbooks)
+    out = tmp_path / "result.csv"
+    assert main(["rank", WORKBOOK, broken, "--out", str(out)] + extra_args) == 1
+
+    err = capsys.readouterr().err
+    assert "ошибка - RuntimeError: сбой расчета" in err
+    if "--merge" not in extra_args:
+        assert "Обработано файлов: 1 из 2" in err
+        assert len(out.read_text(encoding="utf-8-sig").splitlines()) > 1
@@ -0,0 +1,233 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Foothold_city.Models.city_time_series import CityTimeSeries
+from Foothold_city.Utils.data_analysis import DataAnalysis
+from Foothold_city.Utils.file_manager import FileManager
+from Foothold_city.Utils.legacy_reference import (legacy_fill_data, legacy_normalize_data, legacy_polygon_area,
+                                                  legacy_sort_variant_1, legacy_sort_variant_2)
+
+# Допустимая относительная разница площадей с прежним расчетом (π ≈ 3.14159)
+POLYGON_AREA_TOLERANCE = 5e-6
+
+
+@pytest.mark.parametrize("cities_count, criteria_count", [(1, 5), (100, 20), (1000, 40)])
+def test_normalize_data_matches_legacy(synthetic, cities_count, criteria_count):
+    data = synthetic.make_synthetic_data(cities_count, criteria_count)
+    data["Критерий 1"] = 7.5  # постоянный столбец
+    data["Критерий 2"] = np.nan  # столбец из одних NaN
+    file_manager = FileManager()
+    file_manager.data = data
+    file_manager.normalize_data()
+
+    # Прежняя загрузка добавляла строку "Г0" из нулей, и она входила в min и max нормализации
+    baseline_row = pd.DataFrame([["Г0"] + [FileManager.BASELINE] * criteria_count], columns=data.columns)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+        expected = legacy_normalize_data(pd.concat([data, baseline_row], ignore_index=True)).iloc[:-1]
+    pd.testing.assert_frame_equal(file_manager.normalized_data.reset_index(drop=True),
+                                  expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_normalize_matrix_cube_matches_each_year(synthetic):
+    cube = synthetic.make_synthetic_values((4, 50, 6), nan_share=0.2)
+    cube[1, :, 2] = 3.0
+    normalized = DataAnalysis.normalize_matrix(cube, baseline=0.0)
+    for year in range(len(cube)):
+        np.testing.assert_array_equal(normalized[year], DataAnalysis.normalize_matrix(cube[year], baseline=0.0))
+
+
+def assert_fill_matches_legacy(values):
+    """fill_data (1-D) совпадает с прежней реализацией побитово, включая список дополненных критериев."""
+    criteria_names = [f"Критерий {j}" for j in range(len(values))]
+    expected, expected_criteria = legacy_fill_data(list(values), criteria_names)
+    for data in (list(values), np.asarray(values, dtype=np.float64)):
+        actual, actual_criteria = DataAnalysis.fill_data(data, criteria_names)
+        assert type(actual) is type(data)
+        np.testing.assert_array_equal(actual, expected, err_msg=f"Данные: {list(values)}")
+        assert actual_criteria == expected_criteria
+
+
+def assert_fill_matrix_matches_legacy(matrix):
+    """fill_matrix (2-D) совпадает с прежней реализацией по каждой строке, включая маску дополненных ячеек."""
+    criteria_names = [f"Критерий {j}" for j in range(matrix.shape[1])]
+    # Матрицы из pandas хранятся по столбцам - проверяем оба порядка памяти
+    for layout in (np.ascontiguousarray(matrix), np.asfortranarray(matrix)):
+        filled, filled_mask = DataAnalysis.fill_matrix(layout)
+        for row, filled_row, mask_row in zip(matrix.tolist(), filled, filled_mask):
+            expected, expected_criteria = legacy_fill_data(row, criteria_names)
+            np.testing.assert_array_equal(filled_row, expected, err_msg=f"Данные: {row}")
+            assert [criteria_names[j] for j in np.flatnonzero(mask_row)] == expected_criteria
+
+
+nan = np.nan
+
+
+@pytest.mark.parametrize("values", [
+    [nan],  # одна ячейка без значения
+    [nan, nan, nan, nan],  # строка из одних NaN
+    [4.0],
+    [nan, nan, 7.5, nan],  # единственное значение
+    [nan, 1.0, 2.0, 3.0],  # начальный пропуск: левый сосед - последнее значение строки
+    [1.0, 2.0, nan, nan],  # конечная серия: правый сосед - циклически первый столбец
+    [nan, nan, 1.0, 9.0, nan, nan],  # пропуски с обеих сторон (циклический перенос)
+    [1.0, nan, nan, nan, 9.0],  # серия внутри строки
+    [nan, 2.0, nan, 4.0, nan, 6.0, nan],  # чередование
+])
+def test_fill_data_edge_cases_match_legacy(values):
+    assert_fill_matches_legacy(values)
+    assert_fill_matrix_matches_legacy(np.array([values, values[::-1]], dtype=np.float64))
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_fill_data_random_rows_match_legacy(seed):
+    # Произвольная длина и произвольная доля пропусков (от 0 до 1) для каждого набора
+    rng = np.random.default_rng(seed)
+    length = int(rng.integers(1, 41))
+    values = rng.uniform(0, 10, size=length).round(2)
+    values[rng.random(length) < rng.random()] = np.nan
+    assert_fill_matches_legacy(values.tolist())
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fill_matrix_random_matrices_match_legacy(seed):
+    rng = np.random.default_rng(seed)
+    matrix = rng.uniform(0, 10, size=(50, int(rng.integers(1, 41)))).round(2)
+    matrix[rng.random(matrix.shape) < rng.random()] = np.nan
+    matrix[::7] = np.nan  # строки из одних NaN
+    matrix[3::7] = np.where(np.arange(matrix.shape[1]) == matrix.shape[1] // 2, 5.0, np.nan)  # одно значение
+    assert_fill_matrix_matches_legacy(matrix)
+
+
+@pytest.mark.parametrize("cities_count, criteria_count", [(100, 3), (200, 50)])
+def test_score_cities_matches_legacy(synthetic, cities_count, criteria_count):
+    matrix = synthetic.make_synthetic_values((cities_count, criteria_count), high=10, nan_share=0.3)
+    criteria_names = [f"Критерий {j}" for j in range(criteria_count)]
+    filled, filled_mask, areas = DataAnalysis.score_cities(matrix, criteria_names)
+
+    for i, row in enumerate(matrix.tolist()):
+        full_data, filled_criteria = legacy_fill_data(row, criteria_names)
+        np.testing.assert_array_equal(filled[i], full_data)
+        assert [criteria_names[j] for j in np.flatnonzero(filled_mask[i])] == filled_criteria
+        if not np.isnan(full_data).any():
+            np.testing.assert_allclose(areas[i], legacy_polygon_area(full_data), rtol=POLYGON_AREA_TOLERANCE)
+
+
+@pytest.mark.parametrize("criteria_count", [3, 4, 7, 12, 50, 200])
+def test_polygon_area_within_tolerance_of_legacy(synthetic, criteria_count):
+    matrix = synthetic.make_synthetic_values((200, criteria_count), high=10)
+    # Почти равные пары: копии городов с одним значением, измененным на 0.01
+    matrix[1::2] = matrix[::2]
+    matrix[1::2, 0] = np.clip(matrix[1::2, 0] + 0.01, 0, 10)
+
+    legacy = np.array([legacy_polygon_area(row) for row in matrix.tolist()])
+    areas = DataAnalysis.calculate_polygon_areas(matrix)
+    relative = np.abs(areas - legacy) / np.maximum(legacy, np.finfo(float).tiny)
+    assert relative.max() <= POLYGON_AREA_TOLERANCE
+
+    # Порядок городов может измениться только у пар, чьи площади ближе допуска
+    legacy_order = np.argsort(-legacy, kind='stable')
+    new_order = np.argsort(-areas, kind='stable')
+    for position in np.flatnonzero(legacy_order != new_order):
+        a, b = legacy[legacy_order[position]], legacy[new_order[position]]
+        assert abs(a - b) <= 2 * POLYGON_AREA_TOLERANCE * max(a, b)
+
+
+def assert_same_ranking(result, legacy):
+    """Структурированный массив sort_variant_* совпадает со списком словарей прежней реализации."""
+    assert len(result) == len(legacy)
+    for field in ("Название города", "Порядок опорного города"):
+        assert result[field].tolist() == [entry[field] for entry in legacy]
+    np.testing.assert_array_equal(result["value"], np.array([entry["value"] for entry in legacy], dtype=np.float64))
+
+
+@pytest.mark.parametrize("cities_count", [3, 10, 100, 2000])
+@pytest.mark.parametrize("sort, legacy_sort", [(DataAnalysis.sort_variant_1, legacy_sort_variant_1),
+                                               (DataAnalysis.sort_variant_2, legacy_sort_variant_2)])
+def test_sort_variants_match_legacy(synthetic, cities_count, sort, legacy_sort):
+    cities_values = synthetic.make_synthetic_cities_values(cities_count, 20)
+    assert_same_ranking(sort(cities_values), legacy_sort(cities_values))
+
+
+@pytest.mark.parametrize("method_name", list(DataAnalysis.ranking_methods))
+def test_ranking_methods_orders(synthetic, method_name):
+    cities_count, criteria_count = 500, 20
+    matrix = synthetic.make_synthetic_values((cities_count, criteria_count), high=10)
+    areas = DataAnalysis.calculate_polygon_areas(matrix)
+    city_names = [f"Город {i}" for i in range(cities_count)]
+    criteria_names = [f"Критерий {j}" for j in range(criteria_count)]
+    spheres = {f"Сфера {k}": slice(5 * k, 5 * k + 5) for k in range(4)}
+
+    result = DataAnalysis.rank_cities(method_name, city_names, areas, matrix, criteria_names, spheres)
+    orders = np.array([DataAnalysis.ORDER_NAMES.index(order) for order in result["Порядок опорного города"]])
+    assert sorted(result["Название города"].tolist()) == sorted(city_names)
+    assert np.all(np.diff(orders) >= 0)
+    assert np.count_nonzero(orders == 1) == 1 and np.count_nonzero(orders == 4) == 1
+
+
+@pytest.mark.parametrize("method_name", ["Вариант 1", "Вариант 2"])
+def test_time_series_matches_per_year_ranking(synthetic, method_name):
+    years, sheets = synthetic.make_synthetic_years(5, 300, 12)
+    series = CityTimeSeries.from_model(FileManager().load_sheets(sheets, years))
+    assert DataAnalysis.analyze_time_series(series, method_name) == list(range(len(years)))
+
+    for y, sheet in enumerate(sheets):
+        file_manager = FileManager()
+        file_manager.load_sheet(*sheet)
+        file_manager.normalize_data()
+        city_names = file_manager.get_city_names()
+        criteria_names = file_manager.get_criteria_names()
+        full_matrix, _, areas = DataAnalysis.score_cities(
+            file_manager.get_cities_normalized_matrix(city_names), criteria_names)
+        result = DataAnalysis.rank_cities(method_name, city_names, areas, full_matrix, criteria_names,
+                                          file_manager.get_spheres_columns())
+        expected = dict(zip(result["Название города"].tolist(), result["Порядок опорного города"].tolist()))
+        actual = {series.city_names[i]: DataAnalysis.ORDER_NAMES[order]
+                  for i, order in enumerate(series.orders[y].tolist()) if order}
+        assert actual == expected
+
+
+def test_time_series_recomputes_only_changed_year(synthetic):
+    years, sheets = synthetic.make_synthetic_years(3, 50, 8)
+    series = CityTimeSeries.from_model(FileManager().load_sheets(sheets, years))
+    DataAnalysis.analyze_time_series(series)
+    orders = series.orders.copy()
+
+    headers, _, city_names, values = sheets[-1]
+    columns = [headers[1:].index(criterion) for criterion in series.criteria_names]
+    last_year = series.set_year(years[-1], city_names + ["Новый город"],
+                                np.vstack([values[:, columns], np.full(len(columns), 500.0)]))
+    assert DataAnalysis.analyze_time_series(series) == [last_year]
+    np.testing.assert_array_equal(series.orders[:-1, :orders.shape[1]], orders[:-1])
+    assert series.get_city_orders("Новый город").keys() == {years[-1]}
+
+    transitions = DataAnalysis.order_transitions(series, changed_only=False)
+    counts = DataAnalysis.transition_counts(series)
+    assert counts.sum() == len(transitions)
+    changed = DataAnalysis.order_transitions(series)
+    assert np.all(changed["Порядок было"] != changed["Порядок стало"])
+
+
+@pytest.mark.parametrize("method_name", list(DataAnalysis.ranking_methods))
+def test_ranking_methods_without_spheres(synthetic, method_name):
+    # Лист без строки сфер: FileManager.get_spheres_columns возвращает пустой словарь
+    matrix = synthetic.make_synthetic_values((50, 8), high=10)
+    areas = DataAnalysis.calculate_polygon_areas(matrix)
+    city_names = [f"Город {i}" for i in range(50)]
+    criteria_names = [f"Критерий {j}" for j in range(8)]
+    result = DataAnalysis.rank_cities(method_name, city_names, areas, matrix, criteria_names, {})
+    expected = DataAnalysis.rank_cities(method_name, city_names, areas, matrix, criteria_names)
+    assert np.array_equal(result, expected)
+
+
+@pytest.mark.parametrize("cities_count", [1, 4095, 4096, 4097, 10000])
+def test_above_average_mask_sums_rows_in_order(synthetic, monkeypatch, cities_count):
+    matrix = synthetic.make_synthetic_values((cities_count, 7), high=10, decimals=1)
+    column_means = np.cumsum(matrix, axis=0)[-1] / cities_count
+    expected = (matrix >= column_means).mean(axis=1) > 0.5
+    np.testing.assert_array_equal(DataAnalysis.above_average_mask(matrix), expected)
+    monkeypatch.setattr(DataAnalysis, "SUM_BLOCK_ROWS", 3)
+    np.testing.assert_array_equal(DataAnalysis.above_average_mask(matrix), expected)
@@ -0,0 +1,87 @@
+import os
+import shutil
+
+import numpy as np
+
+from Foothold_city.Utils.excel_reader import ExcelReader
+
+
+def assert_same_sheet(sheet, expected):
+    assert sheet[:3] == expected[:3]
+    np.testing.assert_array_equal(sheet[3], expected[3])
+
+
+def test_streaming_and_cache_match_pandas(workbook_path, tmp_path):
+    expected = ExcelReader.read_sheet(workbook_path, fast=False)
+    assert_same_sheet(ExcelReader.read_sheet(workbook_path, fast=True), expected)
+
+    cache_dir = str(tmp_path / "cache")
+    assert_same_sheet(ExcelReader.read_sheet(workbook_path, fast=True, cache_dir=cache_dir), expected)
+    assert_same_sheet(ExcelReader.read_sheet(workbook_path, fast=True, cache_dir=cache_dir), expected)
+
+
+def test_scaled_workbook_streaming_matches_pandas(synthetic, workbook_path, tmp_path):
+    target_path = str(tmp_path / "scaled.xlsx")
+    synthetic.make_scaled_workbook(workbook_path, target_path, cities_count=300, criteria_repeat=3)
+    assert_same_sheet(ExcelReader.read_sheet(target_path, fast=True), ExcelReader.read_sheet(target_path, fast=False))
+
+
+def test_cache_keeps_only_current_version_of_sheet(workbook_path, tmp_path):
+    path = str(tmp_path / "book.xlsx")
+    shutil.copy(workbook_path, path)
+    cache_dir = tmp_path / "cache"
+    ExcelReader.read_sheet(path, cache_dir=str(cache_dir))
+    ExcelReader.read_sheet(path, cache_dir=str(cache_dir))  # повторное чтение из кэша
+    assert len(list(cache_dir.glob("*.npz"))) == 1
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))  # файл изменен
+    ExcelReader.read_sheet(path, cache_dir=str(cache_dir))
+    cached = list(cache_dir.glob("*.npz"))
+    assert [str(file) for file in cached] == [ExcelReader._cache_path(path, 0, str(cache_dir))]
+
+
+def test_cache_size_limit_removes_least_recently_used(synthetic, workbook_path, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    paths = []
+    for k in range(3):
+        paths.append(str(tmp_path / f"book_{k}.xlsx"))
+        synthetic.make_scaled_workbook(workbook_path, paths[-1], cities_count=100, criteria_repeat=1, seed=k)
+        ExcelReader.read_sheet(paths[-1], cache_dir=str(cache_dir))
+        cache_path = ExcelReader._cache_path(paths[-1], 0, str(cache_dir))
+        os.utime(cache_path, (k, k))  # порядок использования: book_0 - самый старый
+    ExcelReader.read_sheet(paths[1], cache_dir=str(cache_dir))  # book_1 снова использован
+
+    entry_size = os.path.getsize(ExcelReader._cache_path(paths[0], 0, str(cache_dir)))
+    monkeypatch.setattr(ExcelReader, "CACHE_MAX_BYTES", 3 * entry_size)
+    paths.append(str(tmp_path / "book_3.xlsx"))
+    synthetic.make_scaled_workbook(workbook_path, paths[-1], cities_count=100, criteria_repeat=1, seed=3)
+    ExcelReader.read_sheet(paths[-1], cache_dir=str(cache_dir))
+
+    cached = {os.path.basename(path) for path in cache_dir.glob("*.npz")}
+    expected = {os.path.basename(ExcelReader._cache_path(path, 0, str(cache_dir))) for path in paths[1:]}
+    assert cached == expected
+
+
+def test_corrupt_cache_is_reported_and_rewritten(workbook_path, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    expected = ExcelReader.read_sheet(workbook_path, cache_dir=cache_dir)
+    cache_path = ExcelReader._cache_path(workbook_path, 0, cache_dir)
+    with open(cache_path, "wb") as file:
+        file.write(b"not a cache")
+
+    warnings = []
+    assert_same_sheet(ExcelReader.read_sheet(workbook_path, cache_dir=cache_dir, warnings=warnings), expected)
+    assert len(warnings) == 1 and "Кэш" in warnings[0]
+    warnings.clear()
+    assert_same_sheet(ExcelReader.read_sheet(workbook_path, cache_dir=cache_dir, warnings=warnings), expected)
+    assert warnings == []
+
+
+def test_default_cache_dir_is_private_to_user(workbook_path, tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    cache_dir = ExcelReader.default_cache_dir()
+    assert cache_dir.startswith(str(tmp_path))
+    ExcelReader.read_sheet(workbook_path, cache_dir=cache_dir)
+    if os.name == "posix":
+        assert os.stat(cache_dir).st_mode & 0o777 == 0o700
@@ -0,0 +1,36 @@
+import os
+
+from Foothold_city.Controllers.file_load_worker import FileLoadWorker
+from Foothold_city.Utils.file_manager import FileManager
+from Foothold_city.Utils.session_store import SessionStore
+from conftest import DATA_DIR
+
+
+def run_worker(file_paths):
+    """Выполняет загрузку в текущем потоке и возвращает переданные сигналы."""
+    worker = FileLoadWorker(file_paths)
+    emitted = []
+    worker.signals.finished.connect(lambda file_manager: emitted.append(("finished", file_manager)))
+    worker.signals.failed.connect(lambda message: emitted.append(("failed", message)))
+    worker.run()
+    return emitted
+
+
+def test_worker_reports_unexpected_error(monkeypatch):
+    def broken_normalize(self, progress=None):
+        raise RuntimeError("сбой нормализации")
+
+    monkeypatch.setattr(FileManager, "normalize_data", broken_normalize)
+    emitted = run_worker(os.path.join(DATA_DIR, "data_03.xlsx"))
+    assert len(emitted) == 1 and emitted[0][0] == "failed"
+    assert "сбой нормализации" in emitted[0][1]
+
+
+def test_worker_reports_session_error(monkeypatch, tmp_path):
+    def broken_load(file_path, mmap=False):
+        raise MemoryError("нет памяти")
+
+    monkeypatch.setattr(SessionStore, "load", staticmethod(broken_load))
+    emitted = run_worker(str(tmp_path / "broken.fcsession"))
+    assert len(emitted) == 1 and emitted[0][0] == "failed"
+    assert "нет памяти" in emitted[0][1]
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from Foothold_city.Utils.file_manager import FileManager
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_load_sheet_keeps_dtype(synthetic, dtype):
+    file_manager = FileManager()
+    file_manager.load_sheet(*synthetic.make_synthetic_sheet(200, 12), dtype=dtype)
+    file_manager.normalize_data()
+    assert file_manager.values.dtype == dtype
+    assert file_manager.normalized_values.dtype == dtype
+
+
+def test_normalize_data_returns_matrix_and_frame_on_request(synthetic):
+    file_manager = FileManager()
+    model = file_manager.load_sheet(*synthetic.make_synthetic_sheet(50, 8))
+    normalized = file_manager.normalize_data()
+    assert normalized is model.normalized_values
+
+    frame = file_manager.normalized_data
+    assert list(frame.columns) == ["Город"] + [f"{name}_норм" for name in file_manager.get_criteria_names()]
+    assert frame["Город"].tolist() == file_manager.get_city_names()
+    np.testing.assert_array_equal(frame.drop(columns=["Город"]).to_numpy(dtype=float), normalized)
+
+
+def test_load_excel_files_same_with_and_without_threads(synthetic, workbook_path, tmp_path):
+    paths = [str(tmp_path / f"region_{k}.xlsx") for k in range(3)]
+    for k, path in enumerate(paths):
+        synthetic.make_scaled_workbook(workbook_path, path, cities_count=200, criteria_repeat=2, seed=k)
+
+    sequential = FileManager().load_excel_files(paths, sheet_name=0, use_cache=False, workers=1)
+    threaded = FileManager().load_excel_files(paths, sheet_name=0, use_cache=False)
+    np.testing.assert_array_equal(threaded.values, sequential.values)
+    assert threaded.city_names.tolist() == sequential.city_names.tolist()
+    assert len(sequential) == 600
+
+
+def test_load_excel_files_skips_auxiliary_sheets(synthetic, tmp_path):
+    import openpyxl
+
+    headers, sphere_labels, city_names, values = synthetic.make_synthetic_sheet(20, 8, nan_share=0)
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.title = "Данные"
+    worksheet.append(headers)
+    worksheet.append(sphere_labels)
+    for city_name, row in zip(city_names, values.tolist()):
+        worksheet.append([city_name] + row)
+    notes = workbook.create_sheet("Справка")
+    notes.append(["Источник", "Росстат"])
+    notes.append(["Год", 2020])
+    notes.append(["Примечание", "значения на конец года"])
+    workbook.create_sheet("Пусто")
+    path = str(tmp_path / "book.xlsx")
+    workbook.save(path)
+
+    file_manager = FileManager()
+    model = file_manager.load_excel_files([path], sheet_name=None, use_cache=False)
+    assert model is not None, file_manager.load_error
+    assert model.city_names.tolist() == city_names  # один загруженный лист - без суффикса источника
+    assert len(file_manager.load_warnings) == 2
+    assert "Справка" in file_manager.load_warnings[0] and "Пусто" in file_manager.load_warnings[1]
+
+
+def test_frame_and_sheet_models_share_baseline(synthetic):
+    from_sheet = FileManager()
+    from_sheet.load_sheet(*synthetic.make_synthetic_sheet(40, 6))
+    from_frame = FileManager()
+    from_frame.data = from_sheet.data
+    assert from_frame.model.baseline == from_sheet.model.baseline == FileManager.BASELINE
+    np.testing.assert_array_equal(from_frame.normalize_data(), from_sheet.normalize_data())
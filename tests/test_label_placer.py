@@ -0,0 +1,11 @@
+import pytest
+
+from Foothold_city.Utils.label_placer import LabelPlacer
+from Foothold_city.Utils.legacy_reference import legacy_place_labels
+
+
+@pytest.mark.parametrize("cities_count, criteria_count", [(1, 100), (10, 100), (50, 100)])
+def test_grid_placement_matches_legacy(synthetic, cities_count, criteria_count):
+    labels = synthetic.make_synthetic_labels(cities_count, criteria_count)
+    placer = LabelPlacer(threshold=0.5)
+    assert [placer.place(*label, max_attempts=10) for label in labels] == legacy_place_labels(labels)
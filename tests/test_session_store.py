@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from Foothold_city.Utils.data_analysis import DataAnalysis
+from Foothold_city.Utils.file_manager import FileManager
+from Foothold_city.Utils.session_store import SessionStore
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_session_round_trip(synthetic, tmp_path, mmap):
+    file_manager = FileManager()
+    file_manager.load_sheet(*synthetic.make_synthetic_sheet(300, 12))
+    file_manager.normalize_data()
+    city_names = file_manager.get_city_names()
+    criteria_names = file_manager.get_criteria_names()
+    full_matrix, _, areas = DataAnalysis.score_cities(file_manager.get_cities_normalized_matrix(city_names),
+                                                      criteria_names)
+    results = DataAnalysis.rank_cities("Вариант 1", city_names, areas, full_matrix, criteria_names,
+                                       file_manager.get_spheres_columns())
+    session_path = str(tmp_path / f"session{SessionStore.EXTENSION}")
+    sort = {"method": "Вариант 1", "results": results, "filled_criteria": []}
+    assert SessionStore.save(session_path, file_manager, "data.xlsx", city_names[:5], sort)
+
+    restored, session = SessionStore.load(session_path, mmap=mmap)
+    assert isinstance(restored.normalized_values, np.memmap) == mmap
+    np.testing.assert_array_equal(restored.values, file_manager.values)
+    np.testing.assert_array_equal(restored.normalized_values, file_manager.normalized_values)
+    assert restored.get_city_names() == city_names
+    assert restored.model.baseline == file_manager.model.baseline
+    assert session["selected_cities"] == city_names[:5]
+    assert np.array_equal(session["sort"]["results"], results)
+
+
+def test_load_rejects_corrupt_file(tmp_path):
+    session_path = tmp_path / f"broken{SessionStore.EXTENSION}"
+    session_path.write_bytes(b"not a session")
+    assert SessionStore.load(str(session_path)) is None
+
+
+def test_load_rejects_other_versions(synthetic, tmp_path):
+    file_manager = FileManager()
+    file_manager.load_sheet(*synthetic.make_synthetic_sheet(10, 4))
+    file_manager.normalize_data()
+    session_path = tmp_path / f"old{SessionStore.EXTENSION}"
+    assert SessionStore.save(str(session_path), file_manager)
+
+    current = f'"version": {SessionStore.VERSION}'.encode()
+    content = session_path.read_bytes()
+    assert current in content
+    session_path.write_bytes(content.replace(current, f'"version": {SessionStore.VERSION - 1}'.encode(), 1))
+    assert SessionStore.load(str(session_path)) is None
+
+
+def test_save_skips_sort_of_other_data(synthetic, tmp_path):
+    file_manager = FileManager()
+    file_manager.load_sheet(*synthetic.make_synthetic_sheet(10, 4))
+    file_manager.normalize_data()
+    results = DataAnalysis.ranking_result(np.array(["Город 0", "Город из другого файла"]), np.array([0, 1]),
+                                          np.array([1, 2], dtype=np.int8), np.array([2.0, 1.0]))
+    session_path = str(tmp_path / f"session{SessionStore.EXTENSION}")
+    assert SessionStore.save(session_path, file_manager, sort={"method": "Вариант 1", "results": results})
+
+    restored, session = SessionStore.load(session_path)
+    assert session["sort"] is None
+    assert restored.get_city_names() == file_manager.get_city_names()
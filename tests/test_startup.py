@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+STARTUP_MODULES = ("Foothold_city.Views.foothold_city_view", "Foothold_city.Controllers.foothold_city_controller")
+HEAVY_MODULES = ("numpy", "pandas", "matplotlib")
+
+
+def test_startup_does_not_import_heavy_modules():
+    # Время импорта (бюджет startup_import_budget_ms) проверяет benchmark.py; здесь - только состав модулей
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = (f"import sys, {', '.join(STARTUP_MODULES)}\n"
+            f"print(' '.join(module for module in {HEAVY_MODULES!r} if module in sys.modules))")
+    completed = subprocess.run([sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True,
+                               check=True)
+    assert completed.stdout.split() == []
+
+
+def test_measure_import_time_lists_nested_imports():
+    from Foothold_city.Utils.benchmark import measure_import_time
+
+    _, top_level, loaded = measure_import_time(("Foothold_city.Utils.file_manager",), repeat=1)
+    assert "Foothold_city.Utils.file_manager" in top_level
+    assert {"numpy", "pandas"} <= loaded
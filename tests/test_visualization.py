@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt6.QtWidgets import QApplication, QCheckBox  # noqa: E402
+
+
+@pytest.fixture
+def widget(synthetic):
+    app = QApplication.instance() or QApplication([])
+    from Foothold_city.Views.visualization import VisualizationWidget
+
+    widget = VisualizationWidget()
+    widget.add_cities({name: data for name, *data in synthetic.make_synthetic_spheres(3, 12)})
+    widget.set_plot_size(300, 300)
+    yield widget
+    widget.plot.close(widget.figure)
+    widget.deleteLater()
+    app.processEvents()
+
+
+def test_render_levels_keep_screen_resolution(widget):
+    canvas = widget.canvas
+    screen_dpi = widget.figure.dpi
+    for scale in (1, 2, 4):
+        widget.set_render_scale(scale)
+        canvas.refine()
+        image = canvas._nearest_level_image()
+        assert (image.width(), image.height()) == (300 * scale, 300 * scale)
+        # Разрешение фигуры и размер холста (координаты событий мыши) от уровня не зависят
+        assert widget.figure.dpi == screen_dpi
+        assert canvas.get_width_height() == (300, 300)
+
+
+def test_hidden_values_do_not_take_label_positions(synthetic):
+    from Foothold_city.Views.plot_model import PlotModel
+
+    cities = synthetic.make_synthetic_spheres(3, 40)
+    model = PlotModel()
+    for city in cities:
+        model.add_city(*city)
+    placed = {name: geometry.labels for name, geometry in model.cities.items()}
+    hidden = cities[0][0]
+
+    model.set_values_visible(hidden, False)
+    visible_only = PlotModel()
+    for city in cities[1:]:
+        visible_only.add_city(*city)
+    assert model.cities[hidden].labels == []
+    assert {name: model.cities[name].labels for name in visible_only.cities} == \
+        {name: geometry.labels for name, geometry in visible_only.cities.items()}
+
+    model.set_values_visible(hidden, True)
+    assert {name: geometry.labels for name, geometry in model.cities.items()} == placed
+
+
+def test_toggle_city_values_updates_shared_model(widget):
+    from Foothold_city.Views.visualization import VisualizationWidget
+
+    city_name = next(iter(widget.model.cities))
+    popup = VisualizationWidget(model=widget.model)
+    widget.toggle_city_values(city_name, 0)
+    assert widget._city_artists[city_name]["labels"] == []
+    popup.sync()
+    checkboxes = {checkbox.text(): checkbox.isChecked() for checkbox in
+                  (popup.checkbox_list.itemWidget(popup.checkbox_list.item(i)).findChild(QCheckBox)
+                   for i in range(popup.checkbox_list.count()))}
+    assert checkboxes == {name: name != city_name for name in widget.model.cities}
+    assert popup._city_artists[city_name]["labels"] == []
+    widget.plot.close(popup.figure)
+    popup.deleteLater()